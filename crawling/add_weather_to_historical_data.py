@@ -1,10 +1,13 @@
-import json
-import requests
-import time
 import os
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 
+from http_client import get_client
+from json_stream import JsonRecordWriter, iter_json_records
+from weather_batch import prefetch_daily
+from weather_cache import get_weather_cache
+from weather_snap import get_snapper
+
 # .env 파일 로드
 dotenv_path = os.path.abspath(os.path.join(__file__, "..", "..", ".env"))
 load_dotenv(dotenv_path)
@@ -12,26 +15,37 @@ load_dotenv(dotenv_path)
 # API 키 로드
 METEOSTAT_API_KEY = os.getenv("METEOSTAT_KEY")
 WEATHERBIT_API_KEY = os.getenv("WEATHERBIT_KEY")
+WEATHER_FIELDS = ["temp", "wspd", "wdir", "precip", "rhum"]
 
 if not METEOSTAT_API_KEY or not WEATHERBIT_API_KEY:
     print("❌ API 키가 제대로 로드되지 않았습니다.")
     exit(1)
 
-def get_meteostat(lat, lon, date_str):
+def get_meteostat_daily_row(lat, lon, date_str):
+    """Meteostat 일별 응답의 첫 행 (영구 캐시 공유: build_train_data.py도 같은 키 사용)"""
+    cache = get_weather_cache()
+    cached = cache.get("meteostat", "daily", lat, lon, date_str)
+    if cached is not None:
+        return cached
+
     url = f"https://meteostat.p.rapidapi.com/point/daily?lat={lat}&lon={lon}&start={date_str}&end={date_str}"
     headers = { 
         "x-rapidapi-key": METEOSTAT_API_KEY,
         "x-rapidapi-host": "meteostat.p.rapidapi.com"
     }
     
+    res = get_client().get(url, headers=headers)
+    res.raise_for_status()
+    data = res.json().get("data", [])
+    row = data[0] if data else {}
+    cache.put("meteostat", "daily", lat, lon, date_str, row)
+    return row
+
+def get_meteostat(lat, lon, date_str):
     try:
-        res = requests.get(url, headers=headers)
-        res.raise_for_status()
-        response_data = res.json()
-        data = response_data.get("data", [])
+        weather_data = get_meteostat_daily_row(lat, lon, date_str)
         
-        if data:
-            weather_data = data[0]
+        if weather_data:
             return {
                 "temp": weather_data.get("tavg"),
                 "wspd": weather_data.get("wspd"),
@@ -45,6 +59,11 @@ def get_meteostat(lat, lon, date_str):
         return { "temp": None, "wspd": None, "wdir": None }
 
 def get_weatherbit(lat, lon, date_str):
+    cache = get_weather_cache()
+    cached = cache.get("weatherbit", "daily", lat, lon, date_str)
+    if cached is not None:
+        return cached
+
     start_date = datetime.strptime(date_str, "%Y-%m-%d")
     end_date = start_date + timedelta(days=1)
     end_date_str = end_date.strftime("%Y-%m-%d")
@@ -52,19 +71,21 @@ def get_weatherbit(lat, lon, date_str):
     url = f"https://api.weatherbit.io/v2.0/history/daily?lat={lat}&lon={lon}&start_date={date_str}&end_date={end_date_str}&key={WEATHERBIT_API_KEY}"
     
     try:
-        res = requests.get(url)
+        res = get_client().get(url)
         res.raise_for_status()
         response_data = res.json()
         data = response_data.get("data", [])
         
         if data:
             weather_data = data[0]
-            return {
+            weather = {
                 "precip": weather_data.get("precip"),
                 "rhum": weather_data.get("rh")
             }
         else:
-            return { "precip": None, "rhum": None }
+            weather = { "precip": None, "rhum": None }
+        cache.put("weatherbit", "daily", lat, lon, date_str, weather)
+        return weather
             
     except Exception as e:
         print(f"❌ Weatherbit API 오류 ({date_str}): {e}")
@@ -135,109 +156,101 @@ def augment_historical_weather():
         print(f"❌ 입력 파일 없음: {input_path}")
         return
 
-    with open(input_path, "r", encoding="utf-8") as f:
-        fires = json.load(f)
-
-    # 기존 기상 데이터가 있는지 확인
+    # 기존 출력은 기상 값이 있는 화재의 기상 필드만 보관 (레코드 전체를 메모리에 올리지 않음)
+    existing_weather = {}
     if os.path.exists(output_path):
-        with open(output_path, "r", encoding="utf-8") as f:
-            existing_data = json.load(f)
-        existing_map = {d.get("frfr_info_id"): d for d in existing_data if d.get("frfr_info_id")}
-        print(f"🔄 기존 기상 데이터 {len(existing_map)}개 로드됨")
-    else:
-        existing_map = {}
-
-    print(f"🔥 화재 데이터 {len(fires)}개 처리 시작...")
+        existing_count = 0
+        for d in iter_json_records(output_path, fields=["frfr_info_id", *WEATHER_FIELDS]):
+            if not d.get("frfr_info_id"):
+                continue
+            existing_count += 1
+            if d.get("temp") is not None or d.get("wspd") is not None:
+                existing_weather[d["frfr_info_id"]] = {field: d.get(field) for field in WEATHER_FIELDS}
+        print(f"🔄 기존 기상 데이터 {existing_count}개 로드됨")
+
+    # 📦 기상이 필요한 화재를 위치별 날짜 구간 요청으로 묶어 캐시를 미리 채움 (화재별 조회는 캐시 적중)
+    total = 0
+    pending_points = []
+    for fire in iter_json_records(input_path):
+        total += 1
+        if fire.get("frfr_info_id") in existing_weather:
+            continue
+        date = parse_fire_datetime(fire)
+        lat, lon = get_fire_coordinates(fire)
+        if date and lat and lon:
+            pending_points.append((lat, lon, date))
+
+    print(f"🔥 화재 데이터 {total}개 처리 시작...")
     print(f"📅 2024-10-01 ~ 2025-04-01 기간 기상 데이터 수집")
 
-    enriched = []
     api_calls = 0
     skipped = 0
     errors = 0
-    cache_meteostat = {}
-    cache_weatherbit = {}
+    sample = None
+    weather_cache = get_weather_cache()  # 실행 간 공유되는 영구 캐시 (weather_cache.py)
+    snapper = get_snapper()              # 가까운 화재끼리 같은 기상 조회 좌표 사용 (weather_snap.py)
+    prefetch_daily(pending_points, {"meteostat": METEOSTAT_API_KEY, "weatherbit": WEATHERBIT_API_KEY})
 
-    for i, fire in enumerate(fires, 1):
-        fire_id = fire.get('frfr_info_id')
-        
-        print(f"[{i}/{len(fires)}] ID: {fire_id}", end=" ")
+    # 입력을 한 건씩 읽어 바로 출력 (임시 파일에 쓴 뒤 교체하므로 기존 출력을 읽으면서 덮어써도 안전)
+    with JsonRecordWriter(output_path) as writer:
+        for i, fire in enumerate(iter_json_records(input_path), 1):
+            fire_id = fire.get('frfr_info_id')
+            sample = sample or fire
 
-        # 기존 데이터 확인
-        if fire_id and fire_id in existing_map:
-            existing_fire = existing_map[fire_id]
-            # 기상 데이터가 이미 있는지 확인
-            if existing_fire.get("temp") is not None or existing_fire.get("wspd") is not None:
+            print(f"[{i}/{total}] ID: {fire_id}", end=" ")
+
+            # 기상 데이터가 이미 있으면 기존 값 사용
+            if fire_id and fire_id in existing_weather:
                 print("🛑 기존 기상데이터 있음 → 건너뜀")
-                enriched.append(existing_fire)
+                fire.update(existing_weather[fire_id])
+                writer.write(fire)
                 skipped += 1
                 continue
 
-        # 날짜 파싱
-        date = parse_fire_datetime(fire)
-        if not date:
-            print("❌ 날짜 파싱 실패")
-            fire.update({"temp": None, "wspd": None, "wdir": None, "precip": None, "rhum": None})
-            enriched.append(fire)
-            errors += 1
-            continue
-
-        # 좌표 추출
-        lat, lon = get_fire_coordinates(fire)
-        if not (lat and lon):
-            print("❌ 좌표 정보 누락")
-            fire.update({"temp": None, "wspd": None, "wdir": None, "precip": None, "rhum": None})
-            enriched.append(fire)
-            errors += 1
-            continue
-
-        print(f"({date}) ", end="")
-
-        # 캐시 키
-        key = (lat, lon, date)
+            # 날짜 파싱
+            date = parse_fire_datetime(fire)
+            if not date:
+                print("❌ 날짜 파싱 실패")
+                fire.update({"temp": None, "wspd": None, "wdir": None, "precip": None, "rhum": None})
+                writer.write(fire)
+                errors += 1
+                continue
 
-        # 기상 데이터 수집
-        if key in cache_meteostat:
-            weather1 = cache_meteostat[key]
-        else:
-            weather1 = get_meteostat(lat, lon, date)
-            cache_meteostat[key] = weather1
+            # 좌표 추출
+            lat, lon = get_fire_coordinates(fire)
+            if not (lat and lon):
+                print("❌ 좌표 정보 누락")
+                fire.update({"temp": None, "wspd": None, "wdir": None, "precip": None, "rhum": None})
+                writer.write(fire)
+                errors += 1
+                continue
 
-        if key in cache_weatherbit:
-            weather2 = cache_weatherbit[key]
-        else:
-            weather2 = get_weatherbit(lat, lon, date)
-            cache_weatherbit[key] = weather2
+            print(f"({date}) ", end="")
 
-        # 데이터 병합
-        fire.update(weather1)
-        fire.update(weather2)
-        enriched.append(fire)
+            # 기상 데이터 수집 (영구 캐시에 있으면 API 호출 없음)
+            query_lat, query_lon = snapper.snap(lat, lon)
+            weather1 = get_meteostat(query_lat, query_lon, date)
+            weather2 = get_weatherbit(query_lat, query_lon, date)
 
-        api_calls += 1
-        print("✅")
-        
-        # API 부하 방지
-        if api_calls % 10 == 0:
-            print(f"⏳ {api_calls}개 처리 완료, 잠시 대기...")
-            time.sleep(2)
-        else:
-            time.sleep(0.5)
+            # 데이터 병합
+            fire.update(weather1)
+            fire.update(weather2)
+            writer.write(fire)
 
-    # 결과 저장
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(enriched, f, ensure_ascii=False, indent=2)
+            api_calls += 1
+            print("✅")
 
     print(f"\n🎉 처리 완료!")
     print(f"📁 저장 위치: {output_path}")
-    print(f"📊 총 {len(enriched)}개 데이터 처리")
+    print(f"📊 총 {writer.count}개 데이터 처리")
     print(f"🌐 {api_calls}개 항목에 기상 데이터 추가")
     print(f"⏭️ {skipped}개 항목 건너뜀")
     print(f"❌ {errors}개 항목 오류")
+    weather_cache.print_stats()
 
     # 샘플 데이터 출력
-    if enriched:
+    if sample:
         print(f"\n📋 샘플 데이터:")
-        sample = enriched[0]
         print(f"  ID: {sample.get('frfr_info_id')}")
         print(f"  발생일시: {sample.get('occu_dtm')}")
         print(f"  위치: {sample.get('addr', 'N/A')}")
@@ -246,4 +259,5 @@ def augment_historical_weather():
         print(f"  습도: {sample.get('rhum')}%")
 
 if __name__ == "__main__":
-    augment_historical_weather()
\ No newline at end of file
+    augment_historical_weather()
+    get_client().print_metrics()
\ No newline at end of file
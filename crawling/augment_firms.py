@@ -1,15 +1,16 @@
+import argparse
 import os
-import json
 from datetime import datetime
-from math import radians, cos, sin, sqrt, atan2
 
-def haversine(lat1, lon1, lat2, lon2):
-    R = 6371
-    d_lat = radians(lat2 - lat1)
-    d_lon = radians(lon2 - lon1)
-    a = sin(d_lat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(d_lon / 2) ** 2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    return R * c
+from firms_columns import FirmsColumns
+from firms_matcher import MATCH_FIELDS, match_fires_scored
+from firms_store import FirmsPartitionStore, read_window
+from geo_distance import match_fires, threshold_bucket
+from json_stream import JsonRecordWriter, iter_json_records
+
+# 매칭 결과로 화재에 붙는 필드 (nasa_match_score는 --scored일 때만)
+NASA_FIELDS = ["brightness", "frp", "confidence", "satellite", "instrument",
+               "nasa_distance_km", "nasa_match_threshold", "nasa_match_score"]
 
 def parse_fire_date(date_str):
     if not date_str:
@@ -47,57 +48,61 @@ def analyze_data_ranges(fires, firms):
         print(f"🔥 화재 경도: {min(fire_lons):.4f} ~ {max(fire_lons):.4f}")
         print(f"🔥 화재 날짜: {min(fire_dates).date()} ~ {max(fire_dates).date()}")
 
-    firms_lats, firms_lons, firms_dates = [], [], []
-    for firm in firms:
-        try:
-            firms_lats.append(float(firm["latitude"]))
-            firms_lons.append(float(firm["longitude"]))
-            firms_dates.append(datetime.strptime(firm["acq_date"], "%Y-%m-%d"))
-        except:
-            continue
-    if firms_lats:
-        print(f"🛰️ NASA 위도: {min(firms_lats):.4f} ~ {max(firms_lats):.4f}")
-        print(f"🛰️ NASA 경도: {min(firms_lons):.4f} ~ {max(firms_lons):.4f}")
-        print(f"🛰️ NASA 날짜: {min(firms_dates).date()} ~ {max(firms_dates).date()}")
+    summary = firms.summary()
+    if summary:
+        (lat_min, lat_max), (lon_min, lon_max), (date_min, date_max) = summary
+        print(f"🛰️ NASA 위도: {lat_min:.4f} ~ {lat_max:.4f}")
+        print(f"🛰️ NASA 경도: {lon_min:.4f} ~ {lon_max:.4f}")
+        print(f"🛰️ NASA 날짜: {date_min} ~ {date_max}")
 
-def augment_firms_improved():
+def augment_firms_improved(scored=False):
     root_dir = os.path.dirname(os.path.abspath(__file__))
     base_dir = os.path.abspath(os.path.join(root_dir, "..", "public", "data"))
     fire_input_path = os.path.join(base_dir, "korea_fire_weather.json")
-    firms_input_path = os.path.join(base_dir, "nasa_firms_korea.json")
     output_path = os.path.join(base_dir, "korea_fire_full.json")
 
-    if not os.path.exists(fire_input_path) or not os.path.exists(firms_input_path):
+    store = FirmsPartitionStore("korea")
+    store.import_legacy_json(os.path.join(base_dir, "nasa_firms_korea.json"))
+
+    if not os.path.exists(fire_input_path) or store.is_empty():
         print("❌ 입력 파일 없음")
         return
 
-    with open(fire_input_path, "r", encoding="utf-8") as f:
-        fires = json.load(f)
-    with open(firms_input_path, "r", encoding="utf-8") as f:
-        firms = json.load(f)
-
+    # 1) 화재 수와 날짜 범위만 먼저 훑음 (매칭에 쓰는 필드만 읽음)
+    total_fires = 0
+    first_date = last_date = None
+    for fire in iter_json_records(fire_input_path, fields=MATCH_FIELDS):
+        total_fires += 1
+        fire_date = parse_fire_date(fire.get("frfr_frng_dtm", "") or fire.get("frfr_sttmn_dt", ""))
+        if fire_date:
+            first_date = min(first_date or fire_date, fire_date)
+            last_date = max(last_date or fire_date, fire_date)
+
+    # 화재 발생일 ±3일에 해당하는 날짜 파티션만 로드
+    # 한 번만 파싱해서 열 묶음으로 보관 (매칭 중 문자열 재파싱 없음)
+    firms = FirmsColumns.from_records(read_window(store, [d for d in (first_date, last_date) if d], margin_days=3))
+
+    # 기존 출력은 NASA 필드만 보관
+    existing_map = {}
     if os.path.exists(output_path):
-        with open(output_path, "r", encoding="utf-8") as f:
-            existing_data = json.load(f)
-        existing_map = {e["frfr_info_id"]: e for e in existing_data if "frfr_info_id" in e}
-    else:
-        existing_map = {}
+        for e in iter_json_records(output_path, fields=["frfr_info_id", *NASA_FIELDS]):
+            if "frfr_info_id" in e:
+                existing_map[e.pop("frfr_info_id")] = e
 
-    print(f"🔥 화재 항목: {len(fires)}개")
+    print(f"🔥 화재 항목: {total_fires}개")
     print(f"🛰️ NASA 포인트: {len(firms)}개")
-    analyze_data_ranges(fires, firms)
+    analyze_data_ranges(iter_json_records(fire_input_path, fields=MATCH_FIELDS), firms)
 
-    enriched = []
+    # 2) 매칭할 화재 고르기 (위치와 매칭 필드만 보관)
+    pending = []
+    dropped = set()
     matched = 0
     skipped = 0
-    total_processed = 0
-    distance_thresholds = [5.0, 10.0, 20.0, 50.0]
 
-    for fire in fires:
+    for position, fire in enumerate(iter_json_records(fire_input_path, fields=MATCH_FIELDS)):
         fire_id = fire.get("frfr_info_id")
         if fire_id in existing_map:
             print(f"🛑 이미 처리됨 → 건너뜀: {fire_id}")
-            enriched.append(existing_map[fire_id])
             skipped += 1
             continue
 
@@ -108,75 +113,79 @@ def augment_firms_improved():
             fire_date = parse_fire_date(date_str)
             if not fire_date or not lat or not lon:
                 print(f"⚠️ 화재 데이터 부족: lat={lat}, lon={lon}, date={date_str}")
+                dropped.add(position)
                 continue
-
-            total_processed += 1
-            print(f"\n🔍 화재 #{total_processed}: ({lat:.4f}, {lon:.4f}) at {fire_date.date()}")
         except Exception as e:
             print(f"❌ 화재 데이터 파싱 오류: {e}")
+            dropped.add(position)
             continue
 
-        closest = None
-        min_dist = float("inf")
-        candidates = []
-
-        for firm in firms:
-            try:
-                firm_date = datetime.strptime(firm["acq_date"], "%Y-%m-%d")
-                if abs((firm_date - fire_date).days) > 3:
-                    continue
-                firm_lat = float(firm["latitude"])
-                firm_lon = float(firm["longitude"])
-                dist = haversine(lat, lon, firm_lat, firm_lon)
-                if dist <= 50.0:
-                    candidates.append({'firm': firm, 'distance': dist})
-                if dist < min_dist:
-                    min_dist = dist
-                    closest = firm
-            except:
-                continue
-
-        print(f"   📍 후보 {len(candidates)}개, 최단거리: {min_dist:.2f}km")
-
-        matched_threshold = next((t for t in distance_thresholds if min_dist <= t), None)
-        if closest and matched_threshold:
-            fire["brightness"] = float(closest.get("bright_ti4", 0))
-            fire["frp"] = float(closest.get("frp", 0))
-            fire["confidence"] = closest.get("confidence", "")
-            fire["satellite"] = closest.get("satellite", "")
-            fire["instrument"] = closest.get("instrument", "")
-            fire["nasa_distance_km"] = round(min_dist, 2)
-            fire["nasa_match_threshold"] = matched_threshold
+        pending.append((position, fire, lat, lon, fire_date))
+
+    # 매칭할 화재 전체를 한 번에 거리 계산 (±3일, 50km)
+    result = match_fires([(lat, lon, fire_date) for _, _, lat, lon, fire_date in pending], firms)
+    total_processed = len(pending)
+
+    # --scored: 거리·관측일·관측 시각을 함께 본 점수 1위 후보로 매칭 (기본은 최단 거리)
+    chosen = {k: (result.index[k], result.distance[k], None) for k in range(total_processed)}
+    if scored:
+        top, positions = match_fires_scored([fire for _, fire, *_ in pending], firms, k=1)
+        chosen = {k: (-1, float("inf"), None) for k in range(total_processed)}
+        chosen.update({k: (top.index[row, 0], top.distance[row, 0], top.score[row, 0])
+                       for row, k in enumerate(positions)})
+
+    updates = {}   # 입력 위치 → 붙일 NASA 필드
+    for k, (position, _, lat, lon, fire_date) in enumerate(pending):
+        print(f"\n🔍 화재 #{k + 1}: ({lat:.4f}, {lon:.4f}) at {fire_date.date()}")
+        print(f"   📍 후보 {result.candidates[k]}개, 최단거리: {result.distance[k]:.2f}km")
+
+        index, min_dist, score = chosen[k]
+        if index >= 0:
+            closest = firms[index]
+            matched_threshold = float(threshold_bucket(min_dist))
+            update = {
+                "brightness": closest.brightness,
+                "frp": closest.frp,
+                "confidence": closest.get("confidence", ""),
+                "satellite": closest.get("satellite", ""),
+                "instrument": closest.get("instrument", ""),
+                "nasa_distance_km": round(float(min_dist), 2),
+                "nasa_match_threshold": matched_threshold,
+            }
+            if score is not None:
+                update["nasa_match_score"] = round(float(score), 4)
             matched += 1
-            print(f"   ✅ 매칭 성공 (거리: {min_dist:.2f}km, 임계값: {matched_threshold}km)")
+            print(f"   ✅ 매칭 성공 (거리: {min_dist:.2f}km, 임계값: {matched_threshold}km"
+                  f"{f', 점수: {score:.3f}' if score is not None else ''})")
         else:
-            fire["brightness"] = None
-            fire["frp"] = None
-            fire["confidence"] = None
-            fire["satellite"] = None
-            fire["instrument"] = None
-            fire["nasa_distance_km"] = None
-            fire["nasa_match_threshold"] = None
+            update = {field: None for field in NASA_FIELDS if field != "nasa_match_score"}
             print("   ❌ 매칭 실패")
+        updates[position] = update
 
-        enriched.append(fire)
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(enriched, f, ensure_ascii=False, indent=2)
+    # 3) 입력을 다시 한 건씩 읽어 NASA 필드를 붙여 바로 출력
+    stats = {}
+    with JsonRecordWriter(output_path) as writer:
+        for position, fire in enumerate(iter_json_records(fire_input_path)):
+            if position in dropped:
+                continue
+            fire.update(updates.get(position) or existing_map.get(fire.get("frfr_info_id"), {}))
+            writer.write(fire)
+            t = fire.get("nasa_match_threshold")
+            if t:
+                stats[t] = stats.get(t, 0) + 1
 
     print(f"\n✅ 병합 완료 → {output_path}")
     print(f"📌 매칭된 화재: {matched}/{total_processed}개 ({matched/max(total_processed,1)*100:.1f}%)")
     print(f"⏭️ 기존 건너뜀: {skipped}개")
 
-    stats = {}
-    for f in enriched:
-        t = f.get("nasa_match_threshold")
-        if t:
-            stats[t] = stats.get(t, 0) + 1
     if stats:
         print("📊 거리별 매칭 통계:")
         for k in sorted(stats):
             print(f"   {k}km 이내: {stats[k]}개")
 
 if __name__ == "__main__":
-    augment_firms_improved()
+    parser = argparse.ArgumentParser(description="화재 데이터에 NASA FIRMS 관측점 병합")
+    parser.add_argument("--scored", action="store_true",
+                        help="최단 거리 대신 거리·관측일·관측 시각 점수 1위 관측점으로 매칭 (firms_matcher.py)")
+    args = parser.parse_args()
+    augment_firms_improved(scored=args.scored)
@@ -1,10 +1,17 @@
+import argparse
+import asyncio
 import json
-import requests
-import time
 import os
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 import pytz  # 시간대 처리를 위해 추가
+from concurrent.futures import ThreadPoolExecutor
+
+from fetch_forest_data import content_hash
+from http_client import get_client
+from json_stream import iter_json_records, load_records, write_json_if_changed
+from weather_cache import get_weather_cache
+from weather_snap import get_snapper
 
 # .env 파일 로드
 dotenv_path = os.path.abspath(os.path.join(__file__, "..", "..", ".env"))
@@ -41,8 +48,12 @@ def parse_datetime(datetime_str):
         return None
 
 def get_meteostat_hourly(lat, lon, target_datetime):
-    """시간별 Meteostat 데이터 수집"""
+    """시간별 Meteostat 데이터 수집 (하루치 응답의 모든 시간을 영구 캐시에 저장)"""
     date_str = target_datetime.strftime("%Y-%m-%d")
+    cache = get_weather_cache()
+    cached = cache.get("meteostat", "hourly", lat, lon, target_datetime)
+    if cached is not None:
+        return cached
     
     url = f"https://meteostat.p.rapidapi.com/point/hourly"
     params = {
@@ -59,24 +70,32 @@ def get_meteostat_hourly(lat, lon, target_datetime):
     }
     
     try:
-        res = requests.get(url, headers=headers, params=params)
+        res = get_client().get(url, headers=headers, params=params)
         res.raise_for_status()
         response_data = res.json()
         data = response_data.get("data", [])
         
         if not data:
-            return {"temp": None, "wspd": None, "wdir": None}
+            empty = {"temp": None, "wspd": None, "wdir": None}
+            cache.put("meteostat", "hourly", lat, lon, target_datetime, empty)
+            return empty
         
         # 목표 시간에 가장 가까운 데이터 찾기
         target_hour = target_datetime.hour
         best_match = None
         min_diff = float('inf')
+        hourly = {}  # 응답의 모든 시간 값 → 아래에서 캐시에 한 번에 저장
         
         for hour_data in data:
             time_str = hour_data.get("time", "")
             if time_str:
                 try:
                     hour_time = datetime.strptime(time_str, "%Y-%m-%d %H:%M:%S")
+                    hourly[target_datetime.replace(hour=hour_time.hour)] = {
+                        "temp": hour_data.get("temp"),
+                        "wspd": convert_wind_speed_to_ms(hour_data.get("wspd")),
+                        "wdir": hour_data.get("wdir")
+                    }
                     diff = abs(hour_time.hour - target_hour)
                     if diff < min_diff:
                         min_diff = diff
@@ -85,13 +104,17 @@ def get_meteostat_hourly(lat, lon, target_datetime):
                     continue
         
         if best_match:
-            return {
+            weather = {
                 "temp": best_match.get("temp"),
                 "wspd": convert_wind_speed_to_ms(best_match.get("wspd")),  # km/h → m/s 변환
                 "wdir": best_match.get("wdir")
             }
         else:
-            return {"temp": None, "wspd": None, "wdir": None}
+            weather = {"temp": None, "wspd": None, "wdir": None}
+        # 목표 시간이 응답에 없으면 가장 가까운 시간 값을 목표 시간 키로도 저장
+        hourly[target_datetime] = weather
+        cache.put_many("meteostat", "hourly", lat, lon, hourly)
+        return weather
             
     except Exception as e:
         print(f"❌ Meteostat API 오류 ({date_str}): {e}")
@@ -99,6 +122,11 @@ def get_meteostat_hourly(lat, lon, target_datetime):
 
 def get_weatherbit_hourly_fallback(lat, lon, target_datetime):
     """Weatherbit hourly API로 기온, 풍속, 풍향 데이터 수집 (Meteostat fallback용)"""
+    cache = get_weather_cache()
+    cached = cache.get("weatherbit", "hourly", lat, lon, target_datetime)
+    if cached is not None:
+        return cached
+
     # UTC로 변환
     utc_datetime = target_datetime.astimezone(pytz.UTC)
     
@@ -116,20 +144,22 @@ def get_weatherbit_hourly_fallback(lat, lon, target_datetime):
     }
     
     try:
-        res = requests.get(url, params=params)
+        res = get_client().get(url, params=params)
         res.raise_for_status()
         response_data = res.json()
         data = response_data.get("data", [])
         
         if data:
             weather_data = data[0]
-            return {
+            weather = {
                 "temp": weather_data.get("temp"),
                 "wspd": weather_data.get("wind_spd"),  # 이미 m/s 단위
                 "wdir": weather_data.get("wind_dir")
             }
         else:
-            return {"temp": None, "wspd": None, "wdir": None}
+            weather = {"temp": None, "wspd": None, "wdir": None}
+        cache.put("weatherbit", "hourly", lat, lon, target_datetime, weather)
+        return weather
             
     except Exception as e:
         print(f"❌ Weatherbit Hourly API 오류: {e}")
@@ -138,6 +168,10 @@ def get_weatherbit_hourly_fallback(lat, lon, target_datetime):
 def get_weatherbit_daily(lat, lon, target_datetime):
     """일별 Weatherbit 데이터 수집 (강수량, 습도)"""
     date_str = target_datetime.strftime("%Y-%m-%d")
+    cache = get_weather_cache()
+    cached = cache.get("weatherbit", "daily", lat, lon, date_str)
+    if cached is not None:
+        return cached
     next_date = target_datetime + timedelta(days=1)
     end_date_str = next_date.strftime("%Y-%m-%d")
     
@@ -151,19 +185,21 @@ def get_weatherbit_daily(lat, lon, target_datetime):
     }
     
     try:
-        res = requests.get(url, params=params)
+        res = get_client().get(url, params=params)
         res.raise_for_status()
         response_data = res.json()
         data = response_data.get("data", [])
         
         if data:
             weather_data = data[0]
-            return {
+            weather = {
                 "precip": weather_data.get("precip"),
                 "rhum": weather_data.get("rh")
             }
         else:
-            return {"precip": None, "rhum": None}
+            weather = {"precip": None, "rhum": None}
+        cache.put("weatherbit", "daily", lat, lon, date_str, weather)
+        return weather
             
     except Exception as e:
         print(f"❌ Weatherbit Daily API 오류 ({target_datetime.strftime('%Y-%m-%d')}): {e}")
@@ -203,25 +239,158 @@ def convert_wind_speed_to_ms(wspd_kmh):
         return None
     return wspd_kmh / 3.6
 
-def augment_weather():
+HOURLY_FIELDS = ["temp", "wspd", "wdir"]
+DAILY_FIELDS = ["precip", "rhum"]
+WEATHER_FIELDS = HOURLY_FIELDS + DAILY_FIELDS
+# 기존 출력에서 읽는 필드 (needs_weather_update 비교용 좌표·발생일시 + 기상)
+EXISTING_FIELDS = ["frfr_lctn_ycrd", "frfr_lctn_xcrd", "frfr_frng_dtm", *WEATHER_FIELDS]
+WEATHER_CONCURRENCY = 8  # 비동기 모드에서 동시에 처리할 화재 수 (실제 요청 속도는 http_client 호스트 제한)
+
+def apply_missing_fields(fire, weather, fields):
+    """None인 필드만 업데이트하고 채운 필드 수 반환"""
+    filled = 0
+    for field in fields:
+        if fire.get(field) is None and weather.get(field) is not None:
+            fire[field] = weather[field]
+            filled += 1
+    return filled
+
+def enrich_fire(fire, query_lat, query_lon, target_datetime, need_meteostat, need_weatherbit_daily):
+    """순차 모드: Meteostat → (빈 필드가 있으면) Weatherbit hourly → Weatherbit daily
+
+    반환값: (fallback이 필요했던 필드 목록, fallback으로 채운 필드 수)
+    """
+    missing_fields, fallback_used = [], 0
+
+    # 1. Meteostat으로 기온, 풍속, 풍향 시도
+    if need_meteostat:
+        apply_missing_fields(fire, get_meteostat_hourly(query_lat, query_lon, target_datetime), HOURLY_FIELDS)
+
+        # 2. Meteostat에서 못 가져온 데이터가 있으면 Weatherbit hourly로 fallback (이미 m/s 단위)
+        missing_fields = [field for field in HOURLY_FIELDS if fire.get(field) is None]
+        if missing_fields:
+            weather_fallback = get_weatherbit_hourly_fallback(query_lat, query_lon, target_datetime)
+            fallback_used = apply_missing_fields(fire, weather_fallback, missing_fields)
+
+    # 3. Weatherbit daily로 강수량, 습도 수집
+    if need_weatherbit_daily:
+        apply_missing_fields(fire, get_weatherbit_daily(query_lat, query_lon, target_datetime), DAILY_FIELDS)
+
+    return missing_fields, fallback_used
+
+async def enrich_fire_async(fire, query_lat, query_lon, target_datetime, need_meteostat, need_weatherbit_daily):
+    """비동기 모드: 시간별(Meteostat → fallback)과 일별(Weatherbit daily)을 동시에 진행
+
+    두 경로가 채우는 필드가 겹치지 않으므로 병합 결과는 순차 모드와 같다.
+    """
+    async def hourly():
+        if not need_meteostat:
+            return [], 0
+        weather1 = await asyncio.to_thread(get_meteostat_hourly, query_lat, query_lon, target_datetime)
+        apply_missing_fields(fire, weather1, HOURLY_FIELDS)
+
+        missing_fields = [field for field in HOURLY_FIELDS if fire.get(field) is None]
+        if not missing_fields:
+            return [], 0
+        weather_fallback = await asyncio.to_thread(get_weatherbit_hourly_fallback, query_lat, query_lon, target_datetime)
+        return missing_fields, apply_missing_fields(fire, weather_fallback, missing_fields)
+
+    async def daily():
+        if need_weatherbit_daily:
+            weather2 = await asyncio.to_thread(get_weatherbit_daily, query_lat, query_lon, target_datetime)
+            apply_missing_fields(fire, weather2, DAILY_FIELDS)
+
+    (missing_fields, fallback_used), _ = await asyncio.gather(hourly(), daily())
+    return missing_fields, fallback_used
+
+def record_hash(fire):
+    """화재 원본 레코드 하나의 내용 해시 (증분 모드에서 바뀐 화재 판별용)"""
+    return content_hash([fire])
+
+def load_json(path, default=None):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            return json.load(f)
+        except ValueError:
+            return default
+
+def find_dirty_ids(fires, existing_map, state, change_set, snapshot_hash, source_hashes):
+    """다시 보강해야 할 화재 ID 집합과 판별 근거 반환 (판별 불가면 (None, 사유))
+
+    1) 출력이 이미 현재 스냅샷 기준이면 변경 없음
+    2) 출력이 직전 스냅샷 기준이고 변경 세트가 그 다음 스냅샷이면 변경 세트의 추가·갱신 ID
+    3) 아니면 레코드별 내용 해시 비교
+    어느 경우든 출력에 없는 화재와 기상 값이 비어 있는 화재(재시도 대상)는 포함한다.
+    """
+    if not existing_map or not state:
+        return None, "이전 상태 없음"
+
+    if state.get("snapshot_hash") == snapshot_hash:
+        dirty, reason = set(), "스냅샷 해시 동일"
+    elif (change_set and change_set.get("hash") == snapshot_hash
+          and change_set.get("previous_hash") == state.get("snapshot_hash")):
+        dirty, reason = set(change_set.get("added", [])) | set(change_set.get("updated", [])), "변경 세트"
+    elif state.get("source_hashes"):
+        previous = state["source_hashes"]
+        dirty = {fire_id for fire_id, h in source_hashes.items() if previous.get(fire_id) != h}
+        reason = "레코드 해시 비교"
+    else:
+        return None, "이전 해시 없음"
+
+    for fire in fires:
+        fire_id = fire.get("frfr_info_id")
+        existing_fire = existing_map.get(fire_id)
+        if existing_fire is None or not has_complete_weather_data(existing_fire):
+            dirty.add(fire_id)
+    return dirty, reason
+
+async def enrich_all_async(jobs, concurrency=WEATHER_CONCURRENCY):
+    """여러 화재를 동시에 보강 (결과는 jobs 순서대로)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    # 화재마다 시간별·일별 두 요청이 동시에 나가므로 스레드도 그만큼 확보
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=concurrency * 2))
+
+    async def run(job):
+        async with semaphore:
+            return await enrich_fire_async(*job)
+
+    return await asyncio.gather(*(run(job) for job in jobs))
+
+def augment_weather(async_mode=False, concurrency=WEATHER_CONCURRENCY, incremental=False):
     root_dir = os.path.abspath(os.path.join(__file__, "..", ".."))
     input_path = os.path.join(root_dir, "public", "data", "korea_fire_live.json")
     output_path = os.path.join(root_dir, "public", "data", "korea_fire_weather.json")
+    change_set_path = os.path.join(root_dir, "public", "data", "korea_fire_live.changes.json")
+    # 출력이 어떤 스냅샷·레코드 기준으로 만들어졌는지 기록 (증분 모드용, 배포하지 않으므로 기상 캐시 옆에 보관)
+    state_path = os.path.join(root_dir, "data", "weather_cache", "korea_fire_weather.state.json")
+    # 프론트가 korea_fire_weather.json 캐시 버전(?v=)으로 쓰는 출력 내용 해시
+    version_path = os.path.join(root_dir, "public", "data", "korea_fire_weather.version.json")
 
     if not os.path.exists(input_path):
         print(f"❌ 입력 파일 없음: {input_path}")
         return
 
-    with open(input_path, "r", encoding="utf-8") as f:
-        fires = json.load(f)
+    # 실시간 스냅샷(최근 7일)은 작고 내용 해시에 전체가 필요하므로 목록으로 읽음
+    fires = load_records(input_path)
 
-    # 기존 결합된 데이터 로드
+    # 기존 결합된 데이터는 재수집 판단에 쓰는 좌표·발생일시와 기상 필드만 보관
+    existing_map = {}
     if os.path.exists(output_path):
-        with open(output_path, "r", encoding="utf-8") as f:
-            existing_data = json.load(f)
-        existing_map = {d["frfr_info_id"]: d for d in existing_data}
-    else:
-        existing_map = {}
+        for d in iter_json_records(output_path, fields=["frfr_info_id", *EXISTING_FIELDS]):
+            existing_map[d.pop("frfr_info_id")] = d
+
+    snapshot_hash = content_hash(fires)
+    source_hashes = {fire.get("frfr_info_id"): record_hash(fire) for fire in fires}
+    dirty_ids = None
+    if incremental:
+        dirty_ids, reason = find_dirty_ids(fires, existing_map, load_json(state_path, {}),
+                                           load_json(change_set_path), snapshot_hash, source_hashes)
+        if dirty_ids is None:
+            print(f"🧮 증분 모드 불가 ({reason}) → 전체 처리")
+        else:
+            print(f"🧮 증분 모드 ({reason}): 전체 {len(fires)}개 중 {len(dirty_ids)}개만 처리")
 
     # 한국 시간대로 현재 시간 설정
     kst = pytz.timezone('Asia/Seoul')
@@ -239,9 +408,13 @@ def augment_weather():
     updated = 0
     fallback_used = 0
     realtime_count = 0  # 실시간 데이터 카운트
-    cache_meteostat = {}
-    cache_weatherbit_hourly = {}
-    cache_weatherbit_daily = {}
+    weather_cache = get_weather_cache()  # 실행 간 공유되는 영구 캐시 (weather_cache.py)
+    snapper = get_snapper()              # 가까운 화재끼리 같은 기상 조회 좌표 사용 (weather_snap.py)
+    if snapper.mode != "none":
+        print(f"📍 기상 조회 좌표 스냅: {snapper.mode}")
+    if async_mode:
+        print(f"⚡ 비동기 모드: 화재 {concurrency}개씩 동시 처리 (제공자별 속도 제한 유지)")
+    async_jobs = []
 
     for i, fire in enumerate(fires, 1):
         fire_id = fire.get('frfr_info_id')
@@ -249,6 +422,12 @@ def augment_weather():
         lon = fire.get("frfr_lctn_xcrd")
         datetime_str = fire.get("frfr_frng_dtm", "")
 
+        # 증분 모드: 바뀌지 않은 화재는 기존 결과를 그대로 사용 (로그도 생략)
+        if dirty_ids is not None and fire_id not in dirty_ids:
+            enriched.append({**fire, **{field: existing_map[fire_id].get(field) for field in WEATHER_FIELDS}})
+            skipped += 1
+            continue
+
         print(f"[{i}/{len(fires)}] {fire_id} - {datetime_str}", end=" ")
 
         # 기존 데이터 확인
@@ -266,8 +445,9 @@ def augment_weather():
                 
                 fire = updated_fire
             else:
+                # 상태·진화일시 등 최신 값에 기존 기상 데이터만 얹음
                 print("✅ 기상 데이터 완료 → 기존 데이터 사용")
-                enriched.append(existing_fire)
+                enriched.append({**fire, **{field: existing_fire.get(field) for field in WEATHER_FIELDS}})
                 skipped += 1
                 continue
 
@@ -299,91 +479,64 @@ def augment_weather():
         else:
             print(f"📊 과거 데이터 ({hours_diff:.1f}시간 전)", end=" ")
 
-        # 🌤️ 기상 데이터 수집
-        cache_key = (lat, lon, target_datetime.strftime("%Y-%m-%d %H"))
-        daily_cache_key = (lat, lon, target_datetime.strftime("%Y-%m-%d"))
-        
+        # 🌤️ 기상 데이터 수집 (스냅된 좌표 기준)
+        query_lat, query_lon = snapper.snap(lat, lon)
         need_meteostat = any(fire.get(field) is None for field in ["temp", "wspd", "wdir"])
         need_weatherbit_daily = any(fire.get(field) is None for field in ["precip", "rhum"])
 
         if need_meteostat or need_weatherbit_daily:
-            if hours_diff < 1:
-                print("🌤️ 실시간 수집중...", end="")
+            job = (fire, query_lat, query_lon, target_datetime, need_meteostat, need_weatherbit_daily)
+            api_calls += 1
+            updated += 1
+
+            if async_mode:
+                # 결과 목록에는 지금 넣어 두고 (순서 유지) 아래에서 한꺼번에 채움
+                print("⏳ 대기열 추가")
+                async_jobs.append(job)
             else:
-                print("🌤️ 수집중...", end="")
-            
-            # 1. Meteostat으로 기온, 풍속, 풍향 시도
-            if need_meteostat:
-                if cache_key in cache_meteostat:
-                    weather1 = cache_meteostat[cache_key]
+                if hours_diff < 1:
+                    print("🌤️ 실시간 수집중...", end="")
                 else:
-                    weather1 = get_meteostat_hourly(lat, lon, target_datetime)
-                    cache_meteostat[cache_key] = weather1
-                
-                # None인 필드만 업데이트
-                for field in ["temp", "wspd", "wdir"]:
-                    if fire.get(field) is None and weather1.get(field) is not None:
-                        fire[field] = weather1[field]
-                
-                # 2. Meteostat에서 못 가져온 데이터가 있으면 Weatherbit hourly로 fallback
-                missing_fields = [field for field in ["temp", "wspd", "wdir"] 
-                                if fire.get(field) is None]
-                
+                    print("🌤️ 수집중...", end="")
+                missing_fields, filled = enrich_fire(*job)
                 if missing_fields:
                     print(f"📡 Fallback({','.join(missing_fields)})", end="")
-                    
-                    if cache_key in cache_weatherbit_hourly:
-                        weather_fallback = cache_weatherbit_hourly[cache_key]
-                    else:
-                        weather_fallback = get_weatherbit_hourly_fallback(lat, lon, target_datetime)
-                        cache_weatherbit_hourly[cache_key] = weather_fallback
-                    
-                    # Weatherbit은 이미 m/s 단위이므로 변환 불필요
-                    
-                    # 여전히 None인 필드만 업데이트
-                    for field in missing_fields:
-                        if fire.get(field) is None and weather_fallback.get(field) is not None:
-                            fire[field] = weather_fallback[field]
-                            fallback_used += 1
-
-            # 3. Weatherbit daily로 강수량, 습도 수집
-            if need_weatherbit_daily:
-                if daily_cache_key in cache_weatherbit_daily:
-                    weather2 = cache_weatherbit_daily[daily_cache_key]
-                else:
-                    weather2 = get_weatherbit_daily(lat, lon, target_datetime)
-                    cache_weatherbit_daily[daily_cache_key] = weather2
-                
-                # None인 필드만 업데이트
-                for field in ["precip", "rhum"]:
-                    if fire.get(field) is None and weather2.get(field) is not None:
-                        fire[field] = weather2[field]
-
-            api_calls += 1
-            updated += 1
-            print(" ✅ 완료")
-            
-            # 실시간 데이터일수록 더 짧은 대기 시간
-            if hours_diff < 1:
-                time.sleep(1.0)  # 실시간 데이터는 1초 대기
-            else:
-                time.sleep(1.5)  # 과거 데이터는 1.5초 대기
+                fallback_used += filled
+                print(" ✅ 완료")
         else:
             print("✅ 기상 데이터 이미 완료")
 
         enriched.append(fire)
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(enriched, f, ensure_ascii=False, indent=2)
+    if async_jobs:
+        print(f"\n⚡ {len(async_jobs)}개 화재 기상 데이터 동시 수집 중...")
+        results = asyncio.run(enrich_all_async(async_jobs, concurrency))
+        for job, (missing_fields, filled) in zip(async_jobs, results):
+            if missing_fields:
+                print(f"📡 {job[0].get('frfr_info_id')} Fallback({','.join(missing_fields)})")
+            fallback_used += filled
+
+    written = write_json_if_changed(output_path, enriched)
+    write_json_if_changed(version_path, {"hash": content_hash(enriched), "source_hash": snapshot_hash})
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    write_json_if_changed(state_path, {"snapshot_hash": snapshot_hash, "source_hashes": source_hashes})
 
     print(f"\n🎉 실시간 화재 모니터링 처리 완료!")
-    print(f"📁 저장 위치: {output_path}")
+    print(f"📁 저장 위치: {output_path}" + ("" if written else " (내용 동일 → 재작성 생략)"))
     print(f"📊 총 {len(enriched)}개 데이터 처리")
     print(f"🌐 {api_calls}개 항목에 기상 데이터 추가")
     print(f"🔄 {updated}개 항목 업데이트됨")
     print(f"📡 {fallback_used}개 필드에 Weatherbit fallback 사용")
     print(f"🚨 {realtime_count}개 실시간 화재 데이터 처리")
     print(f"⏭️ {skipped}개 항목 건너뜀")
+    weather_cache.print_stats()
 
 if __name__ == "__main__":
-    augment_weather()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="실시간 화재 데이터 기상 정보 결합")
+    parser.add_argument("--async", dest="async_mode", action="store_true", help="화재·제공자 요청을 동시에 처리")
+    parser.add_argument("--concurrency", type=int, default=WEATHER_CONCURRENCY, help="비동기 모드 동시 처리 화재 수")
+    parser.add_argument("--incremental", action="store_true", help="바뀐 화재만 보강해서 기존 결과에 반영")
+    args = parser.parse_args()
+
+    augment_weather(async_mode=args.async_mode, concurrency=args.concurrency, incremental=args.incremental)
+    get_client().print_metrics()
\ No newline at end of file
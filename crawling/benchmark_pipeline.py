@@ -0,0 +1,110 @@
+# 오프라인 파이프라인 벤치마크
+#   fetch_forest_data → augment_weather → fetch_firms_data → augment_firms 를
+#   임시 작업 트리에서 로컬 대역 서버(mock_server.py) 또는 녹화된 카세트를 상대로 실행하고 단계별 시간을 잰다.
+#
+#   python benchmark_pipeline.py --latency 0.05 --rate 10
+#   python benchmark_pipeline.py --cassettes cassettes --strict   # 녹화본만으로 재생
+import argparse
+import glob
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from mock_server import start_server
+
+CRAWLING_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CRAWLING_DIR)
+STAGES = ["fetch_forest_data.py", "augment_weather.py", "fetch_firms_data.py", "augment_firms.py"]
+SHARED_SCRIPTS = ["grid.py"]   # 크롤러가 함께 쓰는 scripts/ 모듈
+
+def prepare_workdir(workdir, with_data=False):
+    """크롤러 코드를 임시 트리로 복사 (실제 public/data는 건드리지 않음)"""
+    crawling_copy = os.path.join(workdir, "crawling")
+    os.makedirs(crawling_copy)
+    for path in glob.glob(os.path.join(CRAWLING_DIR, "*.py")):
+        shutil.copy2(path, crawling_copy)
+    # weather_snap.py가 ../scripts/grid.py를 import함 (격자 계산 공통 모듈)
+    scripts_copy = os.path.join(workdir, "scripts")
+    os.makedirs(scripts_copy)
+    for name in SHARED_SCRIPTS:
+        shutil.copy2(os.path.join(ROOT_DIR, "scripts", name), scripts_copy)
+
+    data_copy = os.path.join(workdir, "public", "data")
+    if with_data:
+        shutil.copytree(os.path.join(ROOT_DIR, "public", "data"), data_copy)
+    else:
+        os.makedirs(data_copy)
+    return crawling_copy
+
+def run_stage(script, cwd, env, log, args=()):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, script, *args], cwd=cwd, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    elapsed = time.perf_counter() - started
+    log.write(f"\n===== {script} (exit {result.returncode}, {elapsed:.2f}s) =====\n")
+    log.write(result.stdout)
+    return result.returncode, elapsed
+
+def benchmark(latency=0.0, jitter=0.0, rate=0, cassette_dir=None, strict=False, with_data=False, keep=False,
+              stage_args=None):
+    server, base_url = start_server(latency=latency, jitter=jitter, rate=rate,
+                                    cassette_dir=cassette_dir, strict=strict)
+    workdir = tempfile.mkdtemp(prefix="wildfire_bench_")
+    crawling_copy = prepare_workdir(workdir, with_data)
+
+    env = dict(os.environ)
+    env.update({
+        "WILDFIRE_HTTP_MODE": "replay",
+        "WILDFIRE_HTTP_OVERRIDE": base_url,
+        "METEOSTAT_KEY": env.get("METEOSTAT_KEY", "offline"),
+        "WEATHERBIT_KEY": env.get("WEATHERBIT_KEY", "offline"),
+        "FIRMS_KEY": env.get("FIRMS_KEY", "offline"),
+        "PYTHONIOENCODING": "utf-8",
+    })
+
+    print(f"🧪 대역 서버: {base_url} (지연 {latency}s ±{jitter}s, 초당 {rate or '∞'}회"
+          f"{', 카세트 ' + cassette_dir if cassette_dir else ''})")
+    print(f"📂 작업 트리: {workdir}")
+
+    log_path = os.path.join(workdir, "benchmark.log")
+    results = []
+    with open(log_path, "w", encoding="utf-8") as log:
+        for script in STAGES:
+            requests_before = sum(server.requests.values())
+            code, elapsed = run_stage(script, crawling_copy, env, log, (stage_args or {}).get(script, ()))
+            calls = sum(server.requests.values()) - requests_before
+            results.append((script, code, elapsed, calls))
+            print(f"{'✅' if code == 0 else '❌'} {script:<24} {elapsed:7.2f}s  요청 {calls}회")
+            if code != 0:
+                print(f"⚠️ 단계 실패 → 로그 확인: {log_path}")
+                break
+
+    server.shutdown()
+    total = sum(elapsed for _, _, elapsed, _ in results)
+    print(f"⏱️ 전체 {total:.2f}s")
+
+    if keep or any(code != 0 for _, code, _, _ in results):
+        print(f"📝 로그: {log_path}")
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="크롤링 파이프라인 오프라인 벤치마크")
+    parser.add_argument("--latency", type=float, default=0.0, help="대역 서버 응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="지연 편차 (± 초)")
+    parser.add_argument("--rate", type=int, default=0, help="대역 서버 호스트별 초당 허용 요청 수 (0이면 무제한)")
+    parser.add_argument("--cassettes", default=None, help="재생할 카세트 디렉터리 (WILDFIRE_HTTP_MODE=record로 녹화)")
+    parser.add_argument("--strict", action="store_true", help="카세트에 없는 요청은 합성하지 않고 404")
+    parser.add_argument("--with-data", action="store_true", help="현재 public/data를 복사해서 증분 실행으로 측정")
+    parser.add_argument("--keep", action="store_true", help="작업 트리와 로그를 남김")
+    parser.add_argument("--async-weather", action="store_true", help="augment_weather.py를 --async 모드로 실행")
+    args = parser.parse_args()
+
+    stage_args = {"augment_weather.py": ["--async"]} if args.async_weather else {}
+    results = benchmark(args.latency, args.jitter, args.rate, args.cassettes, args.strict, args.with_data, args.keep,
+                        stage_args)
+    sys.exit(0 if all(code == 0 for _, code, _, _ in results) else 1)
@@ -1,17 +1,10 @@
 import os
-import requests
 import csv
-import json
 from dotenv import load_dotenv
 
-def load_existing_data(path):
-    if not os.path.exists(path):
-        return []
-    with open(path, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except:
-            return []
+from firms_dedup import open_store_index
+from firms_store import FirmsPartitionStore
+from http_client import get_client
 
 def fetch_firms_csv():
     dotenv_path = os.path.abspath(os.path.join(__file__, "..", "..", ".env"))
@@ -30,7 +23,7 @@ def fetch_firms_csv():
     print(f"🌐 CSV 요청: {url}")
 
     try:
-        response = requests.get(url, timeout=10)
+        response = get_client().get(url, timeout=10)
         response.raise_for_status()
         decoded = response.content.decode("utf-8").splitlines()
         reader = csv.DictReader(decoded)
@@ -38,28 +31,24 @@ def fetch_firms_csv():
 
         print(f"📥 수신: {len(new_data)}건")
 
-        # 기존 데이터 로드
+        # 날짜별 파티션 저장소 (최초 1회 기존 JSON 아카이브 이전)
         base_dir = os.path.abspath(os.path.join(__file__, "..", ".."))
-        save_path = os.path.join(base_dir, "public", "data", "nasa_firms_korea.json")
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        existing_data = load_existing_data(save_path)
+        store = FirmsPartitionStore("korea")
+        store.import_legacy_json(os.path.join(base_dir, "public", "data", "nasa_firms_korea.json"))
 
-        # 중복 제거 기준: JSON 문자열화 후 비교
-        existing_set = {json.dumps(entry, sort_keys=True) for entry in existing_data}
-        unique_new_data = [
-            entry for entry in new_data
-            if json.dumps(entry, sort_keys=True) not in existing_set
-        ]
-
-        combined = existing_data + unique_new_data
-        with open(save_path, "w", encoding="utf-8") as f:
-            json.dump(combined, f, ensure_ascii=False, indent=2)
+        # 중복 제거 기준: (위도, 경도, 관측일, 관측시각, 위성) 영구 인덱스
+        with open_store_index(store) as index:
+            unique_new_data = index.add_new(new_data)
+            changed_dates = store.append(unique_new_data)
+            index.commit(store.total_count())
 
         print(f"✅ 중복 제거 후 새로 추가된 항목: {len(unique_new_data)}건")
-        print(f"💾 총 저장 수: {len(combined)}건 → {save_path}")
+        print(f"🗂️ 갱신된 파티션: {', '.join(changed_dates) if changed_dates else '없음'}")
+        print(f"💾 총 저장 수: {store.total_count()}건 → {store.path}")
 
     except Exception as e:
         print("❌ 오류 발생:", e)
 
 if __name__ == "__main__":
     fetch_firms_csv()
+    get_client().print_metrics()
@@ -1,98 +1,157 @@
-import requests
+import hashlib
 import json
 import os
+import math
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-import time
 
-def fetch_forest_data():
-    today = datetime.today()
-    start = today - timedelta(days=6)
+from http_client import get_client
+from json_stream import iter_json_records, write_json_if_changed, write_json_records
 
-    url = "https://fd.forest.go.kr/ffas/pubConn/occur/getPublicShowFireInfoList.do"
-    headers = {"Content-Type": "application/json", "User-Agent": "Mozilla/5.0"}
+FOREST_HOST = "fd.forest.go.kr"
+FOREST_API_URL = f"https://{FOREST_HOST}/ffas/pubConn/occur/getPublicShowFireInfoList.do"
+FOREST_HEADERS = {"Content-Type": "application/json", "User-Agent": "Mozilla/5.0"}
 
-    print(f"📦 요청 기간: {start.strftime('%Y-%m-%d')} ~ {today.strftime('%Y-%m-%d')}")
+PER_PAGE = 30           # 산림청 사이트 최대값에 맞춤
+MAX_WORKERS = 4         # 동시 요청 워커 수
+REQUESTS_PER_SECOND = 4 # 산림청 서버 부하 방지용 초당 요청 수 (http_client 호스트 제한)
 
-    try:
-        # 🔄 모든 페이지의 데이터를 수집
-        all_fires = []
-        current_page = 1
-        max_pages = 10  # 안전장치: 최대 10페이지까지만 시도
-        
-        while current_page <= max_pages:
-            payload = {
-                "param": {
-                    "startDtm": start.strftime("%Y%m%d"),
-                    "endDtm": today.strftime("%Y%m%d"),
-                    "regionCode": "",
-                    "issuCode": "",
-                    "prgrsCode": "",
-                    "sttnMapCheckFlag": "",
-                    "perPage": 30,  # 산림청 사이트 최대값에 맞춤
-                    "perPageList": 10,
-                    "pageListStart": 0,
-                    "pageListEnd": 10,
-                    "currentPage": current_page,
-                    "lastPage": 1,
-                    "totalCount": 30,
-                    "total_count": 30,
-                    "last_page": 1
-                },
-                "pager": {
-                    "perPage": 30,
-                    "perPageList": 10,
-                    "pageListStart": 0,
-                    "pageListEnd": 10,
-                    "currentPage": current_page,
-                    "lastPage": 1,
-                    "totalCount": 30,
-                    "total_count": 30,
-                    "last_page": 1
-                }
-            }
+def build_payload(start_dtm, end_dtm, current_page, per_page=PER_PAGE):
+    """getPublicShowFireInfoList.do 요청 본문 생성 (날짜는 YYYYMMDD)"""
+    pager = {
+        "perPage": per_page,
+        "perPageList": 10,
+        "pageListStart": 0,
+        "pageListEnd": 10,
+        "currentPage": current_page,
+        "lastPage": 1,
+        "totalCount": per_page,
+        "total_count": per_page,
+        "last_page": 1
+    }
+    param = {
+        "startDtm": start_dtm,
+        "endDtm": end_dtm,
+        "regionCode": "",
+        "issuCode": "",
+        "prgrsCode": "",
+        "sttnMapCheckFlag": "",
+        **pager
+    }
+    return {"param": param, "pager": dict(pager)}
 
+def extract_total_count(data):
+    """응답에서 전체 건수 추출 (없으면 None)"""
+    candidates = [data.get("totalCount"), data.get("total_count")]
+    for key in ("param", "pager"):
+        if isinstance(data.get(key), dict):
+            candidates.append(data[key].get("totalCount"))
+            candidates.append(data[key].get("total_count"))
+
+    for value in candidates:
+        try:
+            if value is not None:
+                return int(value)
+        except (ValueError, TypeError):
+            continue
+    return None
+
+def fetch_page(start_dtm, end_dtm, current_page, per_page=PER_PAGE, timeout=10):
+    """한 페이지 요청 후 JSON 응답 반환 (재시도 후에도 HTTP 오류면 예외 발생)"""
+    payload = build_payload(start_dtm, end_dtm, current_page, per_page)
+    response = get_client().post(FOREST_API_URL, headers=FOREST_HEADERS, json=payload, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+def fetch_all_pages_sequential(start_dtm, end_dtm, per_page=PER_PAGE, first_page=None):
+    """전체 건수를 알 수 없을 때: 빈 페이지 또는 마지막 페이지까지 순차 수집"""
+    all_fires = []
+    current_page = 1
+    data = first_page
+
+    while True:
+        if data is None:
             print(f"📄 페이지 {current_page} 요청 중...")
+            data = fetch_page(start_dtm, end_dtm, current_page, per_page)
 
-            response = requests.post(url, headers=headers, json=payload, timeout=10)
-            
-            # 응답 상태 확인
-            if response.status_code != 200:
-                print(f"❌ API 응답 오류: {response.status_code}")
-                break
-                
-            data = response.json()
-            
-            # 응답 구조 확인 (첫 번째 페이지에서만)
-            if current_page == 1:
-                print(f"🔍 API 응답 구조 확인:")
-                print(f"   - 응답 키들: {list(data.keys())}")
-                if 'totalCount' in data:
-                    print(f"   - totalCount: {data['totalCount']}")
-                if 'total_count' in data:
-                    print(f"   - total_count: {data['total_count']}")
-                if 'param' in data and isinstance(data['param'], dict):
-                    print(f"   - param totalCount: {data['param'].get('totalCount', 'N/A')}")
-            
-            # 현재 페이지의 화재 데이터 추출
-            page_fires = data.get("frfrInfoList", [])
-            
-            if not page_fires:
-                print(f"📄 페이지 {current_page}: 데이터 없음 - 수집 종료")
-                break
-            
-            all_fires.extend(page_fires)
-            print(f"✅ 페이지 {current_page}: {len(page_fires)}건 수집 (누적: {len(all_fires)}건)")
-            
-            # 더 이상 데이터가 없으면 종료
-            if len(page_fires) < 30:  # perPage보다 적으면 마지막 페이지
-                print(f"📄 마지막 페이지 도달 (데이터 {len(page_fires)}건 < 30건)")
-                break
-                
-            # 다음 페이지로
-            current_page += 1
-            
-            # API 부하 방지를 위한 잠시 대기
-            time.sleep(0.5)
+        page_fires = data.get("frfrInfoList", [])
+        if not page_fires:
+            print(f"📄 페이지 {current_page}: 데이터 없음 - 수집 종료")
+            break
+
+        all_fires.extend(page_fires)
+        print(f"✅ 페이지 {current_page}: {len(page_fires)}건 수집 (누적: {len(all_fires)}건)")
+
+        if len(page_fires) < per_page:  # perPage보다 적으면 마지막 페이지
+            print(f"📄 마지막 페이지 도달 (데이터 {len(page_fires)}건 < {per_page}건)")
+            break
+
+        current_page += 1
+        data = None
+
+    return all_fires
+
+def fetch_all_pages_concurrent(start_dtm, end_dtm, per_page=PER_PAGE,
+                               max_workers=MAX_WORKERS, rate=REQUESTS_PER_SECOND):
+    """1페이지에서 전체 건수를 읽고 나머지 페이지를 워커 풀로 동시 수집"""
+    get_client().set_rate(FOREST_HOST, rate)
+
+    print(f"📄 페이지 1 요청 중...")
+    first = fetch_page(start_dtm, end_dtm, 1, per_page)
+    total_count = extract_total_count(first)
+
+    if total_count is None:
+        print("⚠️ 전체 건수 확인 불가 → 순차 수집으로 전환")
+        return fetch_all_pages_sequential(start_dtm, end_dtm, per_page, first_page=first)
+
+    last_page = max(1, math.ceil(total_count / per_page))
+    print(f"🔍 전체 {total_count}건 / {last_page}페이지 (워커 {max_workers}개, 초당 {rate}회)")
+
+    pages = {1: first.get("frfrInfoList", [])}
+    if last_page > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            page_numbers = list(range(2, last_page + 1))
+            results = pool.map(
+                lambda page: fetch_page(start_dtm, end_dtm, page, per_page),
+                page_numbers
+            )
+            for page, data in zip(page_numbers, results):
+                pages[page] = data.get("frfrInfoList", [])
+                print(f"✅ 페이지 {page}: {len(pages[page])}건 수집")
+
+    # 페이지 순서대로 병합 (수집 중 목록이 밀려 중복된 항목은 제거, ID 없는 항목은 비교하지 않고 유지)
+    all_fires = []
+    seen_ids = set()
+    for page in sorted(pages):
+        for fire in pages[page]:
+            fire_id = fire.get("frfr_info_id")
+            if fire_id is not None:
+                if fire_id in seen_ids:
+                    continue
+                seen_ids.add(fire_id)
+            all_fires.append(fire)
+    return all_fires
+
+def content_hash(fires):
+    """스냅샷 내용 해시 (순서와 무관하게 frfr_info_id 기준으로 정렬 후 계산)"""
+    ordered = sorted(fires, key=lambda fire: str(fire.get("frfr_info_id")))
+    encoded = json.dumps(ordered, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+def fetch_forest_data(concurrent=True):
+    today = datetime.today()
+    start = today - timedelta(days=6)
+    start_dtm = start.strftime("%Y%m%d")
+    end_dtm = today.strftime("%Y%m%d")
+
+    print(f"📦 요청 기간: {start.strftime('%Y-%m-%d')} ~ {today.strftime('%Y-%m-%d')}")
+
+    try:
+        # 🔄 모든 페이지의 데이터를 수집 (페이지 수 제한 없음)
+        if concurrent:
+            all_fires = fetch_all_pages_concurrent(start_dtm, end_dtm)
+        else:
+            all_fires = fetch_all_pages_sequential(start_dtm, end_dtm)
 
         print(f"🔥 총 수집된 화재: {len(all_fires)}건")
 
@@ -104,19 +163,17 @@ def fetch_forest_data():
         save_path = os.path.abspath(os.path.join(__file__, "..", "..", "public", "data", "korea_fire_live.json"))
         os.makedirs(os.path.dirname(save_path), exist_ok=True)
 
-        # ✅ 기존 파일 읽기 (비교용)
-        existing_fires = []
+        # ✅ 기존 파일을 한 건씩 읽어 ID 기준 딕셔너리로 보관 (비교용, 목록 사본은 만들지 않음)
+        existing_dict = {}
         if os.path.exists(save_path):
-            with open(save_path, "r", encoding="utf-8") as f:
-                existing_fires = json.load(f)
-
-        # 🔄 기존 데이터를 ID 기준으로 딕셔너리 변환 (비교용)
-        existing_dict = {f["frfr_info_id"]: f for f in existing_fires}
+            existing_dict = {f["frfr_info_id"]: f for f in iter_json_records(save_path)}
         
         # 🔄 새 데이터 처리 및 표준화
         processed_fires = []
         new_count = 0
         updated_count = 0
+        added_ids = []
+        updated_ids = []
         
         for fire in all_fires:
             fire_id = fire["frfr_info_id"]
@@ -162,6 +219,9 @@ def fetch_forest_data():
                 if old_fire.get("frfr_sttmn_addr") != fire.get("frfr_sttmn_addr"):
                     changed_fields.append(f"위치: {old_fire.get('frfr_sttmn_addr')} → {fire.get('frfr_sttmn_addr')}")
                 
+                if standardized_fire != old_fire:
+                    updated_ids.append(fire_id)
+
                 if changed_fields:
                     print(f"🔄 상태 변경: {fire_id} - {fire.get('frfr_sttmn_addr', '위치불명')}")
                     for change in changed_fields:
@@ -171,6 +231,7 @@ def fetch_forest_data():
                 # 완전히 새로운 화재
                 print(f"🆕 신규 화재: {fire_id} - {fire.get('frfr_sttmn_addr', '위치불명')} ({fire.get('frfr_frng_dtm', '시간불명')})")
                 new_count += 1
+                added_ids.append(fire_id)
             
             processed_fires.append(standardized_fire)
 
@@ -178,7 +239,7 @@ def fetch_forest_data():
         current_fire_ids = {f["frfr_info_id"] for f in all_fires}
         removed_fires = []
         
-        for existing_fire in existing_fires:
+        for existing_fire in existing_dict.values():
             if existing_fire["frfr_info_id"] not in current_fire_ids:
                 removed_fires.append(existing_fire)
                 print(f"🗑️ 산림청에서 제거됨: {existing_fire['frfr_info_id']} - {existing_fire.get('frfr_sttmn_addr', '위치불명')}")
@@ -190,14 +251,34 @@ def fetch_forest_data():
         print(f"   🗑️ 제거된 화재: {len(removed_fires)}건")
         print(f"   📝 최종 저장: {len(processed_fires)}건")
 
-        # 날짜순 정렬 (최신순)
-        processed_fires.sort(key=lambda x: x.get("frfr_frng_dtm", ""), reverse=True)
+        # 날짜순 정렬 (최신순, 같은 시각은 ID 순으로 고정)
+        processed_fires.sort(key=lambda x: (x.get("frfr_frng_dtm") or "", str(x.get("frfr_info_id"))), reverse=True)
+
+        # 🧾 변경 세트 (추가/갱신/제거 ID + 내용 해시)
+        new_hash = content_hash(processed_fires)
+        previous_hash = content_hash(existing_dict.values()) if existing_dict else None
+        change_set = {
+            "snapshot": os.path.basename(save_path),
+            "hash": new_hash,
+            "previous_hash": previous_hash,
+            "changed": new_hash != previous_hash,
+            "added": sorted(added_ids),
+            "updated": sorted(updated_ids),
+            "removed": sorted(f["frfr_info_id"] for f in removed_fires),
+            "count": len(processed_fires)
+        }
+        change_path = os.path.join(os.path.dirname(save_path), "korea_fire_live.changes.json")
+        write_json_if_changed(change_path, change_set)
+
+        if not change_set["changed"]:
+            print(f"⏸️ 내용 해시 동일 ({new_hash[:12]}) → 스냅샷 재작성 생략")
+            return change_set
 
         # 💾 산림청 데이터로 완전 교체하여 저장
-        with open(save_path, "w", encoding="utf-8") as f:
-            json.dump(processed_fires, f, ensure_ascii=False, indent=2)
+        write_json_records(save_path, processed_fires)
 
         print(f"💾 저장 완료 → {save_path}")
+        print(f"🧾 변경 세트 저장 → {change_path}")
         print(f"🔄 산림청 데이터와 완전 동기화됨")
         
         # 📊 현재 시간 기록
@@ -216,10 +297,13 @@ def fetch_forest_data():
             for date_str in sorted(date_count.keys(), reverse=True):
                 print(f"   {date_str}: {date_count[date_str]}건")
 
+        return change_set
+
     except Exception as e:
         print("❌ 오류 발생:", e)
         import traceback
         traceback.print_exc()
 
 if __name__ == "__main__":
-    fetch_forest_data()
\ No newline at end of file
+    fetch_forest_data()
+    get_client().print_metrics()
\ No newline at end of file
@@ -1,146 +1,163 @@
-# 2024-10-01 ~ 2025-04-01 산림청 데이터 크롤링 파일
-import requests
+# 산림청 과거 화재 데이터 백필 (기본: 2024-10-01 ~ 2025-04-01)
+import argparse
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-import time
-
-def fetch_forest_data_range():
-    """2024-10-01부터 2025-04-01까지의 산림청 화재 데이터를 수집"""
-    
-    # 고정된 날짜 범위 설정
-    start_date = datetime(2024, 10, 1)
-    end_date = datetime(2025, 4, 1)
-    
-    url = "https://fd.forest.go.kr/ffas/pubConn/occur/getPublicShowFireInfoList.do"
-    headers = {"Content-Type": "application/json", "User-Agent": "Mozilla/5.0"}
-    
-    all_fires = []
+
+from fetch_forest_data import FOREST_HOST, fetch_all_pages_sequential
+from http_client import get_client
+from json_stream import write_json_records
+
+DATE_FMT = "%Y-%m-%d"
+MAX_WORKERS = 4           # 동시에 수집할 기간(윈도우) 수
+REQUESTS_PER_SECOND = 2   # 전체 워커가 공유하는 초당 요청 수
+PER_PAGE = 1000           # 백필은 예전처럼 한 페이지에 1000건 (실시간 수집의 30건으로는 요청 수가 약 33배)
+CHECKPOINT_DIR = os.path.abspath(os.path.join(__file__, "..", "checkpoints", "forest_history"))
+
+def plan_windows(start_date, end_date, window="month"):
+    """[start_date, end_date] 구간을 월/주 단위 윈도우 (시작일, 종료일) 목록으로 분할"""
+    if window not in ("month", "week"):
+        raise ValueError("window는 'month' 또는 'week'만 지원!")
+
+    windows = []
     current_date = start_date
-    
-    print(f"📅 수집 기간: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}")
-    
-    # 월별로 나누어서 요청 (API 부하 방지)
-    while current_date < end_date:
-        # 현재 월의 마지막 날 계산
-        if current_date.month == 12:
-            next_month = current_date.replace(year=current_date.year + 1, month=1, day=1)
+    while current_date <= end_date:
+        if window == "week":
+            next_start = current_date + timedelta(days=7 - current_date.weekday())
+        elif current_date.month == 12:
+            next_start = current_date.replace(year=current_date.year + 1, month=1, day=1)
         else:
-            next_month = current_date.replace(month=current_date.month + 1, day=1)
-        
-        month_end = min(next_month - timedelta(days=1), end_date)
-        
-        payload = {
-            "param": {
-                "startDtm": current_date.strftime("%Y%m%d"),
-                "endDtm": month_end.strftime("%Y%m%d"),
-                "regionCode": "",
-                "issuCode": "",
-                "prgrsCode": "",
-                "sttnMapCheckFlag": "",
-                "perPage": 1000,  # 한 번에 더 많은 데이터 요청
-                "perPageList": 10,
-                "pageListStart": 0,
-                "pageListEnd": 10,
-                "currentPage": 1,
-                "lastPage": 1,
-                "totalCount": 1000,
-                "total_count": 1000,
-                "last_page": 1
-            },
-            "pager": {
-                "perPage": 1000,
-                "perPageList": 10,
-                "pageListStart": 0,
-                "pageListEnd": 10,
-                "currentPage": 1,
-                "lastPage": 1,
-                "totalCount": 1000,
-                "total_count": 1000,
-                "last_page": 1
-            }
-        }
-        
-        print(f"📦 요청 중: {current_date.strftime('%Y-%m-%d')} ~ {month_end.strftime('%Y-%m-%d')}")
-        
+            next_start = current_date.replace(month=current_date.month + 1, day=1)
+
+        window_end = min(next_start - timedelta(days=1), end_date)
+        windows.append((current_date, window_end))
+        current_date = next_start
+    return windows
+
+def checkpoint_path(window_start, window_end, checkpoint_dir=CHECKPOINT_DIR):
+    return os.path.join(checkpoint_dir, f"{window_start.strftime('%Y%m%d')}_{window_end.strftime('%Y%m%d')}.json")
+
+def load_checkpoint(window_start, window_end, checkpoint_dir=CHECKPOINT_DIR):
+    """완료된 윈도우의 체크포인트 로드 (없거나 손상되면 None)"""
+    path = checkpoint_path(window_start, window_end, checkpoint_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)["fires"]
+    except (ValueError, KeyError):
+        print(f"⚠️ 손상된 체크포인트 무시: {path}")
+        return None
+
+def save_checkpoint(window_start, window_end, fires, checkpoint_dir=CHECKPOINT_DIR):
+    """임시 파일에 쓴 뒤 교체해서 중단되어도 반쯤 쓰인 체크포인트가 남지 않게 함"""
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    path = checkpoint_path(window_start, window_end, checkpoint_dir)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "start": window_start.strftime(DATE_FMT),
+            "end": window_end.strftime(DATE_FMT),
+            "fetched_at": datetime.now().isoformat(timespec="seconds"),
+            "fires": fires
+        }, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def fetch_window(window_start, window_end, per_page=PER_PAGE):
+    """한 윈도우의 모든 페이지 수집"""
+    return fetch_all_pages_sequential(window_start.strftime("%Y%m%d"), window_end.strftime("%Y%m%d"), per_page)
+
+def get_date_key(fire):
+    occu_dtm = fire.get("occu_dtm", "")
+    if occu_dtm:
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=15)
-            
-            if response.status_code == 200:
-                data = response.json()
-                month_fires = data.get("frfrInfoList", [])
-                
-                print(f"✅ {current_date.strftime('%Y-%m')} 화재 데이터: {len(month_fires)}건")
-                all_fires.extend(month_fires)
-                
-                # 페이지네이션 처리 (총 데이터가 1000건을 넘는 경우)
-                total_count = data.get("totalCount", 0)
-                if total_count > 1000:
-                    pages_needed = (total_count // 1000) + 1
-                    
-                    for page in range(2, pages_needed + 1):
-                        payload["param"]["currentPage"] = page
-                        payload["pager"]["currentPage"] = page
-                        
-                        print(f"📄 추가 페이지 요청: {page}/{pages_needed}")
-                        
-                        response = requests.post(url, headers=headers, json=payload, timeout=15)
-                        if response.status_code == 200:
-                            page_data = response.json()
-                            page_fires = page_data.get("frfrInfoList", [])
-                            all_fires.extend(page_fires)
-                            print(f"✅ 페이지 {page} 추가: {len(page_fires)}건")
-                        
-                        time.sleep(1)  # API 부하 방지
-                        
-            else:
-                print(f"❌ HTTP 오류: {response.status_code}")
-                
-        except Exception as e:
-            print(f"❌ 요청 오류 ({current_date.strftime('%Y-%m')}): {e}")
-        
-        # 다음 달로 이동
-        current_date = next_month
-        time.sleep(2)  # API 부하 방지를 위한 대기
-    
+            return datetime.strptime(occu_dtm, "%Y%m%d%H%M%S")
+        except:
+            try:
+                return datetime.strptime(occu_dtm[:8], "%Y%m%d")
+            except:
+                return datetime.min
+    return datetime.min
+
+def fetch_forest_data_range(start_date=datetime(2024, 10, 1), end_date=datetime(2025, 4, 1),
+                            window="month", max_workers=MAX_WORKERS, rate=REQUESTS_PER_SECOND,
+                            output_name="korea_fire_2024_2025.json", checkpoint_dir=CHECKPOINT_DIR):
+    """지정 기간의 산림청 화재 데이터를 윈도우 단위로 병렬 수집 (완료된 윈도우는 체크포인트에서 재사용)"""
+
+    print(f"📅 수집 기간: {start_date.strftime(DATE_FMT)} ~ {end_date.strftime(DATE_FMT)} ({window} 단위)")
+
+    windows = plan_windows(start_date, end_date, window)
+    today = datetime.combine(datetime.today().date(), datetime.min.time())
+
+    window_fires = {}
+    pending = []
+    for window_start, window_end in windows:
+        # 오늘 이후가 포함된 윈도우는 아직 바뀔 수 있으므로 항상 다시 수집
+        cached = load_checkpoint(window_start, window_end, checkpoint_dir) if window_end < today else None
+        if cached is not None:
+            window_fires[window_start] = cached
+        else:
+            pending.append((window_start, window_end))
+
+    print(f"♻️ 체크포인트 재사용: {len(window_fires)}개 / 수집 필요: {len(pending)}개 윈도우")
+
+    get_client().set_rate(FOREST_HOST, rate)
+    failed = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(fetch_window, window_start, window_end): (window_start, window_end)
+            for window_start, window_end in pending
+        }
+        for future in as_completed(futures):
+            window_start, window_end = futures[future]
+            label = f"{window_start.strftime(DATE_FMT)} ~ {window_end.strftime(DATE_FMT)}"
+            try:
+                fires = future.result()
+            except Exception as e:
+                print(f"❌ 요청 오류 ({label}): {e}")
+                failed.append(label)
+                continue
+
+            if window_end < today:
+                save_checkpoint(window_start, window_end, fires, checkpoint_dir)
+            window_fires[window_start] = fires
+            print(f"✅ {label} 화재 데이터: {len(fires)}건")
+
+    if failed:
+        print(f"\n⚠️ 실패한 윈도우 {len(failed)}개: {', '.join(sorted(failed))}")
+        print("💡 다시 실행하면 완료된 윈도우는 건너뛰고 실패한 윈도우만 수집합니다.")
+        return None
+
+    all_fires = []
+    for window_start in sorted(window_fires):
+        all_fires.extend(window_fires[window_start])
+
     # 중복 제거 (frfr_info_id 기준)
     unique_fires = []
     seen_ids = set()
-    
+
     for fire in all_fires:
         fire_id = fire.get("frfr_info_id")
         if fire_id and fire_id not in seen_ids:
             unique_fires.append(fire)
             seen_ids.add(fire_id)
-    
+
     print(f"🔄 중복 제거: {len(all_fires)} → {len(unique_fires)}건")
-    
+
     # 날짜순 정렬
-    def get_date_key(fire):
-        occu_dtm = fire.get("occu_dtm", "")
-        if occu_dtm:
-            try:
-                return datetime.strptime(occu_dtm, "%Y%m%d%H%M%S")
-            except:
-                try:
-                    return datetime.strptime(occu_dtm[:8], "%Y%m%d")
-                except:
-                    return datetime.min
-        return datetime.min
-    
     unique_fires.sort(key=get_date_key)
-    
+
     # 저장 경로 설정
-    save_path = os.path.abspath(os.path.join(__file__, "..", "..", "public", "data", "korea_fire_2024_2025.json"))
+    save_path = os.path.abspath(os.path.join(__file__, "..", "..", "public", "data", output_name))
     os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    
+
     # JSON 파일로 저장
-    with open(save_path, "w", encoding="utf-8") as f:
-        json.dump(unique_fires, f, ensure_ascii=False, indent=2)
-    
+    write_json_records(save_path, unique_fires)
+
     print(f"💾 저장 완료 → {save_path}")
     print(f"📊 총 데이터: {len(unique_fires)}건")
-    
+
     # 월별 통계 출력
     monthly_stats = {}
     for fire in unique_fires:
@@ -148,27 +165,45 @@ def fetch_forest_data_range():
         if len(occu_dtm) >= 6:
             month_key = occu_dtm[:6]  # YYYYMM
             monthly_stats[month_key] = monthly_stats.get(month_key, 0) + 1
-    
+
     print("\n📈 월별 화재 발생 현황:")
     for month in sorted(monthly_stats.keys()):
         year = month[:4]
         mon = month[4:6]
         count = monthly_stats[month]
         print(f"  {year}-{mon}: {count:4d}건")
-    
+
     return unique_fires
 
 if __name__ == "__main__":
-    print("🔥 산림청 화재 데이터 수집 시작 (2024-10-01 ~ 2025-04-01)")
-    
+    parser = argparse.ArgumentParser(description="산림청 과거 화재 데이터 백필")
+    parser.add_argument("--start", default="2024-10-01", help="시작일 (YYYY-MM-DD)")
+    parser.add_argument("--end", default="2025-04-01", help="종료일 (YYYY-MM-DD, 포함)")
+    parser.add_argument("--window", default="month", choices=["month", "week"], help="윈도우 단위")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="동시 수집 윈도우 수")
+    parser.add_argument("--rate", type=float, default=REQUESTS_PER_SECOND, help="전체 초당 요청 수")
+    parser.add_argument("--output", default="korea_fire_2024_2025.json", help="public/data 아래 출력 파일명")
+    args = parser.parse_args()
+
+    print(f"🔥 산림청 화재 데이터 수집 시작 ({args.start} ~ {args.end})")
+
     try:
-        fires_data = fetch_forest_data_range()
-        
-        print("\n✅ 수집 완료!")
-        print(f"📁 데이터 파일: public/data/korea_fire_2024_2025.json")
-        print(f"📊 총 {len(fires_data)}건의 화재 데이터가 저장되었습니다.")
-        
+        fires_data = fetch_forest_data_range(
+            datetime.strptime(args.start, DATE_FMT),
+            datetime.strptime(args.end, DATE_FMT),
+            window=args.window,
+            max_workers=args.workers,
+            rate=args.rate,
+            output_name=args.output
+        )
+
+        if fires_data is not None:
+            print("\n✅ 수집 완료!")
+            print(f"📁 데이터 파일: public/data/{args.output}")
+            print(f"📊 총 {len(fires_data)}건의 화재 데이터가 저장되었습니다.")
+        get_client().print_metrics()
+
     except Exception as e:
         print(f"❌ 전체 프로세스 오류: {e}")
         import traceback
-        traceback.print_exc()
\ No newline at end of file
+        traceback.print_exc()
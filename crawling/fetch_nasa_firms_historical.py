@@ -1,23 +1,20 @@
+import argparse
 import os
-import requests
-import csv
-import json
-import time
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
-
-def load_existing_data(path):
-    """기존 JSON 파일 로드"""
-    if not os.path.exists(path):
-        return []
-    with open(path, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except:
-            return []
-
-def fetch_firms_historical_range():
-    """2024-10-01부터 2025-04-01까지 NASA FIRMS 데이터 수집"""
+from datetime import datetime
+
+from firms_planner import (
+    DEFAULT_SOURCES, FIRMS_MAX_DAY_RANGE, KOREA_BBOX, MAX_WORKERS, REQUESTS_PER_SECOND,
+    fetch_firms_windows, plan_firms_windows
+)
+from firms_dedup import open_store_index
+from firms_store import FirmsPartitionStore
+from http_client import get_client
+
+def fetch_firms_historical_range(start_date=datetime(2024, 10, 1), end_date=datetime(2025, 3, 31),
+                                 sources=DEFAULT_SOURCES, bboxes=(KOREA_BBOX,),
+                                 max_workers=MAX_WORKERS, rate=REQUESTS_PER_SECOND):
+    """지정 기간의 NASA FIRMS 데이터를 소스·영역별 최대 윈도우로 나누어 동시 수집"""
     
     # 환경 변수 로드
     dotenv_path = os.path.abspath(os.path.join(__file__, "..", "..", ".env"))
@@ -28,128 +25,51 @@ def fetch_firms_historical_range():
         print("❌ FIRMS_KEY 누락됨")
         return
 
-    # 기간 설정
-    start_date = datetime(2024, 10, 1)
-    end_date = datetime(2025, 4, 1)
-    
-    source = "VIIRS_SNPP_NRT"
-    bbox = "124,33,132,39"  # 한국 영역
-    
     print(f"🛰️ NASA FIRMS 데이터 수집 시작")
     print(f"📅 기간: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}")
-    print(f"🗺️ 영역: {bbox} (한국)")
+    print(f"📡 소스: {', '.join(sources)}")
+    print(f"🗺️ 영역: {', '.join(bboxes)}")
 
-    # 파일 경로 설정
+    # 날짜별 파티션 저장소 (최초 1회 기존 JSON 아카이브 이전)
     base_dir = os.path.abspath(os.path.join(__file__, "..", ".."))
-    save_path = os.path.join(base_dir, "public", "data", "nasa_firms_korea_2024_2025.json")
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    
-    # 기존 데이터 로드
-    existing_data = load_existing_data(save_path)
-    existing_set = {json.dumps(entry, sort_keys=True) for entry in existing_data}
-    
-    print(f"📂 기존 데이터: {len(existing_data)}건")
-
-    all_new_data = []
-    current_date = start_date
-    request_count = 0
-    
-    # 10일씩 나누어 요청 (API 제한)
-    while current_date < end_date:
-        # 10일 범위 계산
-        range_end = min(current_date + timedelta(days=9), end_date - timedelta(days=1))
-        
-        # 날짜 포맷 변환 (YYYY-MM-DD)
-        date_start_str = current_date.strftime("%Y-%m-%d")
-        date_end_str = range_end.strftime("%Y-%m-%d")
-        
-        # API URL 생성 (날짜 범위 지정)
-        url = f"https://firms.modaps.eosdis.nasa.gov/api/area/csv/{map_key}/{source}/{bbox}/1/{date_start_str}"
-        
-        print(f"\n📡 요청 {request_count + 1}: {date_start_str} ~ {date_end_str}")
-        print(f"🌐 URL: {url}")
-
-        try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            
-            # CSV 파싱
-            decoded = response.content.decode("utf-8").splitlines()
-            reader = csv.DictReader(decoded)
-            range_data = list(reader)
-            
-            # 날짜 필터링 (API가 정확한 날짜 범위를 보장하지 않을 수 있음)
-            filtered_data = []
-            for entry in range_data:
-                try:
-                    entry_date = datetime.strptime(entry["acq_date"], "%Y-%m-%d")
-                    if current_date <= entry_date <= range_end:
-                        filtered_data.append(entry)
-                except (ValueError, KeyError):
-                    continue
-            
-            print(f"📥 수신: {len(range_data)}건 → 필터링 후: {len(filtered_data)}건")
-            all_new_data.extend(filtered_data)
-            
-            request_count += 1
-            
-            # API 부하 방지 (1초 대기)
-            time.sleep(1)
-            
-        except requests.exceptions.RequestException as e:
-            print(f"❌ API 요청 오류 ({date_start_str}): {e}")
-            
-        except Exception as e:
-            print(f"❌ 데이터 처리 오류 ({date_start_str}): {e}")
-        
-        # 다음 10일로 이동
-        current_date = range_end + timedelta(days=1)
+    store = FirmsPartitionStore("korea_2024_2025")
+    store.import_legacy_json(os.path.join(base_dir, "public", "data", "nasa_firms_korea_2024_2025.json"))
 
-    print(f"\n🔄 전체 수집 완료: {len(all_new_data)}건")
+    # 소스·영역별로 API가 허용하는 가장 큰 윈도우로 분할해 동시 요청
+    windows = plan_firms_windows(start_date, end_date, sources, bboxes)
+    print(f"🧮 요청 계획: {len(windows)}회")
 
-    # 중복 제거
-    unique_new_data = []
-    for entry in all_new_data:
-        entry_json = json.dumps(entry, sort_keys=True)
-        if entry_json not in existing_set:
-            unique_new_data.append(entry)
-            existing_set.add(entry_json)
+    all_new_data, failed = fetch_firms_windows(map_key, windows, max_workers=max_workers, rate=rate)
+    request_count = len(windows) - len(failed)
 
-    # 기존 데이터와 병합
-    combined_data = existing_data + unique_new_data
-    
-    # 날짜순 정렬
-    def get_date_key(entry):
-        try:
-            date_str = entry.get("acq_date", "")
-            time_str = entry.get("acq_time", "0000")
-            datetime_str = f"{date_str} {time_str[:2]}:{time_str[2:]}"
-            return datetime.strptime(datetime_str, "%Y-%m-%d %H:%M")
-        except:
-            return datetime.min
-    
-    combined_data.sort(key=get_date_key)
+    if failed:
+        print(f"⚠️ 실패한 윈도우 {len(failed)}개 (다시 실행하면 중복 없이 보충됩니다)")
 
-    # 파일 저장
-    with open(save_path, "w", encoding="utf-8") as f:
-        json.dump(combined_data, f, ensure_ascii=False, indent=2)
+    print(f"\n🔄 전체 수집 완료: {len(all_new_data)}건")
+    print(f"📂 기존 데이터: {store.total_count()}건")
+
+    # 영구 인덱스 기준 중복 제거 후 바뀐 날짜 파티션만 시각순으로 다시 씀
+    with open_store_index(store) as index:
+        unique_new_data = index.add_new(all_new_data)
+        changed_dates = store.append(unique_new_data)
+        for acq_date in changed_dates:
+            rows = list(store.read_partition(acq_date))
+            rows.sort(key=lambda entry: str(entry.get("acq_time", "0")).zfill(4))
+            store.replace_partition(acq_date, rows)
+        index.commit(store.total_count())
 
     print(f"\n✅ 저장 완료!")
-    print(f"📁 파일 위치: {save_path}")
+    print(f"📁 저장소 위치: {store.path}")
+    print(f"🗂️ 갱신된 파티션: {len(changed_dates)}개")
     print(f"📊 신규 데이터: {len(unique_new_data)}건")
-    print(f"📊 전체 데이터: {len(combined_data)}건")
+    print(f"📊 전체 데이터: {store.total_count()}건")
     print(f"🌐 총 API 요청: {request_count}회")
 
-    # 월별 통계
+    # 월별 통계 (manifest 기준)
     monthly_stats = {}
-    for entry in combined_data:
-        try:
-            date_str = entry.get("acq_date", "")
-            if len(date_str) >= 7:
-                month_key = date_str[:7]  # YYYY-MM
-                monthly_stats[month_key] = monthly_stats.get(month_key, 0) + 1
-        except:
-            continue
+    for acq_date, partition in store.manifest["partitions"].items():
+        month_key = acq_date[:7]  # YYYY-MM
+        monthly_stats[month_key] = monthly_stats.get(month_key, 0) + partition["count"]
 
     print(f"\n📈 월별 NASA 화재 감지 통계:")
     for month in sorted(monthly_stats.keys()):
@@ -160,7 +80,7 @@ def fetch_firms_historical_range():
     confidence_stats = {}
     brightness_values = []
     
-    for entry in combined_data:
+    for entry in store.read():
         conf = entry.get("confidence", "unknown")
         confidence_stats[conf] = confidence_stats.get(conf, 0) + 1
         
@@ -181,4 +101,22 @@ def fetch_firms_historical_range():
         print(f"\n🔆 평균 밝기: {avg_brightness:.1f}K")
 
 if __name__ == "__main__":
-    fetch_firms_historical_range()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="NASA FIRMS 과거 데이터 수집")
+    parser.add_argument("--start", default="2024-10-01", help="시작일 (YYYY-MM-DD)")
+    parser.add_argument("--end", default="2025-03-31", help="종료일 (YYYY-MM-DD, 포함)")
+    parser.add_argument("--sources", nargs="+", default=DEFAULT_SOURCES, choices=sorted(FIRMS_MAX_DAY_RANGE),
+                        help="FIRMS 소스 목록")
+    parser.add_argument("--bbox", nargs="+", default=[KOREA_BBOX], help="영역 (west,south,east,north)")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="동시 요청 수")
+    parser.add_argument("--rate", type=float, default=REQUESTS_PER_SECOND, help="초당 요청 수")
+    args = parser.parse_args()
+
+    fetch_firms_historical_range(
+        datetime.strptime(args.start, "%Y-%m-%d"),
+        datetime.strptime(args.end, "%Y-%m-%d"),
+        sources=args.sources,
+        bboxes=args.bbox,
+        max_workers=args.workers,
+        rate=args.rate
+    )
+    get_client().print_metrics()
\ No newline at end of file
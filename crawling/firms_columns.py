@@ -0,0 +1,257 @@
+import csv
+from datetime import date, datetime
+
+import numpy as np
+
+from json_stream import iter_json_records
+
+# FIRMS 관측점 열 지향(columnar) 메모리 표현
+#   CSV/JSON을 한 번만 파싱해서 타입이 정해진 NumPy 열로 보관 → 매칭 루프에서 문자열 재파싱 없음
+#   관측점 1개당 약 34바이트 (dict 1개당 수 KB 대비)
+#
+#   위경도            float32
+#   관측일            int32  (date.toordinal())
+#   관측 시각(HHMM)   int16  (없으면 -1)
+#   밝기·FRP·T31      float32 (없으면 NaN)
+#   신뢰도·위성·센서·주야  범주 코드 int8 + 라벨 목록
+MISSING_TIME = -1
+CATEGORY_FIELDS = ["confidence", "satellite", "instrument", "daynight"]
+
+# 소스별로 이름이 다른 열 (VIIRS: bright_ti4/ti5, MODIS·아카이브: brightness/bright_t31)
+BRIGHTNESS_KEYS = ["brightness", "bright_ti4"]
+BRIGHT_T31_KEYS = ["bright_t31", "bright_ti5"]
+
+def _first(record, keys):
+    for key in keys:
+        value = record.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def _to_time(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return MISSING_TIME
+
+def _scalar(value):
+    """float32 값을 JSON에 그대로 쓸 수 있는 float로 (NaN → None, 312.4가 312.39999…로 바뀌지 않게)"""
+    if np.isnan(value):
+        return None
+    return float(str(value))
+
+class FirmsRecord:
+    """FirmsColumns의 한 행을 가리키는 가벼운 뷰 (행별 접근이 필요한 스크립트용)
+
+    기존 dict 접근(`record.get("frp")`, `record["acq_date"]`)도 원래 키 이름으로 지원한다.
+    """
+
+    __slots__ = ("columns", "index")
+
+    def __init__(self, columns, index):
+        self.columns = columns
+        self.index = index
+
+    @property
+    def latitude(self):
+        return _scalar(self.columns.lat[self.index])
+
+    @property
+    def longitude(self):
+        return _scalar(self.columns.lon[self.index])
+
+    @property
+    def day(self):
+        return int(self.columns.day[self.index])
+
+    @property
+    def acq_date(self):
+        return date.fromordinal(self.day).isoformat()
+
+    @property
+    def acq_time(self):
+        value = int(self.columns.acq_time[self.index])
+        return None if value == MISSING_TIME else value
+
+    @property
+    def brightness(self):
+        return _scalar(self.columns.brightness[self.index])
+
+    @property
+    def frp(self):
+        return _scalar(self.columns.frp[self.index])
+
+    @property
+    def bright_t31(self):
+        return _scalar(self.columns.bright_t31[self.index])
+
+    @property
+    def confidence(self):
+        return self.columns.label("confidence", self.index)
+
+    @property
+    def satellite(self):
+        return self.columns.label("satellite", self.index)
+
+    @property
+    def instrument(self):
+        return self.columns.label("instrument", self.index)
+
+    @property
+    def daynight(self):
+        return self.columns.label("daynight", self.index)
+
+    _ALIASES = {"bright_ti4": "brightness", "bright_ti5": "bright_t31"}
+    _FIELDS = {"latitude", "longitude", "acq_date", "acq_time", "brightness", "frp", "bright_t31",
+               *CATEGORY_FIELDS}
+
+    def __getitem__(self, key):
+        name = self._ALIASES.get(key, key)
+        if name not in self._FIELDS:
+            raise KeyError(key)
+        return getattr(self, name)
+
+    def get(self, key, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in
+                ["latitude", "longitude", "brightness", "acq_date", "acq_time", *CATEGORY_FIELDS,
+                 "frp", "bright_t31"]}
+
+    def __repr__(self):
+        return f"FirmsRecord({self.to_dict()})"
+
+class FirmsColumns:
+    """FIRMS 관측점 목록의 열 묶음
+
+    파싱할 수 없는 행(좌표·관측일 오류)은 로드 시 제외된다.
+    """
+
+    def __init__(self, lat, lon, day, acq_time, brightness, frp, bright_t31, codes, labels):
+        self.lat = lat
+        self.lon = lon
+        self.day = day
+        self.acq_time = acq_time
+        self.brightness = brightness
+        self.frp = frp
+        self.bright_t31 = bright_t31
+        self.codes = codes      # {필드: int8 코드 배열}
+        self.labels = labels    # {필드: [라벨, ...]} (코드 → 문자열)
+
+    @classmethod
+    def from_records(cls, records):
+        """dict 목록(JSON, NDJSON 파티션, csv.DictReader 행) → 열 묶음"""
+        lat, lon, day, acq_time = [], [], [], []
+        brightness, frp, bright_t31 = [], [], []
+        codes = {field: [] for field in CATEGORY_FIELDS}
+        vocab = {field: {} for field in CATEGORY_FIELDS}
+        skipped = 0
+
+        for record in records:
+            try:
+                row_lat = float(record["latitude"])
+                row_lon = float(record["longitude"])
+                row_day = datetime.strptime(str(record["acq_date"])[:10], "%Y-%m-%d").toordinal()
+            except (KeyError, TypeError, ValueError):
+                skipped += 1
+                continue
+            lat.append(row_lat)
+            lon.append(row_lon)
+            day.append(row_day)
+            acq_time.append(_to_time(record.get("acq_time")))
+            brightness.append(_to_float(_first(record, BRIGHTNESS_KEYS)))
+            frp.append(_to_float(record.get("frp")))
+            bright_t31.append(_to_float(_first(record, BRIGHT_T31_KEYS)))
+            for field in CATEGORY_FIELDS:
+                label = record.get(field)
+                label = "" if label is None else str(label)
+                codes[field].append(vocab[field].setdefault(label, len(vocab[field])))
+
+        if skipped:
+            print(f"⚠️ FIRMS 행 {skipped}개 파싱 실패 → 제외")
+
+        def code_dtype(size):
+            return np.int8 if size <= 127 else np.int16
+
+        return cls(
+            lat=np.asarray(lat, dtype=np.float32),
+            lon=np.asarray(lon, dtype=np.float32),
+            day=np.asarray(day, dtype=np.int32),
+            acq_time=np.asarray(acq_time, dtype=np.int16),
+            brightness=np.asarray(brightness, dtype=np.float32),
+            frp=np.asarray(frp, dtype=np.float32),
+            bright_t31=np.asarray(bright_t31, dtype=np.float32),
+            codes={field: np.asarray(codes[field], dtype=code_dtype(len(vocab[field])))
+                   for field in CATEGORY_FIELDS},
+            labels={field: list(vocab[field]) for field in CATEGORY_FIELDS},
+        )
+
+    def __len__(self):
+        return len(self.lat)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return FirmsRecord(self, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield FirmsRecord(self, i)
+
+    def label(self, field, index):
+        value = self.labels[field][self.codes[field][index]]
+        return value or None
+
+    def take(self, indices):
+        """인덱스 배열 또는 불리언 마스크로 부분 집합 생성 (라벨 목록은 공유)"""
+        return FirmsColumns(
+            self.lat[indices], self.lon[indices], self.day[indices], self.acq_time[indices],
+            self.brightness[indices], self.frp[indices], self.bright_t31[indices],
+            {field: codes[indices] for field, codes in self.codes.items()}, self.labels,
+        )
+
+    def in_days(self, first_day, last_day):
+        """관측일이 [first_day, last_day] (ordinal) 안인 행만"""
+        return self.take((self.day >= first_day) & (self.day <= last_day))
+
+    @property
+    def nbytes(self):
+        arrays = [self.lat, self.lon, self.day, self.acq_time, self.brightness, self.frp, self.bright_t31,
+                  *self.codes.values()]
+        return sum(a.nbytes for a in arrays)
+
+    def summary(self):
+        """analyze_data_ranges용 (위도 범위, 경도 범위, 날짜 범위), 비어 있으면 None"""
+        if not len(self):
+            return None
+        return (
+            (float(self.lat.min()), float(self.lat.max())),
+            (float(self.lon.min()), float(self.lon.max())),
+            (date.fromordinal(int(self.day.min())), date.fromordinal(int(self.day.max()))),
+        )
+
+def load_firms_csv(path):
+    """FIRMS CSV (NRT/아카이브 모두) → FirmsColumns"""
+    with open(path, "r", encoding="utf-8") as f:
+        return FirmsColumns.from_records(csv.DictReader(f))
+
+# 열 묶음에 필요한 키만 읽음 (scan, track, version 등은 버림)
+FIRMS_FIELDS = ["latitude", "longitude", "acq_date", "acq_time", "frp", *BRIGHTNESS_KEYS, *BRIGHT_T31_KEYS,
+                *CATEGORY_FIELDS]
+
+def load_firms_json(path):
+    """FIRMS JSON 배열 또는 NDJSON (nasa_firms_korea*.json) → FirmsColumns (스트리밍, 필요한 필드만)"""
+    return FirmsColumns.from_records(iter_json_records(path, fields=FIRMS_FIELDS))
@@ -0,0 +1,82 @@
+import os
+import sqlite3
+
+from firms_planner import detection_key
+
+INDEX_DIR = os.path.abspath(os.path.join(__file__, "..", "..", "data", "firms_index"))
+
+class FirmsDedupIndex:
+    """(위도, 경도, 관측일, 관측시각, 위성) 자연 키로 관측점 중복을 판별하는 영구 인덱스
+
+    키는 sqlite B-tree에 저장되므로 배치 하나를 검사하는 비용은 배치 크기에만 비례하고,
+    아카이브가 커져도 메모리에 전체 키를 올리지 않는다.
+    새 키는 commit() 전까지 확정되지 않으므로 저장소에 기록한 뒤 commit() 해야 한다.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS detections ("
+            "latitude TEXT, longitude TEXT, acq_date TEXT, acq_time TEXT, satellite TEXT, "
+            "PRIMARY KEY (latitude, longitude, acq_date, acq_time, satellite)) WITHOUT ROWID"
+        )
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type:
+            self.conn.rollback()
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM detections").fetchone()[0]
+
+    def get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def add_new(self, entries):
+        """처음 보는 관측점만 골라 반환하고 인덱스에 추가 (배치 안의 중복도 제거)"""
+        new_entries = []
+        for entry in entries:
+            try:
+                key = detection_key(entry)
+            except (ValueError, KeyError, TypeError):
+                continue
+            cursor = self.conn.execute("INSERT OR IGNORE INTO detections VALUES (?, ?, ?, ?, ?)", key)
+            if cursor.rowcount:
+                new_entries.append(entry)
+        return new_entries
+
+    def rebuild(self, entries):
+        """기존 키를 모두 지우고 entries로 다시 구성"""
+        self.conn.execute("DELETE FROM detections")
+        self.add_new(entries)
+
+    def commit(self, archive_count=None):
+        if archive_count is not None:
+            self.set_meta("archive_count", archive_count)
+        self.conn.commit()
+
+def open_store_index(store, index_dir=INDEX_DIR):
+    """파티션 저장소에 대응하는 인덱스를 열고, 저장소와 어긋나 있으면 한 번 재구축"""
+    index = FirmsDedupIndex(os.path.join(index_dir, f"{store.name}.sqlite"))
+
+    archive_count = store.total_count()
+    if index.get_meta("archive_count") != str(archive_count):
+        print(f"🧱 중복 제거 인덱스 재구축: {store.name} ({archive_count}건)")
+        index.rebuild(store.read())
+        index.commit(archive_count)
+
+    return index
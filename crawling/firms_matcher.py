@@ -0,0 +1,205 @@
+import argparse
+import json
+import os
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+
+from firms_columns import MISSING_TIME, load_firms_csv, load_firms_json
+from geo_distance import DAY_WINDOW, DETECTION_CHUNK, FIRE_CHUNK, distance_blocks
+from json_stream import iter_json_records
+
+# 다기준 일괄 매칭: 거리 + 관측일 차이 + 관측 시각(acq_time) ↔ 화재 발생 시각(frfr_frng_dtm)
+#   후보마다 비용을 벡터로 계산해 화재별 상위 k개를 고름 (블록 단위라 시즌 전체도 한 번에)
+#
+#   비용 = w_거리 × 거리/반경 + w_일 × |일수 차|/day_window + w_시각 × min(|시각 차|, 창)/창
+#   점수 = 1 - 비용/가중치 합  (0~1, 높을수록 좋음)
+#   - FIRMS acq_time은 UTC → KST(+9h)로 바꿔 화재 발생 시각과 비교
+#   - 발생 시각보다 EARLY_SLACK_HOURS 넘게 앞선 관측은 시각 비용 EARLY_FACTOR배 (발화 전 관측은 다른 불일 가능성)
+#   - 화재 시각이나 acq_time을 모르면 시각 비용 대신 일수 비용 사용
+DEFAULT_WEIGHTS = {"distance": 0.6, "day": 0.2, "time": 0.2}
+RADIUS_KM = 50.0
+TOP_K = 3
+KST_OFFSET_MINUTES = 9 * 60
+EARLY_SLACK_HOURS = 1.0
+EARLY_FACTOR = 2.0
+
+FIRE_TIME_FORMATS = ["%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S"]
+FIRE_DATE_FIELDS = ["frfr_frng_dtm", "occu_dtm", "frfr_sttmn_dt"]
+# match_fires_scored가 읽는 화재 필드 (+ 결과 키용 frfr_info_id)
+MATCH_FIELDS = ["frfr_info_id", "frfr_lctn_ycrd", "frfr_lctn_xcrd", "latitude", "longitude", *FIRE_DATE_FIELDS]
+
+TopKMatch = namedtuple("TopKMatch", ["index", "score", "distance", "day_gap", "hours_gap"])
+
+def fire_timestamp(fire):
+    """화재 발생 시각 (KST datetime, 시각 포함 여부) → 시각이 없으면 날짜만, 둘 다 없으면 (None, False)"""
+    value = str(fire.get("frfr_frng_dtm") or "").strip()
+    for fmt in FIRE_TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt), True
+        except ValueError:
+            continue
+
+    occu = str(fire.get("occu_dtm") or "")
+    if len(occu) >= 12 and occu[:12].isdigit():
+        try:
+            return datetime.strptime(occu[:12], "%Y%m%d%H%M"), True
+        except ValueError:
+            pass
+
+    for field in FIRE_DATE_FIELDS:
+        value = str(fire.get(field) or "").split(" ")[0]
+        try:
+            if len(value) == 10 and "-" in value:
+                return datetime.strptime(value, "%Y-%m-%d"), False
+            if len(value) >= 8 and value[:8].isdigit():
+                return datetime.strptime(value[:8], "%Y%m%d"), False
+        except ValueError:
+            continue
+    return None, False
+
+def detection_minutes(columns):
+    """관측점 KST 기준 분 단위 시각 (day ordinal × 1440 + 시각), acq_time이 없으면 NaN"""
+    acq = columns.acq_time.astype(np.float64)
+    minutes = columns.day.astype(np.float64) * 1440 + (acq // 100) * 60 + acq % 100 + KST_OFFSET_MINUTES
+    minutes[columns.acq_time == MISSING_TIME] = np.nan
+    return minutes
+
+def top_k_matches(fire_lat, fire_lon, fire_day, fire_minutes, det_lat, det_lon, det_day, det_minutes,
+                  k=TOP_K, radius_km=RADIUS_KM, day_window=DAY_WINDOW, weights=None,
+                  fire_chunk=FIRE_CHUNK, detection_chunk=DETECTION_CHUNK):
+    """화재별 상위 k개 후보 (반경·±day_window 안에서 점수순)
+
+    fire_minutes / det_minutes: KST 기준 분 단위 시각 (모르면 NaN)
+    반환: TopKMatch, 각 필드는 (화재 수, k) 배열이고 후보가 모자라면 index=-1, score=NaN
+    점수가 같으면 det_* 에서 앞선 관측점이 먼저다.
+    """
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    total_weight = sum(weights.values())
+    window_hours = (day_window + 1) * 24.0
+    fire_minutes = np.asarray(fire_minutes, dtype=np.float64)
+    det_minutes = np.asarray(det_minutes, dtype=np.float64)
+
+    n = len(fire_lat)
+    best_cost = np.full((n, k), np.inf)
+    best_index = np.full((n, k), -1, dtype=np.int64)
+    best_dist = np.full((n, k), np.inf)
+    best_day = np.zeros((n, k), dtype=np.int64)
+    best_hours = np.full((n, k), np.nan)
+
+    for rows, original, dist, day_gap in distance_blocks(fire_lat, fire_lon, fire_day, det_lat, det_lon, det_day,
+                                                         day_window, fire_chunk, detection_chunk):
+        hours_gap = (det_minutes[original][None, :] - fire_minutes[rows][:, None]) / 60.0
+        day_cost = np.abs(day_gap) / max(day_window, 1)
+        time_cost = np.minimum(np.abs(hours_gap), window_hours) / window_hours
+        time_cost = np.where(hours_gap < -EARLY_SLACK_HOURS, np.minimum(time_cost * EARLY_FACTOR, 1.0), time_cost)
+        time_cost = np.where(np.isnan(time_cost), day_cost, time_cost)
+
+        cost = (weights["distance"] * dist / radius_km + weights["day"] * day_cost
+                + weights["time"] * time_cost)
+        cost[dist > radius_km] = np.inf
+
+        # 지금까지의 상위 k개와 이번 블록을 합쳐 (비용, 원래 위치) 순으로 다시 k개
+        cand_index = np.broadcast_to(original[None, :], cost.shape)
+        merged_cost = np.concatenate([best_cost[rows], cost], axis=1)
+        merged_index = np.concatenate([best_index[rows], np.where(np.isfinite(cost), cand_index, -1)], axis=1)
+        tie_key = np.where(merged_index < 0, np.iinfo(np.int64).max, merged_index)
+        order = np.lexsort((tie_key, merged_cost), axis=1)[:, :k]
+
+        def take(current, block):
+            return np.take_along_axis(np.concatenate([current[rows], block], axis=1), order, axis=1)
+
+        best_dist[rows] = take(best_dist, dist)
+        best_day[rows] = take(best_day, day_gap)
+        best_hours[rows] = take(best_hours, hours_gap)
+        best_cost[rows] = np.take_along_axis(merged_cost, order, axis=1)
+        best_index[rows] = np.take_along_axis(merged_index, order, axis=1)
+
+    empty = ~np.isfinite(best_cost)
+    best_index[empty] = -1
+    best_dist[empty] = np.inf
+    best_hours[empty] = np.nan
+    score = np.where(empty, np.nan, 1.0 - best_cost / total_weight)
+    return TopKMatch(best_index, score, best_dist, best_day, best_hours)
+
+def match_fires_scored(fires, columns, **options):
+    """화재 dict 목록 × FirmsColumns → (TopKMatch, 매칭 가능한 화재 위치 목록)
+
+    좌표·날짜를 읽을 수 없는 화재는 제외되고, 결과의 i번째 행은 fires[positions[i]]에 해당한다.
+    """
+    positions, lats, lons, days, minutes = [], [], [], [], []
+    for i, fire in enumerate(fires):
+        try:
+            lat = float(fire.get("frfr_lctn_ycrd") or fire.get("latitude") or 0)
+            lon = float(fire.get("frfr_lctn_xcrd") or fire.get("longitude") or 0)
+        except (TypeError, ValueError):
+            continue
+        when, has_time = fire_timestamp(fire)
+        if not (lat and lon and when):
+            continue
+        positions.append(i)
+        lats.append(lat)
+        lons.append(lon)
+        days.append(when.toordinal())
+        minutes.append(when.toordinal() * 1440 + when.hour * 60 + when.minute if has_time else np.nan)
+
+    result = top_k_matches(lats, lons, days, minutes, columns.lat, columns.lon, columns.day,
+                           detection_minutes(columns), **options)
+    return result, positions
+
+def to_records(result, row, columns):
+    """TopKMatch의 한 행 → JSON용 후보 목록"""
+    matches = []
+    for rank in range(result.index.shape[1]):
+        index = int(result.index[row, rank])
+        if index < 0:
+            break
+        detection = columns[index]
+        matches.append({
+            "rank": rank + 1,
+            "score": round(float(result.score[row, rank]), 4),
+            "distance_km": round(float(result.distance[row, rank]), 2),
+            "day_gap": int(result.day_gap[row, rank]),
+            "hours_gap": None if np.isnan(result.hours_gap[row, rank]) else round(float(result.hours_gap[row, rank]), 1),
+            "acq_date": detection.acq_date,
+            "acq_time": detection.acq_time,
+            "latitude": detection.latitude,
+            "longitude": detection.longitude,
+            "brightness": detection.brightness,
+            "frp": detection.frp,
+            "confidence": detection.confidence,
+            "satellite": detection.satellite,
+        })
+    return matches
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="화재 × FIRMS 다기준 일괄 매칭 (화재별 상위 k개)")
+    parser.add_argument("fires", help="화재 JSON (korea_fire_*.json)")
+    parser.add_argument("firms", help="FIRMS CSV 또는 JSON")
+    parser.add_argument("output", help="결과 JSON (frfr_info_id별 후보 목록)")
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--radius", type=float, default=RADIUS_KM, help="후보 반경 (km)")
+    parser.add_argument("--days", type=int, default=DAY_WINDOW, help="관측일 허용 범위 (±일)")
+    parser.add_argument("--weights", default=None,
+                        help='가중치 JSON, 예: \'{"distance": 0.5, "day": 0.2, "time": 0.3}\'')
+    args = parser.parse_args()
+
+    # 매칭에 쓰는 필드만 읽음 (화재 레코드 전체를 메모리에 올리지 않음)
+    fires = list(iter_json_records(args.fires, fields=MATCH_FIELDS))
+    columns = load_firms_csv(args.firms) if args.firms.endswith(".csv") else load_firms_json(args.firms)
+    print(f"🔥 화재 {len(fires)}개 × 🛰️ 관측점 {len(columns)}개")
+
+    started = datetime.now()
+    result, positions = match_fires_scored(fires, columns, k=args.top_k, radius_km=args.radius,
+                                           day_window=args.days,
+                                           weights=json.loads(args.weights) if args.weights else None)
+    output = {
+        fires[i].get("frfr_info_id", str(i)): to_records(result, row, columns)
+        for row, i in enumerate(positions)
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+
+    matched = sum(1 for matches in output.values() if matches)
+    print(f"✅ 매칭 {matched}/{len(positions)}개 ({(datetime.now() - started).total_seconds():.2f}s) → {os.path.abspath(args.output)}")
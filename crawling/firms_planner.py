@@ -0,0 +1,115 @@
+import csv
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from http_client import get_client
+
+FIRMS_HOST = "firms.modaps.eosdis.nasa.gov"
+FIRMS_AREA_URL = "https://" + FIRMS_HOST + "/api/area/csv/{map_key}/{source}/{bbox}/{day_range}/{date}"
+
+# 소스별 area API가 허용하는 최대 day_range (FIRMS 문서 기준 1~5일)
+FIRMS_MAX_DAY_RANGE = {
+    "VIIRS_SNPP_NRT": 5,
+    "VIIRS_NOAA20_NRT": 5,   # J1
+    "VIIRS_NOAA21_NRT": 5,
+    "MODIS_NRT": 5,
+    "VIIRS_SNPP_SP": 5,
+    "VIIRS_NOAA20_SP": 5,
+    "MODIS_SP": 5,
+}
+DEFAULT_SOURCES = ["VIIRS_SNPP_NRT", "VIIRS_NOAA20_NRT", "MODIS_NRT"]
+KOREA_BBOX = "124,33,132,39"
+
+MAX_WORKERS = 4
+REQUESTS_PER_SECOND = 2
+
+FirmsWindow = namedtuple("FirmsWindow", ["source", "bbox", "start", "day_range"])
+
+def plan_firms_windows(start_date, end_date, sources=DEFAULT_SOURCES, bboxes=(KOREA_BBOX,)):
+    """[start_date, end_date] 구간을 소스·영역별로 API가 허용하는 가장 큰 윈도우로 분할"""
+    windows = []
+    total_days = (end_date - start_date).days + 1
+    for source in sources:
+        if source not in FIRMS_MAX_DAY_RANGE:
+            raise ValueError(f"지원하지 않는 FIRMS 소스: {source}")
+        max_range = FIRMS_MAX_DAY_RANGE[source]
+        for bbox in bboxes:
+            offset = 0
+            while offset < total_days:
+                day_range = min(max_range, total_days - offset)
+                windows.append(FirmsWindow(source, bbox, start_date + timedelta(days=offset), day_range))
+                offset += day_range
+    return windows
+
+def firms_window_url(map_key, window):
+    return FIRMS_AREA_URL.format(
+        map_key=map_key,
+        source=window.source,
+        bbox=window.bbox,
+        day_range=window.day_range,
+        date=window.start.strftime("%Y-%m-%d")
+    )
+
+def detection_key(entry):
+    """FIRMS 관측점의 자연 키 (위도, 경도, 관측일, 관측시각, 위성)"""
+    return (
+        f"{float(entry['latitude']):.5f}",
+        f"{float(entry['longitude']):.5f}",
+        str(entry["acq_date"]),
+        str(entry["acq_time"]).zfill(4),
+        str(entry.get("satellite", ""))
+    )
+
+def fetch_firms_window(map_key, window, timeout=30):
+    """윈도우 하나를 요청해 윈도우 기간 안의 관측점만 반환"""
+    response = get_client().get(firms_window_url(map_key, window), timeout=timeout)
+    response.raise_for_status()
+
+    window_end = window.start + timedelta(days=window.day_range - 1)
+    rows = []
+    for entry in csv.DictReader(response.content.decode("utf-8").splitlines()):
+        try:
+            entry_date = datetime.strptime(entry["acq_date"], "%Y-%m-%d")
+        except (ValueError, KeyError):
+            continue
+        if window.start <= entry_date <= window_end:
+            rows.append(entry)
+    return rows
+
+def fetch_firms_windows(map_key, windows, max_workers=MAX_WORKERS, rate=REQUESTS_PER_SECOND):
+    """윈도우들을 동시에 요청해 하나의 중복 제거된 목록으로 병합
+
+    반환값: (관측점 목록, 실패한 윈도우 목록)
+    """
+    get_client().set_rate(FIRMS_HOST, rate)
+    merged = []
+    seen = set()
+    failed = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(fetch_firms_window, map_key, window): window for window in windows}
+        for future in as_completed(futures):
+            window = futures[future]
+            label = f"{window.source} {window.start.strftime('%Y-%m-%d')} +{window.day_range}일"
+            try:
+                rows = future.result()
+            except Exception as e:
+                print(f"❌ FIRMS 요청 오류 ({label}): {e}")
+                failed.append(window)
+                continue
+
+            added = 0
+            for entry in rows:
+                try:
+                    key = detection_key(entry)
+                except (ValueError, KeyError):
+                    continue
+                if key in seen:
+                    continue
+                seen.add(key)
+                merged.append(entry)
+                added += 1
+            print(f"📥 {label}: {len(rows)}건 수신 → 신규 {added}건")
+
+    return merged, failed
@@ -0,0 +1,100 @@
+import math
+import numbers
+
+import numpy as np
+
+from firms_columns import FirmsColumns
+from geo_distance import DAY_WINDOW, haversine_km
+
+# 화재 ↔ FIRMS 매칭용 시공간 인덱스
+#   관측점을 (관측일, 위도 셀, 경도 셀) 버킷에 넣어 두고,
+#   질의 시 ±day_window일 × 반경을 덮는 버킷만 모아 한 번에 거리 계산 → 전체 관측점을 훑지 않음
+#   (여러 화재를 한꺼번에 매칭할 때는 geo_distance.nearest_detections 사용)
+KM_PER_DEG_LAT = 111.32
+CELL_DEG = 0.25          # 버킷 한 변 (도), 약 28km
+MAX_RADIUS_KM = 50.0     # 매칭 거리 임계값 중 최댓값
+
+class FirmsSpatialIndex:
+    """FIRMS 관측점 목록의 (일, 위경도 격자) 버킷 인덱스
+
+    records는 FirmsColumns(열 묶음) 또는 dict 목록 (dict 목록이면 FirmsColumns로 한 번 변환).
+    질의 결과의 인덱스는 원래 목록(records)의 위치이며, 거리가 같으면 앞선 관측점이 우선한다
+    (기존 이중 루프의 "처음 만난 최단 거리" 규칙과 동일).
+    """
+
+    def __init__(self, records, cell_deg=CELL_DEG):
+        if not isinstance(records, FirmsColumns):
+            records = FirmsColumns.from_records(records)
+        self.records = records
+        self.cell_deg = cell_deg
+        self.lat = records.lat.astype(np.float64)
+        self.lon = records.lon.astype(np.float64)
+        self.day = records.day.astype(np.int64)
+
+        keys = np.stack([
+            self.day,
+            np.floor(self.lat / cell_deg).astype(np.int64),
+            np.floor(self.lon / cell_deg).astype(np.int64),
+        ], axis=1)
+        # 버킷 키별 관측점 위치 배열 (원래 순서 유지)
+        order = np.lexsort((keys[:, 2], keys[:, 1], keys[:, 0]))
+        unique, starts = np.unique(keys[order], axis=0, return_index=True)
+        self.buckets = {
+            tuple(key): order[start:end]
+            for key, start, end in zip(unique.tolist(), starts, [*starts[1:], len(order)])
+        }
+        self.size = len(records)
+
+    def __len__(self):
+        return self.size
+
+    def _cell_span(self, lat, radius_km):
+        """반경을 덮는 위도·경도 셀 수 (경도 한 칸은 위도가 높을수록 짧아짐)"""
+        lat_cells = math.ceil(radius_km / (KM_PER_DEG_LAT * self.cell_deg))
+        cos_lat = max(math.cos(math.radians(min(abs(lat) + lat_cells * self.cell_deg, 89.0))), 1e-6)
+        lon_cells = math.ceil(radius_km / (KM_PER_DEG_LAT * cos_lat * self.cell_deg))
+        return lat_cells, lon_cells
+
+    def within(self, lat, lon, day, radius_km=MAX_RADIUS_KM, day_window=DAY_WINDOW):
+        """반경 radius_km, ±day_window일 안의 관측점 [(거리, 인덱스, 일수 차)] (거리순)
+
+        day는 date/datetime 또는 toordinal() 정수 (NumPy 정수 포함)
+        """
+        if not isinstance(day, numbers.Integral):
+            day = day.toordinal()
+        day = int(day)
+        lat_cells, lon_cells = self._cell_span(lat, radius_km)
+        lat_cell = math.floor(lat / self.cell_deg)
+        lon_cell = math.floor(lon / self.cell_deg)
+
+        buckets = [
+            self.buckets[key]
+            for d in range(day - day_window, day + day_window + 1)
+            for la in range(lat_cell - lat_cells, lat_cell + lat_cells + 1)
+            for lo in range(lon_cell - lon_cells, lon_cell + lon_cells + 1)
+            if (key := (d, la, lo)) in self.buckets
+        ]
+        if not buckets:
+            return []
+        idx = np.concatenate(buckets)
+        dist = haversine_km(lat, lon, self.lat[idx], self.lon[idx])
+        inside = dist <= radius_km
+        idx, dist = idx[inside], dist[inside]
+        order = np.lexsort((idx, dist))
+        day_diff = np.abs(self.day[idx] - day)
+        return [(float(dist[k]), int(idx[k]), int(day_diff[k])) for k in order]
+
+    def nearest(self, lat, lon, day, radius_km=MAX_RADIUS_KM, day_window=DAY_WINDOW):
+        """가장 가까운 관측점 (인덱스, 거리), 반경 안에 없으면 (None, inf)"""
+        hits = self.within(lat, lon, day, radius_km, day_window)
+        if not hits:
+            return None, float("inf")
+        return hits[0][1], hits[0][0]
+
+    def match(self, lat, lon, day, radius_km=MAX_RADIUS_KM, day_window=DAY_WINDOW):
+        """매칭 스크립트용: (최단 거리 관측점 레코드, 최단 거리, 반경 안 후보 수)"""
+        hits = self.within(lat, lon, day, radius_km, day_window)
+        if not hits:
+            return None, float("inf"), 0
+        dist, i, _ = hits[0]
+        return self.records[i], dist, len(hits)
@@ -0,0 +1,151 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+from firms_planner import detection_key
+from json_stream import iter_json_records
+
+STORE_DIR = os.path.abspath(os.path.join(__file__, "..", "..", "public", "data", "nasa_firms"))
+IMPORT_BATCH = 10000   # 기존 단일 JSON 이전 시 한 번에 파티션에 쓰는 건수
+
+class FirmsPartitionStore:
+    """acq_date별 NDJSON 파티션 + manifest.json 으로 구성된 FIRMS 아카이브
+
+    저장 시 바뀐 날짜의 파티션만 append/교체하므로 쓰기 비용은 아카이브 크기와 무관하다.
+    """
+
+    def __init__(self, name, root=STORE_DIR):
+        self.name = name
+        self.path = os.path.join(root, name)
+        self.manifest_path = os.path.join(self.path, "manifest.json")
+        os.makedirs(self.path, exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {"partitions": {}}
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_manifest(self):
+        self.manifest["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def partition_path(self, acq_date):
+        return os.path.join(self.path, f"{acq_date}.ndjson")
+
+    def dates(self):
+        return sorted(self.manifest["partitions"])
+
+    def total_count(self):
+        return sum(p["count"] for p in self.manifest["partitions"].values())
+
+    def is_empty(self):
+        return not self.manifest["partitions"]
+
+    def _group_by_date(self, entries):
+        groups = {}
+        for entry in entries:
+            acq_date = str(entry.get("acq_date", ""))
+            if len(acq_date) != 10:
+                continue
+            groups.setdefault(acq_date, []).append(entry)
+        return groups
+
+    def _write_lines(self, acq_date, entries, mode):
+        with open(self.partition_path(acq_date), mode, encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")))
+                f.write("\n")
+
+    def append(self, entries):
+        """관측점을 날짜별 파티션 끝에 추가하고 바뀐 날짜 목록 반환"""
+        groups = self._group_by_date(entries)
+        for acq_date, rows in groups.items():
+            self._write_lines(acq_date, rows, "a")
+            partition = self.manifest["partitions"].setdefault(acq_date, {"count": 0})
+            partition["count"] += len(rows)
+            partition["bytes"] = os.path.getsize(self.partition_path(acq_date))
+        if groups:
+            self._save_manifest()
+        return sorted(groups)
+
+    def replace_partition(self, acq_date, entries):
+        """파티션 하나를 통째로 교체 (정렬·정정용)"""
+        self._write_lines(acq_date, entries, "w")
+        self.manifest["partitions"][acq_date] = {
+            "count": len(entries),
+            "bytes": os.path.getsize(self.partition_path(acq_date))
+        }
+        self._save_manifest()
+
+    def read_partition(self, acq_date):
+        path = self.partition_path(acq_date)
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def read(self, start_date=None, end_date=None):
+        """[start_date, end_date] 기간 파티션만 열어 관측점을 하나씩 반환 (None이면 전체)"""
+        start_key = start_date.strftime("%Y-%m-%d") if start_date else None
+        end_key = end_date.strftime("%Y-%m-%d") if end_date else None
+        for acq_date in self.dates():
+            if start_key and acq_date < start_key:
+                continue
+            if end_key and acq_date > end_key:
+                break
+            yield from self.read_partition(acq_date)
+
+    def import_legacy_json(self, json_path, batch_size=IMPORT_BATCH):
+        """기존 단일 JSON 아카이브를 한 번만 파티션으로 옮김
+
+        레코드를 하나씩 읽어 batch_size건씩 파티션에 추가 (메모리에는 배치 하나와 자연 키 집합만 남음).
+        중간에 파일 형식 오류가 나면 쓰던 파티션을 지우고 빈 저장소로 되돌림.
+        """
+        if not self.is_empty() or not os.path.exists(json_path):
+            return 0
+        seen = set()
+        batch = []
+        count = 0
+        try:
+            for entry in iter_json_records(json_path):
+                try:
+                    key = detection_key(entry)
+                except (ValueError, KeyError, TypeError):
+                    continue
+                if key in seen:
+                    continue
+                seen.add(key)
+                batch.append(entry)
+                if len(batch) >= batch_size:
+                    self.append(batch)
+                    count += len(batch)
+                    batch = []
+        except ValueError:
+            self._clear()
+            return 0
+        self.append(batch)
+        count += len(batch)
+        print(f"📦 기존 아카이브를 파티션으로 이전: {os.path.basename(json_path)} → {self.path} ({count}건)")
+        return count
+
+    def _clear(self):
+        for acq_date in self.dates():
+            os.remove(self.partition_path(acq_date))
+        self.manifest = {"partitions": {}}
+        if os.path.exists(self.manifest_path):
+            os.remove(self.manifest_path)
+
+def read_window(store, dates, margin_days):
+    """날짜 목록 ± margin_days 범위의 파티션만 읽어 리스트로 반환"""
+    if not dates:
+        return []
+    start_date = min(dates) - timedelta(days=margin_days)
+    end_date = max(dates) + timedelta(days=margin_days)
+    return list(store.read(start_date, end_date))
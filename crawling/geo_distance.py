@@ -0,0 +1,119 @@
+from collections import namedtuple
+
+import numpy as np
+
+# 화재 × FIRMS 관측점 대권 거리 일괄 계산 (NumPy)
+#   화재 블록 × 관측점 블록 단위로 거리 행렬을 만들어 처리 → Python 수준 이중 루프 없음
+#   블록 크기로 최대 메모리를 제한 (FIRE_CHUNK × DETECTION_CHUNK × 8바이트 × 행렬 몇 개)
+EARTH_RADIUS_KM = 6371
+DISTANCE_THRESHOLDS = [5.0, 10.0, 20.0, 50.0]   # 매칭 임계값 (km), 마지막 값이 후보 반경
+DAY_WINDOW = 3
+FIRE_CHUNK = 256
+DETECTION_CHUNK = 4096
+
+NearestMatch = namedtuple("NearestMatch", ["index", "distance", "threshold", "candidates"])
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """대권 거리 (km), 배열끼리 NumPy 브로드캐스팅 (스칼라도 가능)"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+def haversine(lat1, lon1, lat2, lon2):
+    """두 좌표 간 거리 계산 (km), 스칼라용"""
+    return float(haversine_km(lat1, lon1, lat2, lon2))
+
+def threshold_bucket(distance, thresholds=DISTANCE_THRESHOLDS):
+    """거리 배열 → 처음으로 만족하는 임계값 (없으면 NaN)"""
+    edges = np.asarray(thresholds, dtype=np.float64)
+    distance = np.asarray(distance, dtype=np.float64)
+    pos = np.searchsorted(edges, distance, side="left")
+    bucket = np.full(distance.shape, np.nan)
+    inside = pos < len(edges)
+    bucket[inside] = edges[pos[inside]]
+    return bucket
+
+def distance_blocks(fire_lat, fire_lon, fire_day, det_lat, det_lon, det_day,
+                    day_window=DAY_WINDOW, fire_chunk=FIRE_CHUNK, detection_chunk=DETECTION_CHUNK):
+    """화재 블록 × 관측점 블록 거리 행렬을 차례로 생성
+
+    화재·관측점을 관측일순으로 정렬해 화재 블록마다 ±day_window에 드는 관측점 구간만 훑는다.
+    yield (rows, original, dist, day_gap)
+      rows      화재 위치 배열 (fire_* 기준)
+      original  관측점 위치 배열 (det_* 기준)
+      dist      (len(rows), len(original)) 거리 km, 관측일 범위 밖은 inf
+      day_gap   관측일 - 화재일 (같은 모양, 정수)
+    """
+    fire_lat = np.asarray(fire_lat, dtype=np.float64)
+    fire_lon = np.asarray(fire_lon, dtype=np.float64)
+    fire_day = np.asarray(fire_day, dtype=np.int64)
+
+    det_order = np.argsort(np.asarray(det_day), kind="stable")
+    sorted_day = np.asarray(det_day, dtype=np.int64)[det_order]
+    sorted_lat = np.asarray(det_lat, dtype=np.float64)[det_order]
+    sorted_lon = np.asarray(det_lon, dtype=np.float64)[det_order]
+    fire_order = np.argsort(fire_day, kind="stable")
+
+    for f_start in range(0, len(fire_lat), fire_chunk):
+        rows = fire_order[f_start:f_start + fire_chunk]
+        f_lat = fire_lat[rows][:, None]
+        f_lon = fire_lon[rows][:, None]
+        f_day = fire_day[rows][:, None]
+        lo = np.searchsorted(sorted_day, f_day.min() - day_window, side="left")
+        hi = np.searchsorted(sorted_day, f_day.max() + day_window, side="right")
+
+        for d_start in range(lo, hi, detection_chunk):
+            d_end = min(d_start + detection_chunk, hi)
+            dist = haversine_km(f_lat, f_lon, sorted_lat[None, d_start:d_end], sorted_lon[None, d_start:d_end])
+            day_gap = sorted_day[None, d_start:d_end] - f_day
+            dist[np.abs(day_gap) > day_window] = np.inf
+            yield rows, det_order[d_start:d_end], dist, day_gap
+
+def nearest_detections(fire_lat, fire_lon, fire_day, det_lat, det_lon, det_day,
+                       day_window=DAY_WINDOW, thresholds=DISTANCE_THRESHOLDS,
+                       fire_chunk=FIRE_CHUNK, detection_chunk=DETECTION_CHUNK):
+    """화재별 최단 거리 관측점 일괄 계산
+
+    fire_*: 화재 위도·경도·관측일(ordinal) 배열, det_*: 관측점 배열 (FirmsColumns.lat/lon/day)
+    관측일 차이가 day_window 이내이고 max(thresholds) km 이내인 관측점만 후보로 센다.
+    반환: NearestMatch(index, distance, threshold, candidates)
+      index     최단 거리 관측점 위치 (det_* 기준, 없으면 -1)
+      distance  최단 거리 km (없으면 inf)
+      threshold 임계값 버킷 (없으면 NaN)
+      candidates 후보 수
+    거리가 같으면 det_* 에서 앞선 관측점을 고른다.
+    """
+    radius = float(max(thresholds))
+    n = len(fire_lat)
+    best_index = np.full(n, -1, dtype=np.int64)
+    best_dist = np.full(n, np.inf)
+    candidates = np.zeros(n, dtype=np.int32)
+
+    for rows, original, dist, _ in distance_blocks(fire_lat, fire_lon, fire_day, det_lat, det_lon, det_day,
+                                                   day_window, fire_chunk, detection_chunk):
+        candidates[rows] += (dist <= radius).sum(axis=1, dtype=np.int32)
+
+        chunk_min = dist.min(axis=1)
+        # 최솟값이 여러 개면 원래 순서가 가장 앞선 관측점
+        chunk_index = np.where(dist == chunk_min[:, None], original[None, :], np.iinfo(np.int64).max).min(axis=1)
+
+        current = best_dist[rows]
+        better = (chunk_min < current) | ((chunk_min == current) & (chunk_index < best_index[rows])
+                                          & np.isfinite(chunk_min))
+        best_dist[rows] = np.where(better, chunk_min, current)
+        best_index[rows] = np.where(better, chunk_index, best_index[rows])
+
+    # 반경 밖 최단 거리는 매칭 실패와 같으므로 비움
+    outside = best_dist > radius
+    best_index[outside] = -1
+    best_dist[outside] = np.inf
+    return NearestMatch(best_index, best_dist, threshold_bucket(best_dist, thresholds), candidates)
+
+def match_fires(points, columns, **options):
+    """[(위도, 경도, date/datetime), ...] 화재 목록 × FirmsColumns → NearestMatch (매칭 스크립트용)"""
+    if not points:
+        empty = np.zeros(0)
+        return NearestMatch(empty.astype(np.int64), empty, empty, empty.astype(np.int32))
+    lats, lons, dates = zip(*points)
+    days = [d.toordinal() for d in dates]
+    return nearest_detections(lats, lons, days, columns.lat, columns.lon, columns.day, **options)
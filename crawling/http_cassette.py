@@ -0,0 +1,90 @@
+import base64
+import hashlib
+import json
+import os
+import re
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CASSETTE_DIR = os.path.abspath(os.path.join(__file__, "..", "cassettes"))
+
+# 카세트 키·파일에 남기지 않을 비밀 값
+SECRET_PARAMS = {"key", "api_key", "x-api-key"}
+FIRMS_KEY_PATTERN = re.compile(r"(/api/(?:area|country)/csv/)[^/]+/")
+
+def redact_url(url):
+    """쿼리의 API 키와 FIRMS 경로의 MAP_KEY를 가린 URL"""
+    parsed = urlparse(url)
+    query = [(k, "REDACTED" if k.lower() in SECRET_PARAMS else v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)]
+    path = FIRMS_KEY_PATTERN.sub(r"\1MAP_KEY/", parsed.path)
+    return urlunparse(parsed._replace(path=path, query=urlencode(sorted(query))))
+
+def cassette_key(method, url, body=b""):
+    """요청 식별 키 (메서드 + 비밀값을 가린 URL + 본문)"""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    digest = hashlib.sha256()
+    digest.update(method.upper().encode("utf-8"))
+    digest.update(b"\n")
+    digest.update(redact_url(url).encode("utf-8"))
+    digest.update(b"\n")
+    digest.update(body or b"")
+    return digest.hexdigest()
+
+def prepare(method, url, **kwargs):
+    """requests가 실제로 보낼 URL과 본문을 미리 만들어 봄 (params/json/data 반영)"""
+    prepared = requests.Request(
+        method, url,
+        params=kwargs.get("params"),
+        json=kwargs.get("json"),
+        data=kwargs.get("data")
+    ).prepare()
+    return prepared.url, prepared.body or b""
+
+class CassetteStore:
+    """호스트별 디렉터리에 요청 키 단위 JSON으로 응답을 저장하는 녹화/재생 저장소"""
+
+    def __init__(self, root=CASSETTE_DIR):
+        self.root = root
+
+    def path_for(self, url, key):
+        host = urlparse(url).netloc.replace(":", "_")
+        return os.path.join(self.root, host, f"{key}.json")
+
+    def save(self, method, url, body, response):
+        key = cassette_key(method, url, body)
+        path = self.path_for(url, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        record = {
+            "method": method.upper(),
+            "url": redact_url(url),
+            "status": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() in ("content-type", "retry-after")},
+            "body_b64": base64.b64encode(response.content).decode("ascii")
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+    def load_record(self, method, url, body):
+        path = self.path_for(url, cassette_key(method, url, body))
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def load(self, method, url, body):
+        """녹화된 응답을 requests.Response로 복원 (없으면 None)"""
+        record = self.load_record(method, url, body)
+        if record is None:
+            return None
+        response = requests.Response()
+        response.status_code = record["status"]
+        response.headers = CaseInsensitiveDict(record["headers"])
+        response._content = base64.b64decode(record["body_b64"])
+        response.url = url
+        response.encoding = "utf-8"
+        return response
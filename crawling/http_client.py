@@ -0,0 +1,184 @@
+import email.utils
+import os
+import random
+import threading
+import time
+from urllib.parse import urlparse, urlunparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_cassette import CassetteStore, prepare
+from rate_limit import TokenBucket
+
+# API별 초당 요청 수 (호스트 단위 토큰 버킷)
+HOST_RATES = {
+    "fd.forest.go.kr": 4,
+    "firms.modaps.eosdis.nasa.gov": 5,
+    "meteostat.p.rapidapi.com": 5,
+    "api.meteostat.net": 5,
+    "api.weatherbit.io": 2,
+}
+DEFAULT_RATE = 2
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0   # 초, 시도마다 2배
+BACKOFF_MAX = 60.0
+DEFAULT_TIMEOUT = 30
+POOL_SIZE = 16
+
+# 오프라인 벤치마크용 동작 모드
+#   WILDFIRE_HTTP_MODE=live|record|replay  (record: 실제 응답을 카세트에 저장, replay: 카세트로만 응답)
+#   WILDFIRE_HTTP_OVERRIDE=http://127.0.0.1:8765  (모든 요청을 로컬 대역 서버로 보냄, mock_server.py)
+HTTP_MODES = ("live", "record", "replay")
+ORIGINAL_HOST_HEADER = "X-Original-Host"
+
+class HttpClient:
+    """keep-alive 커넥션 풀 + 호스트별 속도 제한 + 429/5xx 지터 재시도 + 호출 지표"""
+
+    def __init__(self, host_rates=None, max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE, pool_size=POOL_SIZE,
+                 mode="live", cassette_dir=None, override=None):
+        if mode not in HTTP_MODES:
+            raise ValueError(f"지원하지 않는 HTTP 모드: {mode}")
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.host_rates = dict(HOST_RATES if host_rates is None else host_rates)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.buckets = {}
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+        self.mode = mode
+        self.cassettes = CassetteStore(cassette_dir) if cassette_dir else CassetteStore()
+        self.override = urlparse(override) if override else None
+
+    def _send(self, method, url, host, **kwargs):
+        """모드에 따라 실제 요청 / 대역 서버 요청 / 카세트 재생"""
+        if self.mode == "replay" and not self.override:
+            request_url, body = prepare(method, url, **kwargs)
+            response = self.cassettes.load(method, request_url, body)
+            if response is None:
+                raise requests.ConnectionError(f"카세트 없음 (replay): {method} {request_url}")
+            return response
+
+        target = url
+        if self.override:
+            parsed = urlparse(url)
+            target = urlunparse(parsed._replace(scheme=self.override.scheme, netloc=self.override.netloc))
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), ORIGINAL_HOST_HEADER: host}
+
+        response = self.session.request(method, target, **kwargs)
+
+        if self.mode == "record" and response.status_code not in RETRY_STATUS:
+            request_url, body = prepare(method, url, **kwargs)
+            self.cassettes.save(method, request_url, body, response)
+        return response
+
+    def set_rate(self, host, rate):
+        """호스트 속도 제한 변경 (이미 만들어진 버킷도 교체)"""
+        with self.lock:
+            self.host_rates[host] = rate
+            self.buckets.pop(host, None)
+
+    def _bucket(self, host):
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.host_rates.get(host, DEFAULT_RATE))
+            return self.buckets[host]
+
+    def _record(self, host, latency, nbytes=0, error=False, retry=False):
+        with self.lock:
+            m = self.metrics.setdefault(host, {
+                "calls": 0, "errors": 0, "retries": 0, "bytes": 0,
+                "latency_total": 0.0, "latency_max": 0.0
+            })
+            m["calls"] += 1
+            m["bytes"] += nbytes
+            m["latency_total"] += latency
+            m["latency_max"] = max(m["latency_max"], latency)
+            if error:
+                m["errors"] += 1
+            if retry:
+                m["retries"] += 1
+
+    def _backoff(self, attempt, response=None):
+        """Retry-After 헤더가 있으면 따르고, 없으면 지수 백오프 + 지터"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(BACKOFF_MAX, float(retry_after))
+                except ValueError:
+                    # HTTP 날짜 형식이 아니면 (잘못된 헤더) 지수 백오프로 넘어감
+                    try:
+                        parsed = email.utils.parsedate_to_datetime(retry_after)
+                    except (TypeError, ValueError):
+                        parsed = None
+                    if parsed:
+                        return min(BACKOFF_MAX, max(0.0, parsed.timestamp() - time.time()))
+        delay = min(BACKOFF_MAX, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.5)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        host = urlparse(url).netloc
+        bucket = self._bucket(host)
+
+        attempt = 0
+        while True:
+            bucket.acquire()
+            started = time.monotonic()
+            try:
+                response = self._send(method, url, host, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                will_retry = attempt < self.max_retries
+                self._record(host, time.monotonic() - started, error=True, retry=will_retry)
+                if not will_retry:
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            will_retry = response.status_code in RETRY_STATUS and attempt < self.max_retries
+            self._record(host, time.monotonic() - started, len(response.content),
+                         error=response.status_code >= 400, retry=will_retry)
+            if not will_retry:
+                return response
+
+            time.sleep(self._backoff(attempt, response))
+            attempt += 1
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def print_metrics(self):
+        if not self.metrics:
+            return
+        print("\n🌐 HTTP 호출 지표:")
+        for host, m in sorted(self.metrics.items()):
+            avg_ms = m["latency_total"] / m["calls"] * 1000 if m["calls"] else 0
+            print(f"   {host}: {m['calls']}회 (재시도 {m['retries']}, 오류 {m['errors']}), "
+                  f"평균 {avg_ms:.0f}ms / 최대 {m['latency_max'] * 1000:.0f}ms, {m['bytes'] / 1024:.1f}KB")
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """프로세스 공용 클라이언트 (모드는 WILDFIRE_HTTP_* 환경 변수로 설정)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient(
+                mode=os.getenv("WILDFIRE_HTTP_MODE", "live"),
+                cassette_dir=os.getenv("WILDFIRE_CASSETTE_DIR"),
+                override=os.getenv("WILDFIRE_HTTP_OVERRIDE")
+            )
+        return _client
@@ -1,23 +1,22 @@
 import os
-import json
 from datetime import datetime
-from math import radians, cos, sin, sqrt, atan2
 
-def haversine(lat1, lon1, lat2, lon2):
-    """두 좌표 간 거리 계산 (km)"""
-    R = 6371
-    d_lat = radians(lat2 - lat1)
-    d_lon = radians(lon2 - lon1)
-    a = sin(d_lat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(d_lon / 2) ** 2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    return R * c
+from firms_columns import FirmsColumns
+from firms_store import FirmsPartitionStore, read_window
+from geo_distance import match_fires
+from json_stream import JsonRecordWriter, iter_json_records
+
+DATE_FIELDS = ["occu_dtm", "frfr_frng_dtm", "frfr_sttmn_dt"]
+LAT_FIELDS = ["frfr_lctn_ycrd", "latitude", "lat", "y_coord"]
+LON_FIELDS = ["frfr_lctn_xcrd", "longitude", "lon", "x_coord"]
+FIRE_FIELDS = ["frfr_info_id", *DATE_FIELDS, *LAT_FIELDS, *LON_FIELDS]   # 매칭 단계에서 읽는 필드
+NASA_FIELDS = ["brightness", "frp", "confidence", "satellite", "instrument", "nasa_distance_km", "nasa_match_threshold"]
+EMPTY_NASA = dict.fromkeys(NASA_FIELDS)
 
 def parse_fire_date(fire_data):
     """화재 데이터에서 날짜 파싱"""
     # 여러 필드에서 날짜 정보 시도
-    date_fields = ["occu_dtm", "frfr_frng_dtm", "frfr_sttmn_dt"]
-    
-    for field in date_fields:
+    for field in DATE_FIELDS:
         date_str = fire_data.get(field, "")
         if not date_str:
             continue
@@ -48,13 +47,10 @@ def parse_fire_date(fire_data):
 
 def get_fire_coordinates(fire_data):
     """화재 데이터에서 좌표 추출"""
-    lat_fields = ["frfr_lctn_ycrd", "latitude", "lat", "y_coord"]
-    lon_fields = ["frfr_lctn_xcrd", "longitude", "lon", "x_coord"]
-    
     lat = None
     lon = None
     
-    for field in lat_fields:
+    for field in LAT_FIELDS:
         if field in fire_data and fire_data[field]:
             try:
                 lat = float(fire_data[field])
@@ -62,7 +58,7 @@ def get_fire_coordinates(fire_data):
             except (ValueError, TypeError):
                 continue
     
-    for field in lon_fields:
+    for field in LON_FIELDS:
         if field in fire_data and fire_data[field]:
             try:
                 lon = float(fire_data[field])
@@ -92,19 +88,12 @@ def analyze_data_ranges(fires, firms):
         print(f"🔥 화재 날짜: {min(fire_dates).date()} ~ {max(fire_dates).date()}")
 
     # NASA 데이터 분석
-    firms_lats, firms_lons, firms_dates = [], [], []
-    for firm in firms:
-        try:
-            firms_lats.append(float(firm["latitude"]))
-            firms_lons.append(float(firm["longitude"]))
-            firms_dates.append(datetime.strptime(firm["acq_date"], "%Y-%m-%d"))
-        except:
-            continue
-    
-    if firms_lats:
-        print(f"🛰️ NASA 위도: {min(firms_lats):.4f} ~ {max(firms_lats):.4f}")
-        print(f"🛰️ NASA 경도: {min(firms_lons):.4f} ~ {max(firms_lons):.4f}")
-        print(f"🛰️ NASA 날짜: {min(firms_dates).date()} ~ {max(firms_dates).date()}")
+    summary = firms.summary()
+    if summary:
+        (lat_min, lat_max), (lon_min, lon_max), (date_min, date_max) = summary
+        print(f"🛰️ NASA 위도: {lat_min:.4f} ~ {lat_max:.4f}")
+        print(f"🛰️ NASA 경도: {lon_min:.4f} ~ {lon_max:.4f}")
+        print(f"🛰️ NASA 날짜: {date_min} ~ {date_max}")
 
 def merge_historical_fire_nasa():
     """과거 화재 데이터와 NASA 데이터 병합"""
@@ -114,7 +103,6 @@ def merge_historical_fire_nasa():
     base_dir = os.path.abspath(os.path.join(root_dir, "..", "public", "data"))
     
     fire_input_path = os.path.join(base_dir, "korea_fire_2024_2025_with_weather.json")
-    firms_input_path = os.path.join(base_dir, "nasa_firms_korea_2024_2025.json")
     output_path = os.path.join(base_dir, "korea_fire_full_2024_2025.json")
 
     # 파일 존재 확인
@@ -122,52 +110,60 @@ def merge_historical_fire_nasa():
         print(f"❌ 화재 데이터 파일 없음: {fire_input_path}")
         return
     
-    if not os.path.exists(firms_input_path):
-        print(f"❌ NASA 데이터 파일 없음: {firms_input_path}")
-        return
+    store = FirmsPartitionStore("korea_2024_2025")
+    store.import_legacy_json(os.path.join(base_dir, "nasa_firms_korea_2024_2025.json"))
 
-    # 데이터 로드
-    with open(fire_input_path, "r", encoding="utf-8") as f:
-        fires = json.load(f)
-    
-    with open(firms_input_path, "r", encoding="utf-8") as f:
-        firms = json.load(f)
+    if store.is_empty():
+        print(f"❌ NASA 데이터 저장소 없음: {store.path}")
+        return
 
-    # 기존 처리된 데이터 확인
+    # 화재 수와 날짜 범위만 먼저 훑음 (매칭에 쓰는 필드만 읽음)
+    total_fires = 0
+    first_date = last_date = None
+    for fire in iter_json_records(fire_input_path, fields=FIRE_FIELDS):
+        total_fires += 1
+        fire_date = parse_fire_date(fire)
+        if fire_date:
+            first_date = min(first_date or fire_date, fire_date)
+            last_date = max(last_date or fire_date, fire_date)
+
+    # 데이터 로드 (화재 발생일 ±3일 파티션만)
+    firms = FirmsColumns.from_records(
+        read_window(store, [d for d in (first_date, last_date) if d], margin_days=3)
+    )
+
+    # 기존 처리된 데이터 확인 (NASA 필드가 채워진 화재의 NASA 필드만 보관)
+    existing_map = {}
     if os.path.exists(output_path):
-        with open(output_path, "r", encoding="utf-8") as f:
-            existing_data = json.load(f)
-        existing_map = {e.get("frfr_info_id"): e for e in existing_data if e.get("frfr_info_id")}
-        print(f"🔄 기존 처리된 데이터: {len(existing_map)}개")
-    else:
-        existing_map = {}
+        existing_count = 0
+        for e in iter_json_records(output_path, fields=["frfr_info_id", *NASA_FIELDS]):
+            fire_id = e.pop("frfr_info_id", None)
+            if not fire_id:
+                continue
+            existing_count += 1
+            if e.get("brightness") is not None or e.get("nasa_distance_km") is not None:
+                existing_map[fire_id] = e
+        print(f"🔄 기존 처리된 데이터: {existing_count}개")
 
-    print(f"🔥 화재 데이터: {len(fires)}개")
+    print(f"🔥 화재 데이터: {total_fires}개")
     print(f"🛰️ NASA FIRMS 데이터: {len(firms)}개")
     
     # 데이터 범위 분석
-    analyze_data_ranges(fires, firms)
+    analyze_data_ranges(iter_json_records(fire_input_path, fields=FIRE_FIELDS), firms)
 
-    enriched = []
-    matched = 0
+    pending = []
     skipped = 0
-    total_processed = 0
-    distance_thresholds = [5.0, 10.0, 20.0, 50.0]
 
     print(f"\n🔍 화재 데이터와 NASA 데이터 매칭 시작...")
 
-    for i, fire in enumerate(fires, 1):
+    for i, fire in enumerate(iter_json_records(fire_input_path, fields=FIRE_FIELDS), 1):
         fire_id = fire.get("frfr_info_id")
         
         # 기존 처리된 데이터 건너뛰기
         if fire_id and fire_id in existing_map:
-            existing_fire = existing_map[fire_id]
-            # NASA 데이터가 이미 추가되어 있는지 확인
-            if existing_fire.get("brightness") is not None or existing_fire.get("nasa_distance_km") is not None:
-                print(f"[{i}/{len(fires)}] 🛑 이미 처리됨 → 건너뜀: {fire_id}")
-                enriched.append(existing_fire)
-                skipped += 1
-                continue
+            print(f"[{i}/{total_fires}] 🛑 이미 처리됨 → 건너뜀: {fire_id}")
+            skipped += 1
+            continue
 
         # 화재 데이터 파싱
         try:
@@ -175,117 +171,69 @@ def merge_historical_fire_nasa():
             fire_date = parse_fire_date(fire)
             
             if not fire_date or not lat or not lon:
-                print(f"[{i}/{len(fires)}] ⚠️ 화재 데이터 부족: lat={lat}, lon={lon}, date={fire_date}")
-                fire["brightness"] = None
-                fire["frp"] = None
-                fire["confidence"] = None
-                fire["satellite"] = None
-                fire["instrument"] = None
-                fire["nasa_distance_km"] = None
-                fire["nasa_match_threshold"] = None
-                enriched.append(fire)
+                print(f"[{i}/{total_fires}] ⚠️ 화재 데이터 부족: lat={lat}, lon={lon}, date={fire_date}")
                 continue
 
-            total_processed += 1
-            print(f"[{i}/{len(fires)}] 🔍 화재: ({lat:.4f}, {lon:.4f}) at {fire_date.date()}", end=" ")
-
         except Exception as e:
-            print(f"[{i}/{len(fires)}] ❌ 화재 데이터 파싱 오류: {e}")
-            fire["brightness"] = None
-            fire["frp"] = None
-            fire["confidence"] = None
-            fire["satellite"] = None
-            fire["instrument"] = None
-            fire["nasa_distance_km"] = None
-            fire["nasa_match_threshold"] = None
-            enriched.append(fire)
+            print(f"[{i}/{total_fires}] ❌ 화재 데이터 파싱 오류: {e}")
             continue
 
-        # NASA 데이터와 매칭
-        closest = None
-        min_dist = float("inf")
-        candidates = []
+        pending.append((i, lat, lon, fire_date))
 
-        for firm in firms:
-            try:
-                firm_date = datetime.strptime(firm["acq_date"], "%Y-%m-%d")
-                
-                # 날짜 차이 확인 (±3일 이내)
-                date_diff = abs((firm_date - fire_date).days)
-                if date_diff > 3:
-                    continue
-                
-                firm_lat = float(firm["latitude"])
-                firm_lon = float(firm["longitude"])
-                dist = haversine(lat, lon, firm_lat, firm_lon)
-                
-                # 50km 이내 후보만 고려
-                if dist <= 50.0:
-                    candidates.append({
-                        'firm': firm, 
-                        'distance': dist,
-                        'date_diff': date_diff
-                    })
-                
-                # 최단 거리 업데이트
-                if dist < min_dist:
-                    min_dist = dist
-                    closest = firm
-                    
-            except Exception:
-                continue
+    # 매칭할 화재 전체를 한 번에 거리 계산 (±3일, 50km 이내 후보)
+    result = match_fires([(lat, lon, fire_date) for _, lat, lon, fire_date in pending], firms)
+    total_processed = len(pending)
+    matched = 0
 
-        print(f"→ 후보 {len(candidates)}개", end=" ")
+    updates = {}   # 입력 순번 → 붙일 NASA 필드
+    for k, (i, lat, lon, fire_date) in enumerate(pending):
+        print(f"[{i}/{total_fires}] 🔍 화재: ({lat:.4f}, {lon:.4f}) at {fire_date.date()}", end=" ")
+        print(f"→ 후보 {result.candidates[k]}개", end=" ")
 
         # 매칭 결과 처리
-        matched_threshold = next((t for t in distance_thresholds if min_dist <= t), None)
-        
-        if closest and matched_threshold:
-            fire["brightness"] = float(closest.get("bright_ti4", 0)) if closest.get("bright_ti4") else None
-            fire["frp"] = float(closest.get("frp", 0)) if closest.get("frp") else None
-            fire["confidence"] = closest.get("confidence", "")
-            fire["satellite"] = closest.get("satellite", "")
-            fire["instrument"] = closest.get("instrument", "")
-            fire["nasa_distance_km"] = round(min_dist, 2)
-            fire["nasa_match_threshold"] = matched_threshold
+        if result.index[k] >= 0:
+            closest = firms[result.index[k]]
+            min_dist = float(result.distance[k])
+            updates[i] = {
+                "brightness": closest.brightness,
+                "frp": closest.frp,
+                "confidence": closest.get("confidence", ""),
+                "satellite": closest.get("satellite", ""),
+                "instrument": closest.get("instrument", ""),
+                "nasa_distance_km": round(min_dist, 2),
+                "nasa_match_threshold": float(result.threshold[k]),
+            }
             matched += 1
             print(f"✅ 매칭 (거리: {min_dist:.2f}km)")
         else:
-            fire["brightness"] = None
-            fire["frp"] = None
-            fire["confidence"] = None
-            fire["satellite"] = None
-            fire["instrument"] = None
-            fire["nasa_distance_km"] = None
-            fire["nasa_match_threshold"] = None
             print("❌ 매칭 실패")
 
-        enriched.append(fire)
-
-    # 결과 저장
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(enriched, f, ensure_ascii=False, indent=2)
+    # 입력을 다시 한 건씩 읽어 NASA 필드를 붙여 바로 저장 (매칭 못 한 화재는 NASA 필드 None)
+    stats = {}
+    sample_with_nasa = None
+    with JsonRecordWriter(output_path) as writer:
+        for i, fire in enumerate(iter_json_records(fire_input_path), 1):
+            fire.update(updates.get(i) or existing_map.get(fire.get("frfr_info_id")) or EMPTY_NASA)
+            writer.write(fire)
+            t = fire.get("nasa_match_threshold")
+            if t:
+                stats[t] = stats.get(t, 0) + 1
+            if sample_with_nasa is None and fire.get("nasa_distance_km"):
+                sample_with_nasa = fire
 
     print(f"\n✅ 병합 완료!")
     print(f"📁 저장 위치: {output_path}")
-    print(f"📊 총 처리: {len(enriched)}개")
+    print(f"📊 총 처리: {writer.count}개")
     print(f"🎯 NASA 매칭: {matched}/{total_processed}개 ({matched/max(total_processed,1)*100:.1f}%)")
     print(f"⏭️ 기존 건너뜀: {skipped}개")
 
     # 거리별 매칭 통계
-    stats = {}
-    for f in enriched:
-        t = f.get("nasa_match_threshold")
-        if t:
-            stats[t] = stats.get(t, 0) + 1
-    
     if stats:
         print("\n📊 거리별 매칭 통계:")
         for k in sorted(stats):
             print(f"   {k}km 이내: {stats[k]}개")
 
     # 샘플 데이터 출력
-    sample_with_nasa = next((fire for fire in enriched if fire.get("nasa_distance_km")), None)
     if sample_with_nasa:
         print(f"\n📋 NASA 매칭 샘플:")
         print(f"  화재 ID: {sample_with_nasa.get('frfr_info_id')}")
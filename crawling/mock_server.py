@@ -0,0 +1,259 @@
+# 외부 API 로컬 대역 서버 (오프라인 파이프라인 벤치마크용)
+#   python mock_server.py --port 8765 --latency 0.05 --rate 5
+#   WILDFIRE_HTTP_OVERRIDE=http://127.0.0.1:8765 python fetch_forest_data.py
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from http_cassette import CassetteStore
+from http_client import ORIGINAL_HOST_HEADER
+
+DEFAULT_PORT = 8765
+FOREST_FIRE_COUNT = 120   # 산림청 목록 합성 건수
+FIRMS_ROWS_PER_DAY = 40   # FIRMS 하루당 합성 관측점 수
+
+FIRMS_HEADER = "latitude,longitude,bright_ti4,scan,track,acq_date,acq_time,satellite,instrument,confidence,version,bright_ti5,frp,daynight"
+SIDO_NAMES = ["강원특별자치도", "경상북도", "경상남도", "충청북도", "충청남도", "전라남도", "경기도"]
+
+class HostRateLimiter:
+    """호스트별 1초 고정 윈도우 요청 수 제한 (초과 시 429 응답용)"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.windows = {}
+        self.lock = threading.Lock()
+
+    def allow(self, host):
+        if not self.rate:
+            return True
+        now = int(time.monotonic())
+        with self.lock:
+            second, count = self.windows.get(host, (now, 0))
+            if second != now:
+                second, count = now, 0
+            if count >= self.rate:
+                return False
+            self.windows[host] = (second, count + 1)
+            return True
+
+def synthetic_forest(body):
+    """산림청 목록 응답 합성 (요청 기간·페이지에 따라 결정적으로 생성)"""
+    param = body.get("param", {})
+    per_page = int(param.get("perPage", 30))
+    current_page = int(param.get("currentPage", 1))
+    start = datetime.strptime(param.get("startDtm") or datetime.today().strftime("%Y%m%d"), "%Y%m%d")
+    end = datetime.strptime(param.get("endDtm") or start.strftime("%Y%m%d"), "%Y%m%d")
+    span_minutes = max(1, int((end - start).total_seconds() // 60) + 24 * 60 - 1)
+
+    rng = random.Random(f"{param.get('startDtm')}-{param.get('endDtm')}")
+    fires = []
+    for i in range(FOREST_FIRE_COUNT):
+        occurred = start + timedelta(minutes=rng.randrange(span_minutes))
+        finished = occurred + timedelta(minutes=rng.randrange(30, 300))
+        fires.append({
+            "frfr_info_id": str(900000 + i),
+            "frfr_frng_dtm": occurred.strftime("%Y-%m-%d %H:%M"),
+            "potfr_end_dtm": finished.strftime("%Y-%m-%d %H:%M"),
+            "frfr_sttmn_addr": f"{rng.choice(SIDO_NAMES)} 합성군 합성면",
+            "frfr_prgrs_stcd": "03",
+            "frfr_prgrs_stcd_str": "진화완료",
+            "frfr_step_issu_cd": "초기대응",
+            "frfr_lctn_ycrd": f"{rng.uniform(34.5, 38.3):.6f}",
+            "frfr_lctn_xcrd": f"{rng.uniform(126.3, 129.4):.6f}",
+            "frfr_sttmn_dt": occurred.strftime("%Y%m%d"),
+            "occu_dtm": occurred.strftime("%Y%m%d%H%M%S"),
+        })
+
+    offset = (current_page - 1) * per_page
+    return {
+        "frfrInfoList": fires[offset:offset + per_page],
+        "pager": {"totalCount": len(fires), "currentPage": current_page, "perPage": per_page}
+    }
+
+def synthetic_firms_csv(path):
+    """FIRMS area CSV 합성: /api/area/csv/{key}/{source}/{bbox}/{day_range}[/{date}]"""
+    parts = path.strip("/").split("/")
+    source, bbox, day_range = parts[4], parts[5], int(parts[6])
+    if len(parts) > 7:
+        first_day = datetime.strptime(parts[7], "%Y-%m-%d")
+    else:
+        first_day = datetime.today() - timedelta(days=day_range - 1)
+    west, south, east, north = (float(v) for v in bbox.split(","))
+    satellite = "Aqua" if source.startswith("MODIS") else "N"
+
+    lines = [FIRMS_HEADER]
+    for day in range(day_range):
+        acq_date = (first_day + timedelta(days=day)).strftime("%Y-%m-%d")
+        rng = random.Random(f"{source}-{bbox}-{acq_date}")
+        for _ in range(FIRMS_ROWS_PER_DAY):
+            lines.append(",".join([
+                f"{rng.uniform(south, north):.5f}",
+                f"{rng.uniform(west, east):.5f}",
+                f"{rng.uniform(295, 367):.2f}", "0.39", "0.36",
+                acq_date, f"{rng.randrange(24):02d}{rng.randrange(60):02d}",
+                satellite, "VIIRS", rng.choice(["l", "n", "h"]), "2.0NRT",
+                f"{rng.uniform(270, 300):.2f}", f"{rng.uniform(0.5, 40):.2f}", rng.choice(["D", "N"])
+            ]))
+    return "\n".join(lines) + "\n"
+
+def synthetic_meteostat(path, query):
+    start = datetime.strptime(query.get("start", [datetime.today().strftime("%Y-%m-%d")])[0], "%Y-%m-%d")
+    end = datetime.strptime(query.get("end", [start.strftime("%Y-%m-%d")])[0], "%Y-%m-%d")
+    rng = random.Random(f"{query.get('lat')}-{query.get('lon')}-{start.date()}")
+    data = []
+    day = start
+    while day <= end:
+        if path.endswith("/hourly"):
+            for hour in range(24):
+                data.append({
+                    "time": day.replace(hour=hour).strftime("%Y-%m-%d %H:%M:%S"),
+                    "temp": round(rng.uniform(-5, 30), 1),
+                    "wspd": round(rng.uniform(0, 30), 1),
+                    "wdir": rng.randrange(360)
+                })
+        else:
+            data.append({
+                "date": day.strftime("%Y-%m-%d"),
+                "tavg": round(rng.uniform(-5, 30), 1),
+                "wspd": round(rng.uniform(0, 30), 1),
+                "wdir": rng.randrange(360),
+                "prcp": round(rng.uniform(0, 10), 1)
+            })
+        day += timedelta(days=1)
+    return {"meta": {"generated": datetime.now().isoformat(timespec="seconds")}, "data": data}
+
+def synthetic_weatherbit(path, query):
+    rng = random.Random(f"{query.get('lat')}-{query.get('lon')}-{query.get('start_date')}")
+    if path.endswith("/hourly"):
+        row = {"temp": round(rng.uniform(-5, 30), 1), "wind_spd": round(rng.uniform(0, 8), 1),
+               "wind_dir": rng.randrange(360), "rh": rng.randrange(20, 100)}
+        return {"data": [row]}
+
+    # 일별: [start_date, end_date) 구간의 하루당 한 행
+    start = datetime.strptime(query["start_date"][0][:10], "%Y-%m-%d")
+    end = datetime.strptime(query["end_date"][0][:10], "%Y-%m-%d")
+    data = []
+    day = start
+    while day < end:
+        data.append({"datetime": day.strftime("%Y-%m-%d"), "temp": round(rng.uniform(-5, 30), 1),
+                     "precip": round(rng.uniform(0, 10), 1), "rh": rng.randrange(20, 100),
+                     "wind_spd": round(rng.uniform(0, 8), 1), "wind_dir": rng.randrange(360)})
+        day += timedelta(days=1)
+    return {"data": data}
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "WildfireStandIn/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _reply(self, status, body, content_type="application/json", extra_headers=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body, ensure_ascii=False)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (extra_headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        host = self.headers.get(ORIGINAL_HOST_HEADER) or self.headers.get("Host", "")
+        self.server.count(host)
+
+        if not self.server.limiter.allow(host):
+            self._reply(429, {"error": "rate limited"}, extra_headers={"Retry-After": "1"})
+            return
+
+        if self.server.latency:
+            time.sleep(max(0.0, self.server.latency + random.uniform(-self.server.jitter, self.server.jitter)))
+
+        # 1) 녹화된 카세트가 있으면 그대로 재생
+        if self.server.cassettes:
+            record = self.server.cassettes.load_record(method, f"https://{host}{self.path}", body)
+            if record is not None:
+                self._reply(record["status"], base64.b64decode(record["body_b64"]),
+                            record["headers"].get("Content-Type", "application/octet-stream"))
+                return
+            if self.server.strict:
+                self._reply(404, {"error": "cassette not found"})
+                return
+
+        # 2) 없으면 엔드포인트별 합성 응답
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        try:
+            if host.endswith("forest.go.kr"):
+                self._reply(200, synthetic_forest(json.loads(body or b"{}")))
+            elif host.startswith("firms."):
+                self._reply(200, synthetic_firms_csv(parsed.path), "text/csv")
+            elif "meteostat" in host:
+                self._reply(200, synthetic_meteostat(parsed.path, query))
+            elif "weatherbit" in host:
+                self._reply(200, synthetic_weatherbit(parsed.path, query))
+            else:
+                self._reply(404, {"error": f"unknown host {host}"})
+        except (ValueError, IndexError) as e:
+            self._reply(400, {"error": str(e)})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, jitter=0.0, rate=0, cassette_dir=None, strict=False, verbose=False):
+        super().__init__(address, StandInHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.limiter = HostRateLimiter(rate)
+        self.cassettes = CassetteStore(cassette_dir) if cassette_dir else None
+        self.strict = strict
+        self.verbose = verbose
+        self.requests = {}
+        self.requests_lock = threading.Lock()
+
+    def count(self, host):
+        with self.requests_lock:
+            self.requests[host] = self.requests.get(host, 0) + 1
+
+def start_server(port=0, **options):
+    """백그라운드 스레드로 서버를 띄우고 (서버, 기본 URL) 반환 (port=0이면 빈 포트 사용)"""
+    server = StandInServer(("127.0.0.1", port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="외부 API 로컬 대역 서버")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="지연 편차 (± 초)")
+    parser.add_argument("--rate", type=int, default=0, help="호스트별 초당 허용 요청 수 (0이면 무제한)")
+    parser.add_argument("--cassettes", default=None, help="재생할 카세트 디렉터리")
+    parser.add_argument("--strict", action="store_true", help="카세트에 없는 요청은 404 (합성 응답 안 함)")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = StandInServer(("127.0.0.1", args.port), latency=args.latency, jitter=args.jitter, rate=args.rate,
+                           cassette_dir=args.cassettes, strict=args.strict, verbose=args.verbose)
+    print(f"🧪 대역 서버 실행: http://127.0.0.1:{args.port} (지연 {args.latency}s ±{args.jitter}s, 초당 {args.rate or '∞'}회)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 종료")
@@ -0,0 +1,141 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from http_client import get_client
+from weather_cache import get_weather_cache
+from weather_snap import get_snapper
+
+# 과거 기상 일괄 조회: 스냅된 위치별로 필요한 날짜 구간을 한 번에 요청하고
+# 받은 일별 행을 날짜 단위 캐시 키로 풀어 둔다 → 화재별 조회는 모두 캐시 적중 (호출 수: 화재 수 → 위치 수)
+METEOSTAT_DAILY_URL = "https://meteostat.p.rapidapi.com/point/daily"
+WEATHERBIT_DAILY_URL = "https://api.weatherbit.io/v2.0/history/daily"
+
+MAX_SPAN_DAYS = {"meteostat": 370, "weatherbit": 31}   # 요청 한 번에 담을 최대 일수
+MAX_GAP_DAYS = 7    # 이보다 떨어진 날짜는 별도 구간으로 (빈 날짜를 길게 받아오지 않도록)
+MAX_WORKERS = 4
+
+DATE_FMT = "%Y-%m-%d"
+
+LocationBatch = namedtuple("LocationBatch", ["provider", "lat", "lon", "start", "end"])
+
+def split_spans(dates, max_span, max_gap=MAX_GAP_DAYS):
+    """정렬된 날짜 목록을 (시작일, 종료일) 구간으로 묶음 (종료일 포함)"""
+    spans = []
+    for date in dates:
+        if spans:
+            start, end = spans[-1]
+            if (date - end).days <= max_gap and (date - start).days < max_span:
+                spans[-1] = (start, date)
+                continue
+        spans.append((date, date))
+    return spans
+
+def plan_daily_batches(points, provider, snapper=None, cache=None):
+    """(위도, 경도, 'YYYY-MM-DD') 목록 → 캐시에 없는 날짜만 위치별 구간 요청으로 묶음"""
+    snapper = snapper or get_snapper()
+    cache = cache or get_weather_cache()
+
+    by_location = {}
+    for lat, lon, date_str in points:
+        query_lat, query_lon = snapper.snap(lat, lon)
+        by_location.setdefault((query_lat, query_lon), set()).add(date_str[:10])
+
+    batches = []
+    for (lat, lon), date_strs in by_location.items():
+        missing = sorted(
+            datetime.strptime(d, DATE_FMT) for d in date_strs
+            if not cache.has(provider, "daily", lat, lon, d)
+        )
+        for start, end in split_spans(missing, MAX_SPAN_DAYS[provider]):
+            batches.append(LocationBatch(provider, lat, lon, start, end))
+    return batches
+
+def iter_days(start, end):
+    day = start
+    while day <= end:
+        yield day.strftime(DATE_FMT)
+        day += timedelta(days=1)
+
+def fetch_meteostat_daily_range(batch, api_key):
+    """Meteostat 일별 행을 구간 단위로 받아 날짜별 원본 행으로 캐시"""
+    headers = {
+        "x-rapidapi-key": api_key,
+        "x-rapidapi-host": "meteostat.p.rapidapi.com"
+    }
+    params = {
+        "lat": batch.lat,
+        "lon": batch.lon,
+        "start": batch.start.strftime(DATE_FMT),
+        "end": batch.end.strftime(DATE_FMT)
+    }
+    res = get_client().get(METEOSTAT_DAILY_URL, headers=headers, params=params)
+    res.raise_for_status()
+    rows = {str(row.get("date", ""))[:10]: row for row in res.json().get("data", [])}
+
+    get_weather_cache().put_many("meteostat", "daily", batch.lat, batch.lon, {
+        date_str: rows.get(date_str, {}) for date_str in iter_days(batch.start, batch.end)
+    })
+    return len(rows)
+
+def fetch_weatherbit_daily_range(batch, api_key):
+    """Weatherbit 일별 행을 구간 단위로 받아 날짜별 {precip, rhum}으로 캐시 (end_date는 미포함이라 +1일)"""
+    params = {
+        "lat": batch.lat,
+        "lon": batch.lon,
+        "start_date": batch.start.strftime(DATE_FMT),
+        "end_date": (batch.end + timedelta(days=1)).strftime(DATE_FMT),
+        "key": api_key
+    }
+    res = get_client().get(WEATHERBIT_DAILY_URL, params=params)
+    res.raise_for_status()
+    rows = {str(row.get("datetime", ""))[:10]: row for row in res.json().get("data", [])}
+
+    get_weather_cache().put_many("weatherbit", "daily", batch.lat, batch.lon, {
+        date_str: {
+            "precip": rows.get(date_str, {}).get("precip"),
+            "rhum": rows.get(date_str, {}).get("rh")
+        }
+        for date_str in iter_days(batch.start, batch.end)
+    })
+    return len(rows)
+
+FETCHERS = {"meteostat": fetch_meteostat_daily_range, "weatherbit": fetch_weatherbit_daily_range}
+
+def prefetch_daily(points, api_keys, max_workers=MAX_WORKERS):
+    """제공자별로 위치 구간 요청을 동시에 보내 캐시를 채움
+
+    api_keys: {"meteostat": 키, "weatherbit": 키} (키가 없는 제공자는 건너뜀)
+    실패한 구간은 화재별 조회 단계에서 하루 단위로 다시 시도된다.
+    """
+    points = list(points)
+    batches = []
+    for provider, api_key in api_keys.items():
+        if api_key:
+            batches.extend(plan_daily_batches(points, provider))
+
+    if not batches:
+        print("♻️ 일괄 조회할 기상 구간 없음 (모두 캐시에 있음)")
+        return 0
+
+    locations = len({(b.lat, b.lon) for b in batches})
+    print(f"📦 기상 일괄 조회: 화재 {len(points)}건 → 위치 {locations}곳, 구간 요청 {len(batches)}회")
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(FETCHERS[batch.provider], batch, api_keys[batch.provider]): batch
+            for batch in batches
+        }
+        for future in as_completed(futures):
+            batch = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                failed += 1
+                print(f"❌ {batch.provider} 구간 조회 오류 ({batch.lat}, {batch.lon}, "
+                      f"{batch.start.strftime(DATE_FMT)}~{batch.end.strftime(DATE_FMT)}): {e}")
+
+    if failed:
+        print(f"⚠️ 실패한 구간 {failed}개 → 화재별 조회에서 다시 시도")
+    return len(batches) - failed
@@ -0,0 +1,191 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+CACHE_PATH = os.path.abspath(os.path.join(__file__, "..", "..", "data", "weather_cache", "weather.sqlite"))
+
+RECENT_WINDOW = 3 * 24 * 3600   # 관측 시각이 이보다 최근이면 제공자가 값을 보정할 수 있는 "최근" 데이터
+RECENT_TTL = 3 * 3600           # 최근 관측: 3시간 후 다시 요청
+PAST_TTL = 365 * 24 * 3600      # 지난 관측: 사실상 고정값
+EMPTY_TTL = 6 * 3600            # 값이 모두 비어 있는 응답 (관측소 없음 등)은 짧게만 보관 (요청 실패는 저장하지 않음)
+MAX_ENTRIES = 200000            # 초과 시 가장 오래 안 쓴 항목부터 제거
+EVICT_EVERY = 500               # put 횟수마다 만료·용량 정리
+
+RESOLUTION_FORMATS = {"hourly": "%Y-%m-%d %H", "daily": "%Y-%m-%d"}
+COORD_DIGITS = 4                # 약 10m, 같은 지점의 문자열 표기 차이를 흡수
+
+def normalize_time(when, resolution):
+    """datetime 또는 문자열을 해상도 단위 키 문자열로 변환"""
+    fmt = RESOLUTION_FORMATS[resolution]
+    if isinstance(when, datetime):
+        return when.strftime(fmt)
+    text = str(when).replace("T", " ")
+    return text[:len(datetime(2000, 1, 1).strftime(fmt))]
+
+def make_key(provider, resolution, lat, lon, when):
+    """제공자·해상도·좌표·시각으로 정규화한 캐시 키"""
+    return "|".join([
+        provider,
+        resolution,
+        f"{float(lat):.{COORD_DIGITS}f}",
+        f"{float(lon):.{COORD_DIGITS}f}",
+        normalize_time(when, resolution)
+    ])
+
+def observation_age(when, now=None):
+    """관측 시각이 현재로부터 몇 초 전인지 (시간대 정보가 없으면 UTC로 간주)"""
+    if not isinstance(when, datetime):
+        text = str(when)[:10]
+        when = datetime.strptime(text, "%Y-%m-%d").replace(hour=23, minute=59)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return (now - when).total_seconds()
+
+class WeatherCache:
+    """모든 기상 보강 스크립트가 같이 쓰는 영구 기상 캐시 (sqlite)
+
+    - 키: (제공자, 해상도, 좌표, 시각) 정규화 문자열
+    - 만료: 지난 관측은 길게, 최근 관측과 빈 응답은 짧게
+    - 용량: MAX_ENTRIES를 넘으면 마지막 사용 시각이 오래된 항목부터 제거
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES, recent_ttl=RECENT_TTL, past_ttl=PAST_TTL,
+                 empty_ttl=EMPTY_TTL, recent_window=RECENT_WINDOW):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.recent_ttl = recent_ttl
+        self.past_ttl = past_ttl
+        self.empty_ttl = empty_ttl
+        self.recent_window = recent_window
+        self.lock = threading.Lock()
+        self.puts = 0
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evicted": 0}
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS weather ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS weather_accessed ON weather (accessed_at)")
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM weather").fetchone()[0]
+
+    def ttl_for(self, when, value):
+        if not value or all(v is None for v in value.values()):
+            return self.empty_ttl
+        if observation_age(when) < self.recent_window:
+            return self.recent_ttl
+        return self.past_ttl
+
+    def has(self, provider, resolution, lat, lon, when):
+        """만료되지 않은 값이 있는지만 확인 (적중 통계·사용 시각은 건드리지 않음)"""
+        key = make_key(provider, resolution, lat, lon, when)
+        with self.lock:
+            row = self.conn.execute("SELECT expires_at FROM weather WHERE key = ?", (key,)).fetchone()
+        return row is not None and row[0] >= time.time()
+
+    def get(self, provider, resolution, lat, lon, when):
+        """만료되지 않은 값이 있으면 dict, 없으면 None"""
+        key = make_key(provider, resolution, lat, lon, when)
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT value, expires_at FROM weather WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] < now:
+                self.stats["misses"] += 1
+                return None
+            self.conn.execute("UPDATE weather SET accessed_at = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.stats["hits"] += 1
+        return json.loads(row[0])
+
+    def put(self, provider, resolution, lat, lon, when, value):
+        key = make_key(provider, resolution, lat, lon, when)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO weather (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now + self.ttl_for(when, value), now)
+            )
+            self.conn.commit()
+            self.stats["stores"] += 1
+            self.puts += 1
+            if self.puts >= EVICT_EVERY:
+                self.puts = 0
+                self._evict()
+
+    def put_many(self, provider, resolution, lat, lon, values):
+        """같은 위치의 {시각: 값}을 한 트랜잭션으로 저장 (구간 일괄 조회용)"""
+        now = time.time()
+        rows = [
+            (make_key(provider, resolution, lat, lon, when), json.dumps(value, ensure_ascii=False),
+             now + self.ttl_for(when, value), now)
+            for when, value in values.items()
+        ]
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO weather (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)", rows
+            )
+            self.conn.commit()
+            self.stats["stores"] += len(rows)
+            self.puts += len(rows)
+            if self.puts >= EVICT_EVERY:
+                self.puts = 0
+                self._evict()
+
+    def get_or_fetch(self, provider, resolution, lat, lon, when, fetch):
+        """캐시에 없을 때만 fetch()를 호출하고 결과를 저장 (fetch가 예외를 내면 저장하지 않음)"""
+        value = self.get(provider, resolution, lat, lon, when)
+        if value is None:
+            value = fetch()
+            self.put(provider, resolution, lat, lon, when, value)
+        return value
+
+    def _evict(self):
+        now = time.time()
+        removed = self.conn.execute("DELETE FROM weather WHERE expires_at < ?", (now,)).rowcount
+        overflow = self.conn.execute("SELECT COUNT(*) FROM weather").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            removed += self.conn.execute(
+                "DELETE FROM weather WHERE key IN (SELECT key FROM weather ORDER BY accessed_at LIMIT ?)",
+                (overflow,)
+            ).rowcount
+        self.conn.commit()
+        self.stats["evicted"] += removed
+
+    def close(self):
+        with self.lock:
+            self._evict()
+            self.conn.close()
+
+    def print_stats(self):
+        s = self.stats
+        total = s["hits"] + s["misses"]
+        rate = s["hits"] / total * 100 if total else 0
+        print(f"\n🗄️ 기상 캐시: 적중 {s['hits']}회 / 미스 {s['misses']}회 ({rate:.1f}%), "
+              f"저장 {s['stores']}건, 정리 {s['evicted']}건 → {self.path}")
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_weather_cache():
+    """프로세스 공용 기상 캐시 (WEATHER_CACHE_PATH 환경 변수로 위치 변경 가능)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = WeatherCache(os.getenv("WEATHER_CACHE_PATH") or CACHE_PATH)
+        return _cache
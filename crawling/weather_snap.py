@@ -0,0 +1,119 @@
+import gzip
+import json
+import math
+import os
+import sys
+import threading
+
+from http_client import get_client
+
+# 격자 계산은 scripts/grid.py 하나만 사용 (학습 데이터·프론트와 같은 셀)
+sys.path.append(os.path.abspath(os.path.join(__file__, "..", "..", "scripts")))
+from grid import Grid, region_grid
+
+# 기상 조회 좌표 스냅 (가까운 화재들이 같은 기상 요청·캐시 키를 쓰도록)
+#   WEATHER_SNAP_MODE=none     원래 좌표 그대로
+#   WEATHER_SNAP_MODE=grid     격자 셀 중심 (scripts/grid.py의 한국 격자, region_grid("korea"))
+#   WEATHER_SNAP_MODE=station  가장 가까운 Meteostat 관측소 (없거나 멀면 격자 셀 중심)
+SNAP_MODES = ("none", "grid", "station")
+
+KOREA_GRID = region_grid("korea")
+
+STATIONS_URL = "https://bulk.meteostat.net/v2/stations/lite.json.gz"
+STATIONS_PATH = os.path.abspath(os.path.join(__file__, "..", "..", "data", "weather_cache", "stations_kr.json"))
+STATIONS_BBOX = (32.0, 123.0, 40.0, 133.0)   # (남, 서, 북, 동) 한반도 주변만 보관
+MAX_STATION_KM = 25.0
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    d_lat = math.radians(lat2 - lat1)
+    d_lon = math.radians(lon2 - lon1)
+    a = math.sin(d_lat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(d_lon / 2) ** 2
+    return 6371 * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+def grid_cell_center(lat, lon, grid=KOREA_GRID):
+    """grid.indices로 셀을 정하고 그 셀의 중심 좌표 반환"""
+    center_lat, center_lon = grid.centers(*grid.indices(lat, lon))
+    return round(float(center_lat), 6), round(float(center_lon), 6)
+
+def load_stations(path=STATIONS_PATH, url=STATIONS_URL, bbox=STATIONS_BBOX):
+    """로컬에 저장된 관측소 목록을 읽고, 없으면 Meteostat 전체 목록을 한 번 내려받아 영역만 저장"""
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    response = get_client().get(url, timeout=60)
+    response.raise_for_status()
+    south, west, north, east = bbox
+    stations = []
+    for station in json.loads(gzip.decompress(response.content)):
+        location = station.get("location") or {}
+        lat, lon = location.get("latitude"), location.get("longitude")
+        if lat is None or lon is None or not (south <= lat <= north and west <= lon <= east):
+            continue
+        stations.append({"id": station["id"], "lat": lat, "lon": lon})
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stations, f, ensure_ascii=False)
+    print(f"📡 Meteostat 관측소 목록 저장: {len(stations)}곳 → {path}")
+    return stations
+
+class WeatherSnapper:
+    """화재 좌표를 기상 조회용 대표 좌표로 바꿈 (같은 대표 좌표 = 같은 요청·캐시 키)"""
+
+    def __init__(self, mode="none", cell_size=KOREA_GRID.cell_size, stations=None, max_station_km=MAX_STATION_KM):
+        if mode not in SNAP_MODES:
+            raise ValueError(f"지원하지 않는 스냅 모드: {mode}")
+        self.mode = mode
+        self.cell_size = cell_size
+        self.grid = Grid(KOREA_GRID.min_lat, KOREA_GRID.min_lon, cell_size)
+        self.max_station_km = max_station_km
+        self.stations = stations
+        self.memo = {}
+
+        if mode == "station" and stations is None:
+            try:
+                self.stations = load_stations()
+            except Exception as e:
+                print(f"⚠️ 관측소 목록을 불러오지 못해 격자 모드로 대체: {e}")
+                self.stations = []
+
+    def nearest_station(self, lat, lon):
+        best, best_km = None, float("inf")
+        for station in self.stations:
+            # 위도 차만으로도 한계를 넘으면 거리 계산 생략
+            if abs(station["lat"] - lat) * 111.0 > min(best_km, self.max_station_km):
+                continue
+            km = haversine_km(lat, lon, station["lat"], station["lon"])
+            if km < best_km:
+                best, best_km = station, km
+        return best if best_km <= self.max_station_km else None
+
+    def snap(self, lat, lon):
+        """(위도, 경도) → 기상 조회에 쓸 (위도, 경도)"""
+        if self.mode == "none":
+            return lat, lon
+
+        center = grid_cell_center(float(lat), float(lon), self.grid)
+        if self.mode == "grid":
+            return center
+
+        # 관측소 모드: 셀 중심에서 가장 가까운 관측소 (같은 셀 안의 화재는 같은 결과)
+        if center not in self.memo:
+            station = self.nearest_station(*center)
+            self.memo[center] = (station["lat"], station["lon"]) if station else center
+        return self.memo[center]
+
+_snapper = None
+_snapper_lock = threading.Lock()
+
+def get_snapper():
+    """프로세스 공용 스냅퍼 (WEATHER_SNAP_MODE, WEATHER_SNAP_CELL 환경 변수로 설정)"""
+    global _snapper
+    with _snapper_lock:
+        if _snapper is None:
+            _snapper = WeatherSnapper(
+                mode=os.getenv("WEATHER_SNAP_MODE", "none"),
+                cell_size=float(os.getenv("WEATHER_SNAP_CELL") or KOREA_GRID.cell_size)
+            )
+        return _snapper
@@ -423,12 +423,68 @@ function renderKoreaByFilter(start, end, levelFilter, statusFilter) {
   }
 }
 
+// 실시간 스냅샷 변경 세트 (crawling/fetch_forest_data.py가 생성)
+const KOREA_CHANGES_URL = "/data/korea_fire_live.changes.json";
+// 기상 결합 데이터 내용 해시 (crawling/augment_weather.py가 생성, 기상만 바뀌어도 달라짐)
+const KOREA_WEATHER_VERSION_URL = "/data/korea_fire_weather.version.json";
+const KOREA_POLL_INTERVAL_MS = 10 * 60 * 1000; // 10분마다 변경 여부 확인
+let koreaDataHash = null;
+
+async function fetchKoreaChangeSet() {
+  try {
+    const res = await fetch(KOREA_CHANGES_URL, { cache: "no-cache" });
+    if (!res.ok) return null;
+    return await res.json();
+  } catch (err) {
+    return null;
+  }
+}
+
+async function fetchKoreaWeatherVersion() {
+  try {
+    const res = await fetch(KOREA_WEATHER_VERSION_URL, { cache: "no-cache" });
+    if (!res.ok) return null;
+    return (await res.json()).hash;
+  } catch (err) {
+    return null;
+  }
+}
+
+async function fetchKoreaFireJson(hash) {
+  // 해시를 버전으로 붙여서 내용이 같으면 브라우저 캐시를 그대로 사용
+  const url = hash ? `/data/korea_fire_weather.json?v=${hash}` : "/data/korea_fire_weather.json";
+  const res = await fetch(url);
+  return res.json();
+}
+
+// 기상 결합 데이터 해시가 바뀐 경우에만 다시 받아서 렌더링
+async function refreshKoreaFireDataIfChanged() {
+  const hash = await fetchKoreaWeatherVersion();
+  if (!hash || hash === koreaDataHash) return;
+
+  window.fireData = await fetchKoreaFireJson(hash);
+  koreaDataHash = hash;
+  const changeSet = await fetchKoreaChangeSet();
+  if (changeSet) {
+    console.log(`🔄 국내 화재 데이터 갱신 (+${changeSet.added.length} / ~${changeSet.updated.length} / -${changeSet.removed.length})`);
+  } else {
+    console.log("🔄 국내 화재 데이터 갱신");
+  }
+
+  renderKoreaByFilter(
+    document.getElementById("startDate").value,
+    document.getElementById("endDate").value,
+    document.getElementById("levelFilter").value,
+    document.getElementById("statusFilter").value
+  );
+}
+
 async function loadKoreaFireData() {
   try {
     updateLoadingStatus("🔄 국내 화재 데이터 로딩 중...");
     
-    const res = await fetch("/data/korea_fire_weather.json");
-    const fireData = await res.json();
+    koreaDataHash = await fetchKoreaWeatherVersion();
+    const fireData = await fetchKoreaFireJson(koreaDataHash);
     window.fireData = fireData;
 
     const startInput = document.getElementById("startDate");
@@ -858,6 +914,7 @@ async function init() {
   updateLoadingStatus("🔄 데이터 준비 중...");
   await loadKoreaFireData();
   await loadFirmsFireData();
+  setInterval(refreshKoreaFireDataIfChanged, KOREA_POLL_INTERVAL_MS);
 }
 
 fetch("/api/config")
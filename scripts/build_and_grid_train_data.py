@@ -2,34 +2,31 @@
 import os
 import pandas as pd
 import numpy as np
-import math
 from datetime import datetime
 from tqdm import tqdm
 
+from dataset_store import dataset_path, save_dataset
+from grid import format_grid_ids, region_grid
+from land_mask import load_land_mask
+
 # === CONFIG ===
 REGION = "korea"  
 
 if REGION == "la":
     RAW_FILE = "data/fire_archive_J1V-C2_618777.csv"
-    GRID_CSV = "data/train_fire_data_grid.csv"
-    MIN_LAT, MIN_LON = 33.5, -119.0
-    CELL_SIZE = 0.05
+    GRID_NAME = "train_fire_data_grid"
     DATE_FIELD = "acq_date"
     LAT_FIELD, LON_FIELD = "latitude", "longitude"
 elif REGION == "korea":
     RAW_FILE = "public/data/korea_fire_enhanced_2024_2025.json"
-    GRID_CSV = "data/train_fire_data_grid_korea.csv"
-    MIN_LAT, MIN_LON = 34.0, 126.0
-    CELL_SIZE = 0.05
+    GRID_NAME = "train_fire_data_grid_korea"
     DATE_FIELD = "frfr_sttmn_dt"
     LAT_FIELD, LON_FIELD = "frfr_lctn_ycrd", "frfr_lctn_xcrd"
 else:
     raise ValueError("REGION은 'la' 또는 'korea'만 지원!")
 
-def assign_grid_id(lat, lon, min_lat, min_lon, cell_size):
-    lat_idx = math.floor((lat - min_lat) / cell_size)
-    lon_idx = math.floor((lon - min_lon) / cell_size)
-    return f"l_{lat_idx}_{lon_idx}"
+GRID = region_grid(REGION)   # 최소 위경도·셀 크기 (grid.py REGION_GRIDS)
+LAND = load_land_mask(REGION)  # 바다 셀 비화재 샘플 제외용 (public/land.geojson 없으면 중단)
 
 # --- 파일 로드 및 전처리 ---
 if RAW_FILE.endswith(".csv"):
@@ -51,10 +48,10 @@ else:
     df["date"] = pd.to_datetime(df[DATE_FIELD])
 
 
-# --- 격자 ID 생성
-df["grid_id"] = df.apply(lambda row: assign_grid_id(
-    row["latitude"], row["longitude"], MIN_LAT, MIN_LON, CELL_SIZE
-), axis=1)
+# --- 격자 ID 생성 (행별 apply 대신 배열 한 번에)
+lat_idx, lon_idx = GRID.indices(df["latitude"], df["longitude"])
+df["lat_idx"], df["lon_idx"] = lat_idx, lon_idx
+df["grid_id"] = format_grid_ids(lat_idx, lon_idx)
 
 # --- fire_occurred 라벨 생성 ---
 if REGION == "korea":
@@ -69,18 +66,24 @@ if REGION == "korea":
     no_fire["longitude"] += np.random.uniform(-0.2, 0.2, len(no_fire))
     no_fire["fire_occurred"] = 0
 
+    # 옮긴 위치 기준으로 격자 다시 계산, 바다 셀 샘플은 버림
+    lat_idx, lon_idx = GRID.indices(no_fire["latitude"], no_fire["longitude"])
+    no_fire["lat_idx"], no_fire["lon_idx"] = lat_idx, lon_idx
+    no_fire["grid_id"] = format_grid_ids(lat_idx, lon_idx)
+    no_fire = no_fire[LAND.contains(lat_idx, lon_idx)]
+
     df_out = pd.concat([fire_df, no_fire], ignore_index=True)
 else:
     # LA는 이미 라벨링되어 있다고 가정 (코드 생략해도 됨)
     df_out = df.copy()
 
 # --- 컬럼 보존 및 정리
-FEATURES = ["latitude", "longitude", "date", "temp", "wspd", "rhum", "brightness", "frp", "confidence", "grid_id", "fire_occurred"]
+FEATURES = ["latitude", "longitude", "date", "temp", "wspd", "rhum", "brightness", "frp", "confidence", "grid_id", "lat_idx", "lon_idx", "fire_occurred"]
 for col in FEATURES:
     if col not in df_out.columns:
         df_out[col] = np.nan
 
 df_out = df_out[FEATURES]
-df_out.to_csv(GRID_CSV, index=False)
-print(f"✅ 격자 변환 및 fire_occurred 라벨 생성 완료: {GRID_CSV} ({len(df_out)}개)")
+save_dataset(df_out, GRID_NAME)
+print(f"✅ 격자 변환 및 fire_occurred 라벨 생성 완료: {dataset_path(GRID_NAME)} ({len(df_out)}개)")
 
@@ -2,10 +2,17 @@
 from dotenv import load_dotenv
 import pandas as pd
 import numpy as np
-import requests
 import os
+import sys
 from tqdm import tqdm
 
+# 🌐 crawling/ 공용 HTTP 클라이언트 + 영구 기상 캐시 사용
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "crawling")))
+from http_client import get_client
+from weather_batch import prefetch_daily
+from weather_cache import get_weather_cache
+from weather_snap import get_snapper
+
 # 🔐 RapidAPI 키 로드 (.env에 METEOSTAT_KEY로 저장)
 load_dotenv()
 API_KEY = os.getenv("METEOSTAT_KEY")
@@ -17,8 +24,8 @@ if not API_KEY:
 FIRE_CSV = "data/fire_archive_J1V-C2_618777.csv"
 OUTPUT_CSV = "data/train_fire_data.csv"
 
-# 🌡️ Meteostat (RapidAPI) 호출 함수
-def get_weather(lat, lon, date):
+# 🌡️ Meteostat (RapidAPI) 일별 응답 첫 행 (crawling/ 영구 기상 캐시 공유)
+def fetch_meteostat_daily_row(lat, lon, date):
     url = "https://meteostat.p.rapidapi.com/point/daily"
     headers = {
         "X-RapidAPI-Key": API_KEY,
@@ -30,15 +37,23 @@ def get_weather(lat, lon, date):
         "start": date,
         "end": date
     }
-    res = requests.get(url, headers=headers, params=params)
+    res = get_client().get(url, headers=headers, params=params)
     if res.status_code != 200:
         raise ValueError(f"API 호출 실패 {res.status_code}: {res.text}")
     
     data = res.json()
     if "data" not in data or not data["data"]:
+        return {}
+    return data["data"][0]
+
+def get_weather(lat, lon, date):
+    lat, lon = get_snapper().snap(lat, lon)
+    w = get_weather_cache().get_or_fetch(
+        "meteostat", "daily", lat, lon, date,
+        lambda: fetch_meteostat_daily_row(lat, lon, date)
+    )
+    if not w:
         return None
-    
-    w = data["data"][0]
     return {
         "temp": w.get("tavg", 25),
         "wspd": w.get("wspd", 3.0),
@@ -48,6 +63,12 @@ def get_weather(lat, lon, date):
 # 🔥 화재 데이터 로딩
 df = pd.read_csv(FIRE_CSV)
 
+# 📦 위치별 날짜 구간으로 한 번에 받아 캐시를 채움 (아래 화재별 호출은 캐시 적중)
+prefetch_daily(
+    zip(df["latitude"], df["longitude"], df["acq_date"].astype(str)),
+    {"meteostat": API_KEY}
+)
+
 rows = []
 print(f"🔥 총 {len(df)}개의 화재 지점에 대해 API 호출 중...")
 for i, row in tqdm(df.iterrows(), total=len(df), desc="📡 API 호출 중"):
@@ -88,3 +109,5 @@ final_df = pd.concat([fire_df, no_fire], ignore_index=True)
 final_df.to_csv(OUTPUT_CSV, index=False)
 
 print(f"✅ 훈련용 CSV 저장 완료: {OUTPUT_CSV} (총 {len(final_df)}개)")
+get_client().print_metrics()
+get_weather_cache().print_stats()
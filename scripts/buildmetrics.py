@@ -2,7 +2,6 @@ import pandas as pd
 import json
 from tqdm import tqdm
 from datetime import datetime, timedelta
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import (
     roc_auc_score, 
     classification_report, 
@@ -12,20 +11,32 @@ from sklearn.metrics import (
     f1_score
 )
 
+from dataset_store import load_dataset
+from land_mask import load_land_mask, on_land
+from walk_forward import WalkForwardForest
+
 # 1. 아래만 맞게 조정하면 됨!
 REGION = "la"   # or "la"
-ENCODED = f"data/grid_encoded_train_data_{REGION}.csv" if REGION == "korea" else "data/grid_encoded_train_data.csv"
-RAW = f"data/train_fire_data_grid_{REGION}.csv" if REGION == "korea" else "data/train_fire_data_grid.csv"
+ENCODED = f"grid_encoded_train_data_{REGION}"
+RAW = f"train_fire_data_grid_{REGION}" if REGION == "korea" else "train_fire_data_grid"
 PREDICT_JSON_DIR = "public/test/korea" if REGION == "korea" else "public/test/la"
 CSV_METRICS_PATH = f"public/{REGION}_metrics.csv"
 
-df_original = pd.read_csv(RAW)
-df_encoded = pd.read_csv(ENCODED)
-df_original["acq_date"] = pd.to_datetime(df_original["date"])
-df_encoded["acq_date"] = pd.to_datetime(df_original["date"])
+# 날짜는 datetime64로 저장돼 있음 (다시 파싱하지 않음), 원본은 필요한 열만
+df_original = load_dataset(RAW, columns=["date", "grid_id"])
+df_encoded = load_dataset(ENCODED)
+df_original["acq_date"] = df_original["date"]
+df_encoded["acq_date"] = df_original["date"]
+LAND = load_land_mask(REGION)  # 바다 셀은 예측하지 않음 (public/land.geojson 없으면 중단)
 
 features = ["grid_id_encoded", "temp", "wspd", "rhum", "brightness", "frp", "confidence"]
 
+REFIT_EVERY = 30  # 전체 재학습 주기 (일), 그 사이는 나무만 추가 (walk_forward.py), 1이면 날짜마다 새로 학습
+if "fire_occurred" in df_encoded.columns:
+    pool = df_encoded.dropna(subset=features)
+    ENGINE = WalkForwardForest(pool[features], pool["fire_occurred"], pool["acq_date"],
+                               refit_every=REFIT_EVERY, random_state=42)
+
 # 날짜 셋팅
 if REGION == "la":
     date_list = [
@@ -52,15 +63,18 @@ for TARGET_DATE in date_list:
     X_train = train_df[features].dropna()
     y_train = train_df.loc[X_train.index, "fire_occurred"] if "fire_occurred" in train_df.columns else None
     X_test = test_df[features].dropna()
+    X_test = X_test[on_land(LAND, df_original.loc[X_test.index, "grid_id"])]
     y_test = test_df.loc[X_test.index, "fire_occurred"] if "fire_occurred" in test_df.columns else None
 
     if X_test.empty or (y_train is not None and y_train.empty):
         print(f"😅 {TARGET_DATE} 학습 또는 테스트 데이터 없음! 스킵합니다.")
         continue
 
-    model = RandomForestClassifier(random_state=42)
     if y_train is not None:
-        model.fit(X_train, y_train)
+        model = ENGINE.model_for(TARGET_DATE)
+        if model is None:
+            print(f"😅 {TARGET_DATE} 학습 데이터에 화재/비화재가 모두 있어야 함! 스킵합니다.")
+            continue
         probas = model.predict_proba(X_test)[:, 1]
         y_pred = (probas > 0.5).astype(int)
         
@@ -120,3 +134,5 @@ if all_metrics:
 else:
     print("⚠️ 평가할 데이터가 없습니다.")
 
+if "fire_occurred" in df_encoded.columns:
+    print(f"🌲 워크포워드 학습: {ENGINE.summary()}")
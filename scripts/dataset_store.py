@@ -0,0 +1,134 @@
+# dataset_store.py
+# 학습 데이터 열 지향 저장소: data/datasets/{이름}/{열}.npy + schema.json
+#   - 날짜는 datetime64[D], 신뢰도·grid_id 같은 문자열은 범주(int 코드 + 라벨), 격자 인덱스는 int32
+#   - 필요한 열만 읽고 (열 선택), 숫자 열은 np.load(mmap_mode="r")로 메모리 매핑
+#   - 저장소가 없고 예전 CSV(data/{이름}.csv)가 있으면 한 번 읽어 저장소로 옮김
+#     (grid_encoded_* 는 예외: 예전 CSV는 LabelEncoder 번호라서 prepare_grid_train_data.py로 다시 만들어야 함)
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATASET_DIR = os.path.join(ROOT_DIR, "data", "datasets")
+LEGACY_CSV_DIR = os.path.join(ROOT_DIR, "data")
+SCHEMA_FILE = "schema.json"
+ENCODED_PREFIX = "grid_encoded_train_data"   # prepare_grid_train_data.py 출력 (고정 셀 코드)
+
+# 열 이름별 기본 타입 (없으면 pandas dtype으로 추론)
+DEFAULT_TYPES = {
+    "date": "datetime64[D]",
+    "acq_date": "datetime64[D]",
+    "confidence": "category",
+    "grid_id": "category",
+    "grid_id_encoded": "int32",
+    "lat_idx": "int32",
+    "lon_idx": "int32",
+    "cell_id": "int64",
+    "fire_occurred": "int8",
+}
+INT_TYPES = {"int8", "int16", "int32", "int64"}
+
+def dataset_path(name, root=DATASET_DIR):
+    return os.path.join(root, name)
+
+def exists(name, root=DATASET_DIR):
+    return os.path.exists(os.path.join(dataset_path(name, root), SCHEMA_FILE))
+
+def infer_type(column, series, overrides=None):
+    """열 하나의 저장 타입 결정 (문자열이 아닌 열을 범주로 바꾸거나, 결측이 있는 열을 정수로 바꾸지 않음)"""
+    wanted = (overrides or {}).get(column, DEFAULT_TYPES.get(column))
+    if wanted == "category" and not (pd.api.types.is_string_dtype(series) or pd.api.types.is_object_dtype(series)
+                                     or isinstance(series.dtype, pd.CategoricalDtype)):
+        wanted = None
+    if wanted in INT_TYPES and series.isna().any():
+        wanted = "float64"
+    if wanted:
+        return wanted
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "datetime64[D]"
+    if pd.api.types.is_bool_dtype(series):
+        return "int8"
+    if pd.api.types.is_integer_dtype(series):
+        return "int64"
+    if pd.api.types.is_float_dtype(series):
+        return "float64"
+    return "category"
+
+def save_dataset(df, name, types=None, root=DATASET_DIR):
+    """DataFrame → 열별 .npy + schema.json (임시 폴더에 쓴 뒤 교체)"""
+    path = dataset_path(name, root)
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    schema = {"name": name, "rows": len(df), "columns": []}
+    for column in df.columns:
+        series = df[column]
+        kind = infer_type(column, series, types)
+        entry = {"name": column, "type": kind}
+        if kind == "category":
+            values = series.astype("category") if not isinstance(series.dtype, pd.CategoricalDtype) else series
+            values = values.cat.rename_categories([str(c) for c in values.cat.categories])
+            codes = values.cat.codes.to_numpy()
+            entry["categories"] = list(values.cat.categories)
+            array = codes.astype(np.int8 if len(entry["categories"]) < 127 else np.int32)
+        elif kind.startswith("datetime64"):
+            array = pd.to_datetime(series, errors="coerce").to_numpy().astype(kind)
+        else:
+            array = series.to_numpy().astype(kind)
+        np.save(os.path.join(tmp_path, f"{column}.npy"), array, allow_pickle=False)
+        schema["columns"].append(entry)
+
+    with open(os.path.join(tmp_path, SCHEMA_FILE), "w", encoding="utf-8") as f:
+        json.dump(schema, f, ensure_ascii=False, indent=2)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    print(f"💾 데이터셋 저장: {path} ({len(df)}행, {len(schema['columns'])}열)")
+    return path
+
+def read_schema(name, root=DATASET_DIR):
+    with open(os.path.join(dataset_path(name, root), SCHEMA_FILE), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def import_legacy_csv(name, root=DATASET_DIR, csv_dir=LEGACY_CSV_DIR, types=None):
+    """data/{name}.csv를 한 번 파싱해서 저장소로 옮김 (없으면 False)"""
+    csv_path = os.path.join(csv_dir, f"{name}.csv")
+    if not os.path.exists(csv_path):
+        return False
+    df = pd.read_csv(csv_path)
+    for column in df.columns:
+        if (types or {}).get(column, DEFAULT_TYPES.get(column, "")).startswith("datetime64"):
+            df[column] = pd.to_datetime(df[column], errors="coerce")
+    print(f"📥 예전 CSV 가져오기: {csv_path}")
+    save_dataset(df, name, types, root)
+    return True
+
+def load_dataset(name, columns=None, mmap=True, root=DATASET_DIR):
+    """저장소 → DataFrame (columns로 필요한 열만, mmap=True면 숫자 열은 메모리 매핑)"""
+    if not exists(name, root) and name.startswith(ENCODED_PREFIX):
+        raise FileNotFoundError(f"인코딩 데이터셋 없음: {dataset_path(name, root)} → scripts/prepare_grid_train_data.py를 "
+                                f"해당 REGION으로 먼저 실행 (data/{name}.csv는 예전 LabelEncoder 번호라 가져오지 않음)")
+    if not exists(name, root) and not import_legacy_csv(name, root):
+        raise FileNotFoundError(f"데이터셋 없음: {dataset_path(name, root)} (또는 data/{name}.csv)")
+
+    schema = read_schema(name, root)
+    entries = {entry["name"]: entry for entry in schema["columns"]}
+    wanted = columns or [entry["name"] for entry in schema["columns"]]
+    missing = [column for column in wanted if column not in entries]
+    if missing:
+        raise KeyError(f"{name}에 없는 열: {missing}")
+
+    data = {}
+    for column in wanted:
+        entry = entries[column]
+        array = np.load(os.path.join(dataset_path(name, root), f"{column}.npy"),
+                        mmap_mode="r" if mmap else None, allow_pickle=False)
+        if entry["type"] == "category":
+            data[column] = pd.Categorical.from_codes(np.asarray(array), entry["categories"])
+        else:
+            data[column] = np.asarray(array)  # memmap → ndarray 뷰 (데이터는 그대로 매핑)
+    return pd.DataFrame(data, copy=False)
@@ -0,0 +1,128 @@
+# grid.py
+# 위경도 격자 공통 모듈 (모든 스크립트가 같은 코드로 격자 계산)
+#   - (lat_idx, lon_idx) = floor((좌표 - 최소값) / 셀 크기), NumPy 배열 연산이라 수백만 점도 수십 ms
+#   - 정수 셀 ID 하나로 묶기: cell_id = (lat_idx + CELL_OFFSET) << CELL_BITS | (lon_idx + CELL_OFFSET)
+#   - 문자열 격자 ID "l_{lat_idx}_{lon_idx}" (프론트 future.js/main.js와 같은 형식) ↔ 인덱스 ↔ 셀 중심·경계
+#   - 학습 특성용 고정 셀 코드: 전 지구 격자(-90, -180 기준, 같은 셀 크기)에서의 행 우선 번호
+#     데이터에 어떤 셀이 있는지와 무관 → 실행·지역이 달라도 같은 셀은 항상 같은 코드
+import numpy as np
+import pandas as pd
+
+GRID_PREFIX = "l"
+CELL_BITS = 24
+CELL_OFFSET = 1 << (CELL_BITS - 1)   # 음수 인덱스도 양의 정수로 (축마다 ±838만 칸)
+CELL_MASK = (1 << CELL_BITS) - 1
+WORLD_MIN_LAT, WORLD_MIN_LON = -90.0, -180.0
+
+class Grid:
+    """최소 위경도 + 셀 크기(도)로 정해지는 격자"""
+
+    def __init__(self, min_lat, min_lon, cell_size):
+        self.min_lat = min_lat
+        self.min_lon = min_lon
+        self.cell_size = cell_size
+
+        # 지역 격자 원점이 전 지구 격자에서 몇 번째 칸인지 (정수 오프셋이라 경계 반올림 차이 없음)
+        self.lat_offset = round((min_lat - WORLD_MIN_LAT) / cell_size)
+        self.lon_offset = round((min_lon - WORLD_MIN_LON) / cell_size)
+        self.world_columns = round(360.0 / cell_size)
+        self.world_aligned = bool(np.isclose(WORLD_MIN_LAT + self.lat_offset * cell_size, min_lat)
+                                  and np.isclose(WORLD_MIN_LON + self.lon_offset * cell_size, min_lon))
+
+    def __repr__(self):
+        return f"Grid(min_lat={self.min_lat}, min_lon={self.min_lon}, cell_size={self.cell_size})"
+
+    def indices(self, lat, lon):
+        """위경도 배열 → (lat_idx, lon_idx) int32 배열"""
+        lat_idx = np.floor((np.asarray(lat, dtype=np.float64) - self.min_lat) / self.cell_size)
+        lon_idx = np.floor((np.asarray(lon, dtype=np.float64) - self.min_lon) / self.cell_size)
+        return lat_idx.astype(np.int32), lon_idx.astype(np.int32)
+
+    def cell_ids(self, lat, lon):
+        """위경도 배열 → 정수 셀 ID (int64)"""
+        return pack_cells(*self.indices(lat, lon))
+
+    def grid_ids(self, lat, lon):
+        """위경도 배열 → "l_{i}_{j}" 문자열 배열"""
+        return format_grid_ids(*self.indices(lat, lon))
+
+    def cell_codes(self, lat_idx, lon_idx):
+        """셀 인덱스 → 고정 셀 코드 int32 (grid_id_encoded, 전 지구 격자 행 우선 번호)"""
+        if not self.world_aligned:
+            raise ValueError(f"격자 원점 ({self.min_lat}, {self.min_lon})이 {self.cell_size}° 전 지구 격자에 맞지 않음")
+        world_lat = np.asarray(lat_idx, dtype=np.int64) + self.lat_offset
+        world_lon = np.asarray(lon_idx, dtype=np.int64) + self.lon_offset
+        return (world_lat * self.world_columns + world_lon).astype(np.int32)
+
+    def cells_from_codes(self, codes):
+        """고정 셀 코드 → (lat_idx, lon_idx) int32"""
+        world_lat, world_lon = np.divmod(np.asarray(codes, dtype=np.int64), self.world_columns)
+        return (world_lat - self.lat_offset).astype(np.int32), (world_lon - self.lon_offset).astype(np.int32)
+
+    def centers(self, lat_idx, lon_idx):
+        """셀 인덱스 → 셀 중심 (lat, lon)"""
+        lat = self.min_lat + (np.asarray(lat_idx, dtype=np.float64) + 0.5) * self.cell_size
+        lon = self.min_lon + (np.asarray(lon_idx, dtype=np.float64) + 0.5) * self.cell_size
+        return lat, lon
+
+    def bounds(self, lat_idx, lon_idx):
+        """셀 인덱스 → 셀 경계 (south, west, north, east)"""
+        south = self.min_lat + np.asarray(lat_idx, dtype=np.float64) * self.cell_size
+        west = self.min_lon + np.asarray(lon_idx, dtype=np.float64) * self.cell_size
+        return south, west, south + self.cell_size, west + self.cell_size
+
+# 지역별 격자 (future.js의 min_lat/min_lon/cell_size와 같아야 함)
+REGION_GRIDS = {
+    "la": Grid(33.5, -119.0, 0.05),
+    "korea": Grid(34.0, 126.0, 0.05),
+}
+
+def region_grid(region):
+    if region not in REGION_GRIDS:
+        raise ValueError(f"REGION은 {list(REGION_GRIDS)} 중 하나만 지원!")
+    return REGION_GRIDS[region]
+
+def pack_cells(lat_idx, lon_idx):
+    """(lat_idx, lon_idx) → 정수 셀 ID"""
+    lat_idx = np.asarray(lat_idx, dtype=np.int64)
+    lon_idx = np.asarray(lon_idx, dtype=np.int64)
+    return ((lat_idx + CELL_OFFSET) << CELL_BITS) | (lon_idx + CELL_OFFSET)
+
+def unpack_cells(cell_ids):
+    """정수 셀 ID → (lat_idx, lon_idx) int32"""
+    cell_ids = np.asarray(cell_ids, dtype=np.int64)
+    lat_idx = (cell_ids >> CELL_BITS) - CELL_OFFSET
+    lon_idx = (cell_ids & CELL_MASK) - CELL_OFFSET
+    return lat_idx.astype(np.int32), lon_idx.astype(np.int32)
+
+def format_grid_ids(lat_idx, lon_idx):
+    """(lat_idx, lon_idx) → "l_{i}_{j}" 문자열 배열 (서로 다른 셀마다 한 번만 포맷)"""
+    inverse, unique = pd.factorize(pack_cells(lat_idx, lon_idx).reshape(-1))
+    lat_u, lon_u = unpack_cells(unique)
+    labels = np.array([f"{GRID_PREFIX}_{i}_{j}" for i, j in zip(lat_u.tolist(), lon_u.tolist())], dtype=object)
+    return labels[inverse].reshape(np.shape(lat_idx))
+
+def parse_grid_ids(grid_ids):
+    """"l_{i}_{j}" 문자열 배열 → (lat_idx, lon_idx) int32 (서로 다른 문자열마다 한 번만 파싱)"""
+    if isinstance(getattr(grid_ids, "dtype", None), pd.CategoricalDtype):
+        # 데이터셋 저장소의 범주 열은 라벨만 파싱 (코드가 곧 inverse)
+        values = pd.Categorical(grid_ids)
+        inverse, unique = np.asarray(values.codes), values.categories
+    else:
+        inverse, unique = pd.factorize(np.asarray(grid_ids, dtype=object).reshape(-1))
+    lat_u = np.empty(len(unique), dtype=np.int32)
+    lon_u = np.empty(len(unique), dtype=np.int32)
+    for n, label in enumerate(unique):
+        prefix, i, j = str(label).split("_")
+        if prefix != GRID_PREFIX:
+            raise ValueError(f"격자 ID 형식 오류: {label!r}")
+        lat_u[n], lon_u[n] = int(i), int(j)
+    if (inverse < 0).any():
+        raise ValueError("격자 ID에 결측값이 있음")
+    return lat_u[inverse], lon_u[inverse]
+
+def grid_ids_to_cells(grid_ids):
+    return pack_cells(*parse_grid_ids(grid_ids))
+
+def cells_to_grid_ids(cell_ids):
+    return format_grid_ids(*unpack_cells(cell_ids))
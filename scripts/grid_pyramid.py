@@ -0,0 +1,246 @@
+# grid_pyramid.py
+# 다중 해상도 격자 피라미드 (쿼드트리): 0레벨 = 기본 격자(0.05°), 레벨이 하나 오를 때마다 셀 크기 2배
+#   - 부모 셀 인덱스 = 자식 인덱스 >> 1 (음수 인덱스도 floor와 같음)
+#   - 셀별 집계를 아래 레벨부터 한 번씩만 계산 (정렬 + reduceat, Python 루프는 레벨 수만큼)
+#       count       행 수 (화재 + 예측)
+#       fire_count  화재 수
+#       prob_max / prob_mean  예측 확률 최대·평균
+#       frp_max     FRP 최대
+#       latest      마지막 화재 관측일
+#   - 줌에 맞는 레벨 선택(셀 수 상한), 기본 셀 → 상위 셀 집계값 조회(모델용 거친 셀 특성)
+import argparse
+import glob
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from dataset_store import load_dataset, save_dataset
+from grid import Grid, format_grid_ids, pack_cells, parse_grid_ids, region_grid, unpack_cells
+
+LEVELS = 6            # 0.05° ~ 1.6°
+MAX_CELLS = 2000      # 프론트에 한 번에 보낼 셀 수 상한 (level_for 기본값)
+
+def _reduce(keys, columns):
+    """같은 key끼리 묶어 열별 합계/최댓값 (keys 정렬 후 reduceat 한 번씩)
+
+    columns: {이름: (값 배열, "sum" | "max")}, 반환: (고유 key, {이름: 집계 배열})
+    """
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.zeros(0, dtype=np.int64)
+    result = {}
+    for name, (values, how) in columns.items():
+        values = values[order]
+        if not len(keys):
+            result[name] = values
+        elif how == "sum":
+            result[name] = np.add.reduceat(values, starts)
+        elif values.dtype.kind == "f":
+            result[name] = np.fmax.reduceat(values, starts)   # NaN 무시
+        else:
+            result[name] = np.maximum.reduceat(values, starts)
+    return keys[starts], result
+
+class GridPyramid:
+    """레벨별 셀 집계 표 (levels[k]: cell_id순으로 정렬된 DataFrame)"""
+
+    def __init__(self, grid, levels):
+        self.grid = grid
+        self.levels = levels
+
+    @classmethod
+    def build(cls, grid, lat_idx, lon_idx, fire=None, probability=None, frp=None, time=None, n_levels=LEVELS):
+        """기본 격자 인덱스 + 행별 값 → 피라미드
+
+        fire: 화재 여부(0/1), probability: 예측 확률(NaN = 없음), frp: FRP(NaN = 없음),
+        time: 관측일 datetime64 (NaT = 없음). 없는 값은 None
+        """
+        lat_idx = np.asarray(lat_idx, dtype=np.int64)
+        lon_idx = np.asarray(lon_idx, dtype=np.int64)
+        n = len(lat_idx)
+
+        def column(values, dtype, fill):
+            return np.full(n, fill, dtype=dtype) if values is None else np.asarray(values, dtype=dtype)
+
+        probability = column(probability, np.float64, np.nan)
+        has_prob = ~np.isnan(probability)
+        values = {
+            "count": (np.ones(n, dtype=np.int64), "sum"),
+            "fire_count": (column(fire, np.int64, 0), "sum"),
+            "prob_max": (probability, "max"),
+            "prob_sum": (np.where(has_prob, probability, 0.0), "sum"),
+            "prob_n": (has_prob.astype(np.int64), "sum"),
+            "frp_max": (column(frp, np.float64, np.nan), "max"),
+            # NaT는 int64 최솟값이라 최댓값 계산에서 저절로 무시됨
+            "latest": (column(time, "datetime64[D]", "NaT").view(np.int64), "max"),
+        }
+
+        levels = []
+        for level in range(n_levels):
+            keys, reduced = _reduce(pack_cells(lat_idx, lon_idx), values)
+            levels.append(cls._frame(keys, reduced))
+            # 이번 레벨 집계를 다음 레벨의 입력으로 (원래 행을 다시 훑지 않음)
+            lat_idx = levels[-1]["lat_idx"].to_numpy().astype(np.int64) >> 1
+            lon_idx = levels[-1]["lon_idx"].to_numpy().astype(np.int64) >> 1
+            values = {name: (reduced[name], how) for name, (_, how) in values.items()}
+        return cls(grid, levels)
+
+    @staticmethod
+    def _frame(keys, reduced):
+        lat_idx, lon_idx = unpack_cells(keys)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            prob_mean = np.where(reduced["prob_n"] > 0, reduced["prob_sum"] / reduced["prob_n"], np.nan)
+        return pd.DataFrame({
+            "lat_idx": lat_idx,
+            "lon_idx": lon_idx,
+            "cell_id": keys,
+            "count": reduced["count"],
+            "fire_count": reduced["fire_count"],
+            "prob_max": reduced["prob_max"],
+            "prob_mean": prob_mean,
+            "prob_sum": reduced["prob_sum"],
+            "prob_n": reduced["prob_n"],
+            "frp_max": reduced["frp_max"],
+            "latest": reduced["latest"].view("datetime64[D]"),
+        })
+
+    def level_grid(self, level):
+        """레벨 k의 격자 (원점 같고 셀 크기 × 2^k)"""
+        return Grid(self.grid.min_lat, self.grid.min_lon, self.grid.cell_size * (1 << level))
+
+    def level_for(self, max_cells=MAX_CELLS):
+        """셀 수가 max_cells 이하인 가장 세밀한 레벨 (없으면 가장 거친 레벨)"""
+        for level, frame in enumerate(self.levels):
+            if len(frame) <= max_cells:
+                return level
+        return len(self.levels) - 1
+
+    def lookup(self, level, lat_idx, lon_idx):
+        """기본 격자 인덱스 → 레벨 k 표의 행 위치 (없으면 -1)"""
+        shift = np.int64(level)
+        keys = pack_cells(np.asarray(lat_idx, dtype=np.int64) >> shift, np.asarray(lon_idx, dtype=np.int64) >> shift)
+        table = self.levels[level]["cell_id"].to_numpy()
+        pos = np.minimum(np.searchsorted(table, keys), max(len(table) - 1, 0))
+        found = (table[pos] == keys) if len(table) else np.zeros(len(keys), dtype=bool)
+        return np.where(found, pos, -1)
+
+    def features(self, level, lat_idx, lon_idx, columns=("fire_count", "prob_max", "frp_max")):
+        """기본 셀마다 레벨 k 상위 셀의 집계값 (모델 특성용, 상위 셀이 없으면 fire_count 0·나머지 NaN)"""
+        pos = self.lookup(level, lat_idx, lon_idx)
+        frame = self.levels[level]
+        result = {}
+        for column in columns:
+            values = frame[column].to_numpy()
+            fill = {"i": 0, "u": 0, "M": "NaT"}.get(values.dtype.kind, np.nan)
+            picked = np.full(len(pos), fill, dtype=values.dtype)
+            picked[pos >= 0] = values[pos[pos >= 0]]
+            result[f"L{level}_{column}"] = picked
+        return pd.DataFrame(result)
+
+    def to_records(self, level):
+        """레벨 k → 프론트용 셀 목록 (grid_id, 중심, 경계 포함)"""
+        frame = self.levels[level]
+        level_grid = self.level_grid(level)
+        lat, lon = level_grid.centers(frame["lat_idx"], frame["lon_idx"])
+        south, west, north, east = level_grid.bounds(frame["lat_idx"], frame["lon_idx"])
+        grid_ids = format_grid_ids(frame["lat_idx"], frame["lon_idx"])
+
+        def clean(value, digits):
+            return None if np.isnan(value) else round(float(value), digits)
+
+        records = []
+        for i in range(len(frame)):
+            latest = frame["latest"].iat[i]
+            records.append({
+                "grid_id": grid_ids[i],
+                "lat": round(float(lat[i]), 4),
+                "lon": round(float(lon[i]), 4),
+                "bounds": [round(float(v[i]), 4) for v in (south, west, north, east)],
+                "count": int(frame["count"].iat[i]),
+                "fire_count": int(frame["fire_count"].iat[i]),
+                "prob_max": clean(frame["prob_max"].iat[i], 2),
+                "prob_mean": clean(frame["prob_mean"].iat[i], 2),
+                "frp_max": clean(frame["frp_max"].iat[i], 2),
+                "latest": None if pd.isna(latest) else str(latest)[:10],
+            })
+        return records
+
+    def save(self, name):
+        """레벨별로 데이터셋 저장소에 저장 ({name}_L{k})"""
+        for level, frame in enumerate(self.levels):
+            save_dataset(frame, f"{name}_L{level}")
+
+    @classmethod
+    def load(cls, name, grid, n_levels=LEVELS):
+        return cls(grid, [load_dataset(f"{name}_L{level}", mmap=False) for level in range(n_levels)])
+
+PREDICTION_DATE = re.compile(r"_(\d{8})_")
+
+def load_prediction_rows(pattern):
+    """예측 JSON 파일들 → (grid_id, probability, date) DataFrame"""
+    frames = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, "r", encoding="utf-8") as f:
+            points = json.load(f)
+        if not points:
+            continue
+        frame = pd.DataFrame(points)[["grid_id", "probability"]]
+        match = PREDICTION_DATE.search(os.path.basename(path))
+        frame["date"] = pd.to_datetime(match.group(1), format="%Y%m%d") if match else pd.NaT
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame({"grid_id": [], "probability": [], "date": pd.to_datetime([])})
+    return pd.concat(frames, ignore_index=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="격자 피라미드 (레벨별 셀 집계) 생성")
+    parser.add_argument("--region", default="korea", choices=["korea", "la"])
+    parser.add_argument("--levels", type=int, default=LEVELS)
+    parser.add_argument("--predictions", default=None,
+                        help='예측 JSON glob, 예: "public/test/korea/predicted_grid_fire_points_*.json"')
+    parser.add_argument("--output", default=None, help="프론트용 JSON (기본: public/data/grid_pyramid_{region}.json)")
+    parser.add_argument("--max-cells", type=int, default=MAX_CELLS)
+    args = parser.parse_args()
+
+    grid = region_grid(args.region)
+    dataset = f"train_fire_data_grid_{args.region}" if args.region == "korea" else "train_fire_data_grid"
+    fires = load_dataset(dataset, columns=["grid_id", "date", "frp", "fire_occurred"])
+    fires = fires[fires["fire_occurred"] == 1]
+    fire_lat, fire_lon = parse_grid_ids(fires["grid_id"])
+
+    predictions = load_prediction_rows(args.predictions or "")
+    pred_lat, pred_lon = parse_grid_ids(predictions["grid_id"])
+
+    pyramid = GridPyramid.build(
+        grid,
+        np.concatenate([fire_lat, pred_lat]),
+        np.concatenate([fire_lon, pred_lon]),
+        fire=np.r_[np.ones(len(fires), dtype=np.int64), np.zeros(len(predictions), dtype=np.int64)],
+        probability=np.r_[np.full(len(fires), np.nan), predictions["probability"].to_numpy(dtype=np.float64)],
+        frp=np.r_[fires["frp"].to_numpy(dtype=np.float64), np.full(len(predictions), np.nan)],
+        time=np.r_[fires["date"].to_numpy().astype("datetime64[D]"),
+                   np.full(len(predictions), "NaT", dtype="datetime64[D]")],
+        n_levels=args.levels,
+    )
+    pyramid.save(f"grid_pyramid_{args.region}")
+
+    output = args.output or f"public/data/grid_pyramid_{args.region}.json"
+    payload = {
+        "region": args.region,
+        "min_lat": grid.min_lat,
+        "min_lon": grid.min_lon,
+        "default_level": pyramid.level_for(args.max_cells),
+        "levels": [
+            {"level": level, "cell_size": pyramid.level_grid(level).cell_size, "cells": pyramid.to_records(level)}
+            for level in range(len(pyramid.levels))
+        ],
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+
+    for level, frame in enumerate(pyramid.levels):
+        print(f"📐 L{level} ({pyramid.level_grid(level).cell_size:g}°): 셀 {len(frame)}개")
+    print(f"✅ 격자 피라미드 저장 완료 → {output} (기본 레벨 L{payload['default_level']})")
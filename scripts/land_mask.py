@@ -0,0 +1,206 @@
+# land_mask.py
+# 예측 격자 육지/바다 마스크 (셀 중심이 육지 폴리곤 안이면 육지, 프론트 isLand()와 같은 기준)
+#   - land.geojson(Polygon/MultiPolygon)을 한 번 읽어 셀마다 한 번만 판정 → 지역·셀 크기별로 캐시
+#   - 공간 인덱스: 변(edge)을 위도 띠(band)별로 나눠 두고, 셀 중심은 자기 띠의 변하고만 교차 판정
+#     (오른쪽 반직선 교차 횟수 홀짝, 폴리곤별로 세서 구멍(hole)도 처리)
+#   - 예측·비화재 샘플링 단계에서 바다 셀을 미리 버림 → 브라우저가 바다 셀을 받거나 판정하지 않음
+#   - land.geojson은 Natural Earth 1:10m Land(ne_10m_land.geojson, 퍼블릭 도메인)를 public/에 저장한 파일
+#     없으면 FileNotFoundError → 바다 셀이 학습·예측에 섞인 채로 조용히 진행하지 않음
+import argparse
+import json
+import os
+
+import numpy as np
+
+from grid import parse_grid_ids, region_grid
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+LAND_GEOJSON = os.path.join(ROOT_DIR, "public", "land.geojson")   # future.js가 fetch("land.geojson")로 읽는 파일
+LAND_SOURCE = "https://github.com/nvkelso/natural-earth-vector/blob/master/geojson/ne_10m_land.geojson"
+CACHE_DIR = os.path.join(ROOT_DIR, "data", "land_mask")
+BAND_HEIGHT = 0.1       # 변 인덱스 위도 띠 높이 (도)
+POINT_CHUNK = 4096      # 띠 하나에서 한 번에 판정할 셀 수
+
+# 마스크를 계산할 지역 범위 (south, west, north, east) — 격자 원점보다 남쪽(제주 등)도 포함
+REGION_BOUNDS = {
+    "korea": (33.0, 124.5, 39.0, 131.0),
+    "la": (33.0, -119.5, 35.0, -117.0),
+}
+
+def load_land_rings(path):
+    """GeoJSON → [(폴리곤 번호, (N, 2) [lon, lat] 배열), ...] (외곽선과 구멍 모두, 같은 폴리곤은 같은 번호)"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("type") == "FeatureCollection":
+        features = data["features"]
+    elif data.get("type") == "Feature":
+        features = [data]
+    else:
+        features = [{"geometry": data}]
+
+    rings = []
+    polygon_id = 0
+    for feature in features:
+        geometry = feature.get("geometry") or {}
+        if geometry.get("type") == "Polygon":
+            polygons = [geometry["coordinates"]]
+        elif geometry.get("type") == "MultiPolygon":
+            polygons = geometry["coordinates"]
+        else:
+            continue
+        for polygon in polygons:
+            for ring in polygon:
+                coords = np.asarray(ring, dtype=np.float64)[:, :2]
+                if len(coords) >= 3:
+                    rings.append((polygon_id, coords))
+            polygon_id += 1
+    return rings
+
+class EdgeIndex:
+    """위도 띠별 변 목록 (점 → 자기 띠의 변만 교차 판정)"""
+
+    def __init__(self, rings, band_height=BAND_HEIGHT):
+        x1, y1, x2, y2, poly = [], [], [], [], []
+        for polygon_id, coords in rings:
+            start, end = coords, np.roll(coords, -1, axis=0)   # 닫히지 않은 고리도 마지막 변 포함
+            x1.append(start[:, 0])
+            y1.append(start[:, 1])
+            x2.append(end[:, 0])
+            y2.append(end[:, 1])
+            poly.append(np.full(len(coords), polygon_id, dtype=np.int64))
+        if not rings:
+            x1 = y1 = x2 = y2 = [np.zeros(0)]
+            poly = [np.zeros(0, dtype=np.int64)]
+        x1, y1, x2, y2, poly = (np.concatenate(v) for v in (x1, y1, x2, y2, poly))
+
+        keep = y1 != y2   # 수평 변은 교차하지 않음
+        x1, y1, x2, y2, poly = x1[keep], y1[keep], x2[keep], y2[keep], poly[keep]
+
+        self.band_height = band_height
+        self.origin = float(np.minimum(y1, y2).min()) if len(y1) else 0.0
+        first = self._band(np.minimum(y1, y2))
+        last = self._band(np.maximum(y1, y2))
+
+        # 변이 걸친 띠마다 한 번씩 등록 후 띠 번호순 정렬
+        spans = last - first + 1
+        edge = np.repeat(np.arange(len(x1)), spans)
+        band = np.repeat(first, spans) + (np.arange(spans.sum()) - np.repeat(np.cumsum(spans) - spans, spans))
+        order = np.argsort(band, kind="stable")
+        self.band = band[order]
+        edge = edge[order]
+        self.x1, self.y1, self.x2, self.y2, self.poly = x1[edge], y1[edge], x2[edge], y2[edge], poly[edge]
+
+    def _band(self, y):
+        return np.floor((np.asarray(y, dtype=np.float64) - self.origin) / self.band_height).astype(np.int64)
+
+    def contains(self, lon, lat):
+        """점 배열이 폴리곤 안에 있는지 (bool 배열)"""
+        lon = np.asarray(lon, dtype=np.float64)
+        lat = np.asarray(lat, dtype=np.float64)
+        inside = np.zeros(len(lon), dtype=bool)
+        if not len(self.band):
+            return inside
+
+        point_band = self._band(lat)
+        order = np.argsort(point_band, kind="stable")
+        bands, starts = np.unique(point_band[order], return_index=True)
+        ends = np.r_[starts[1:], len(order)]
+
+        for band, start, end in zip(bands, starts, ends):
+            lo, hi = np.searchsorted(self.band, [band, band + 1])
+            if lo == hi:
+                continue
+            x1, y1, x2, y2 = self.x1[lo:hi], self.y1[lo:hi], self.x2[lo:hi], self.y2[lo:hi]
+            local_poly, poly_index = np.unique(self.poly[lo:hi], return_inverse=True)
+            one_hot = np.zeros((hi - lo, len(local_poly)), dtype=np.int32)
+            one_hot[np.arange(hi - lo), poly_index] = 1
+
+            for chunk in range(start, end, POINT_CHUNK):
+                rows = order[chunk:min(chunk + POINT_CHUNK, end)]
+                px, py = lon[rows][:, None], lat[rows][:, None]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    cross_x = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+                crosses = ((y1 > py) != (y2 > py)) & (px < cross_x)
+                counts = crosses.astype(np.int32) @ one_hot
+                inside[rows] = (counts % 2 == 1).any(axis=1)
+        return inside
+
+class LandMask:
+    """격자 셀 [lat0, lat0 + 행) × [lon0, lon0 + 열) 범위의 육지 여부 (mask[i, j])"""
+
+    def __init__(self, grid, lat0, lon0, mask):
+        self.grid = grid
+        self.lat0 = int(lat0)
+        self.lon0 = int(lon0)
+        self.mask = mask
+
+    @classmethod
+    def build(cls, grid, bounds, rings, band_height=BAND_HEIGHT):
+        south, west, north, east = bounds
+        (lat0, lat1), (lon0, lon1) = grid.indices([south, north], [west, east])
+        lat_idx, lon_idx = np.meshgrid(np.arange(lat0, lat1 + 1), np.arange(lon0, lon1 + 1), indexing="ij")
+        lat, lon = grid.centers(lat_idx.ravel(), lon_idx.ravel())
+        inside = EdgeIndex(rings, band_height).contains(lon, lat)
+        return cls(grid, lat0, lon0, inside.reshape(lat_idx.shape))
+
+    def contains(self, lat_idx, lon_idx, outside=False):
+        """셀 인덱스 → 육지 여부 (마스크 범위 밖은 outside)"""
+        i = np.asarray(lat_idx, dtype=np.int64) - self.lat0
+        j = np.asarray(lon_idx, dtype=np.int64) - self.lon0
+        within = (i >= 0) & (i < self.mask.shape[0]) & (j >= 0) & (j < self.mask.shape[1])
+        result = np.full(i.shape, outside, dtype=bool)
+        result[within] = self.mask[i[within], j[within]]
+        return result
+
+    def contains_points(self, lat, lon, outside=False):
+        return self.contains(*self.grid.indices(lat, lon), outside=outside)
+
+    def land_cells(self):
+        """육지 셀 인덱스 (lat_idx, lon_idx) int32"""
+        i, j = np.nonzero(self.mask)
+        return (i + self.lat0).astype(np.int32), (j + self.lon0).astype(np.int32)
+
+def on_land(land, grid_ids):
+    """격자 ID 배열 → 육지 셀 여부 (마스크가 없으면 모두 True)"""
+    if land is None:
+        return np.ones(len(grid_ids), dtype=bool)
+    return land.contains(*parse_grid_ids(grid_ids))
+
+def _cache_path(region, grid, cache_dir):
+    return os.path.join(cache_dir, f"{region}_{grid.cell_size:g}.npz")
+
+def _source_key(path):
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}|{stat.st_size}|{int(stat.st_mtime)}"
+
+def load_land_mask(region, geojson=LAND_GEOJSON, cache_dir=CACHE_DIR, rebuild=False, grid=None):
+    """지역 육지 마스크 (캐시 사용, GeoJSON이 바뀌면 다시 계산), GeoJSON이 없으면 FileNotFoundError"""
+    grid = grid or region_grid(region)
+    if not os.path.exists(geojson):
+        raise FileNotFoundError(
+            f"육지 GeoJSON 없음: {geojson} → Natural Earth 1:10m Land({LAND_SOURCE})를 "
+            f"받아 이 경로에 저장하세요 (프론트 future.js/main.js도 같은 파일을 씀)"
+        )
+
+    path = _cache_path(region, grid, cache_dir)
+    key = _source_key(geojson)
+    if not rebuild and os.path.exists(path):
+        cached = np.load(path, allow_pickle=False)
+        if str(cached["source"]) == key and np.isclose(float(cached["cell_size"]), grid.cell_size):
+            return LandMask(grid, cached["lat0"], cached["lon0"], cached["mask"])
+
+    print(f"🗺️ 육지 마스크 계산: {region} ({grid.cell_size:g}°)")
+    mask = LandMask.build(grid, REGION_BOUNDS[region], load_land_rings(geojson))
+    os.makedirs(cache_dir, exist_ok=True)
+    np.savez_compressed(path, mask=mask.mask, lat0=mask.lat0, lon0=mask.lon0, cell_size=grid.cell_size, source=key)
+    return mask
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="격자 육지/바다 마스크 계산 및 캐시")
+    parser.add_argument("--region", default="korea", choices=sorted(REGION_BOUNDS))
+    parser.add_argument("--geojson", default=LAND_GEOJSON)
+    parser.add_argument("--rebuild", action="store_true", help="캐시 무시하고 다시 계산")
+    args = parser.parse_args()
+
+    land = load_land_mask(args.region, args.geojson, rebuild=args.rebuild)
+    print(f"✅ 육지 셀 {int(land.mask.sum())}/{land.mask.size}개 → {_cache_path(args.region, land.grid, CACHE_DIR)}")
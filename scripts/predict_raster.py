@@ -0,0 +1,148 @@
+# predict_raster.py
+# 날짜별 전체 격자 위험도 래스터 (관측된 행만 예측하던 방식 대신 지역의 모든 육지 셀을 한 번에 예측)
+#   - 셀마다 특성 행 하나: grid_id_encoded = 고정 셀 코드 (grid.py), 나머지 특성은
+#       그날 관측이 있는 셀   → 그 셀 관측값 평균
+#       관측이 없는 셀       → 기상(temp/wspd/rhum)은 그날 지역 평균, 관측 특성(brightness/frp/confidence)은 학습 데이터 중앙값
+#       그날 관측이 아예 없음 → 모두 학습 데이터 중앙값
+#   - predict_proba 한 번 → (행, 열) float32 배열 (바다 셀 NaN), 날짜가 달라도 크기 일정
+import argparse
+import json
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from dataset_store import load_dataset
+from grid import parse_grid_ids, region_grid
+from land_mask import REGION_BOUNDS, load_land_mask
+
+WEATHER_FEATURES = ["temp", "wspd", "rhum"]
+DETECTION_FEATURES = ["brightness", "frp", "confidence"]
+FEATURES = ["grid_id_encoded", *WEATHER_FEATURES, *DETECTION_FEATURES]
+RASTER_DIR = "public/raster"
+
+class RiskRaster:
+    """격자 셀 [lat0, lat0 + 행) × [lon0, lon0 + 열)의 화재 확률 (probability[i, j], 바다 셀 NaN)"""
+
+    def __init__(self, grid, lat0, lon0, probability, date=None):
+        self.grid = grid
+        self.lat0 = int(lat0)
+        self.lon0 = int(lon0)
+        self.probability = probability
+        self.date = date
+
+    def to_dict(self, digits=3):
+        """프론트용 JSON (행 우선으로 편 확률 목록, 바다 셀 null)"""
+        values = np.round(self.probability.astype(np.float64), digits).ravel()
+        return {
+            "date": self.date,
+            "min_lat": self.grid.min_lat,
+            "min_lon": self.grid.min_lon,
+            "cell_size": self.grid.cell_size,
+            "lat0": self.lat0,
+            "lon0": self.lon0,
+            "rows": int(self.probability.shape[0]),
+            "cols": int(self.probability.shape[1]),
+            "probability": [None if np.isnan(v) else float(v) for v in values],
+        }
+
+    def save(self, path):
+        """JSON + 같은 이름의 .npy (Python에서 바로 쓰는 float32 배열)"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+        np.save(os.path.splitext(path)[0] + ".npy", self.probability)
+        return path
+
+class RasterCells:
+    """래스터를 만들 셀 목록 (지역 범위 전체, 육지 마스크가 있으면 육지 셀만 예측)"""
+
+    def __init__(self, region, land=None):
+        self.grid = region_grid(region)
+        south, west, north, east = REGION_BOUNDS[region]
+        (lat0, lat1), (lon0, lon1) = self.grid.indices([south, north], [west, east])
+        self.lat0, self.lon0 = int(lat0), int(lon0)
+        self.shape = (int(lat1 - lat0 + 1), int(lon1 - lon0 + 1))
+        lat_idx, lon_idx = np.meshgrid(np.arange(lat0, lat1 + 1, dtype=np.int32),
+                                       np.arange(lon0, lon1 + 1, dtype=np.int32), indexing="ij")
+        self.active = np.ones(self.shape, dtype=bool) if land is None else land.contains(lat_idx, lon_idx)
+        self.lat_idx = lat_idx[self.active]
+        self.lon_idx = lon_idx[self.active]
+        self.codes = self.grid.cell_codes(self.lat_idx, self.lon_idx)
+
+    def __len__(self):
+        return len(self.codes)
+
+def cell_features(cells, day_rows, fallback):
+    """셀별 특성 행렬 (FEATURES 순서 DataFrame)
+
+    day_rows: 그날 관측 행 (FEATURES 중 grid_id_encoded 외 열 + grid_id), fallback: 특성별 기본값 (학습 데이터 중앙값)
+    """
+    n = len(cells)
+    features = pd.DataFrame({"grid_id_encoded": cells.codes})
+    for column in [*WEATHER_FEATURES, *DETECTION_FEATURES]:
+        features[column] = np.full(n, fallback[column], dtype=np.float64)
+    if day_rows is None or day_rows.empty:
+        return features
+
+    # 그날 지역 평균 기상
+    for column in WEATHER_FEATURES:
+        mean = day_rows[column].mean()
+        if not np.isnan(mean):
+            features[column] = mean
+
+    # 관측이 있는 셀은 그 셀 관측값 평균
+    lat_idx, lon_idx = parse_grid_ids(day_rows["grid_id"])
+    observed = day_rows[[*WEATHER_FEATURES, *DETECTION_FEATURES]].astype(np.float64)
+    observed = observed.assign(code=cells.grid.cell_codes(lat_idx, lon_idx)).groupby("code").mean()
+    pos = np.searchsorted(cells.codes, observed.index.to_numpy())
+    pos = np.minimum(pos, max(n - 1, 0))
+    hit = (cells.codes[pos] == observed.index.to_numpy()) if n else np.zeros(len(observed), dtype=bool)
+    for column in observed.columns:
+        values = observed[column].to_numpy()
+        keep = hit & ~np.isnan(values)
+        features.loc[pos[keep], column] = values[keep]
+    return features
+
+def predict_raster(model, cells, day_rows, fallback, date=None):
+    """모든 셀 특성 → predict_proba 한 번 → RiskRaster"""
+    probability = np.full(cells.shape, np.nan, dtype=np.float32)
+    if len(cells):
+        features = cell_features(cells, day_rows, fallback)
+        probability[cells.active] = model.predict_proba(features[FEATURES])[:, list(model.classes_).index(1)]
+    return RiskRaster(cells.grid, cells.lat0, cells.lon0, probability, date)
+
+def raster_path(region, date):
+    return f"{RASTER_DIR}/{region}/risk_{region}_{date.replace('-', '')}.json"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="날짜별 전체 격자 위험도 래스터 (D-1까지 학습 → D일 모든 셀 예측)")
+    parser.add_argument("dates", nargs="+", help="예측 날짜 (YYYY-MM-DD)")
+    parser.add_argument("--region", default="korea", choices=sorted(REGION_BOUNDS))
+    args = parser.parse_args()
+
+    encoded = f"grid_encoded_train_data_{args.region}"
+    raw = f"train_fire_data_grid_{args.region}" if args.region == "korea" else "train_fire_data_grid"
+    df_original = load_dataset(raw, columns=["date", "grid_id"])
+    df_encoded = load_dataset(encoded)
+    df_encoded["acq_date"] = df_original["date"]
+    df_encoded["grid_id"] = df_original["grid_id"]
+
+    cells = RasterCells(args.region, load_land_mask(args.region))
+    print(f"🗺️ {args.region} 래스터 {cells.shape[0]}×{cells.shape[1]}, 예측 셀 {len(cells)}개")
+
+    for target in args.dates:
+        cutoff = (datetime.strptime(target, "%Y-%m-%d") - timedelta(days=1)).strftime("%Y-%m-%d")
+        train_df = df_encoded[df_encoded["acq_date"] <= cutoff].dropna(subset=FEATURES)
+        if train_df["fire_occurred"].nunique() < 2:
+            print(f"😅 {target} 학습 데이터에 화재/비화재가 모두 있어야 함! 스킵합니다.")
+            continue
+
+        model = RandomForestClassifier(random_state=42)
+        model.fit(train_df[FEATURES], train_df["fire_occurred"])
+        fallback = train_df[FEATURES].median()
+        raster = predict_raster(model, cells, df_encoded[df_encoded["acq_date"] == target], fallback, target)
+        path = raster.save(raster_path(args.region, target))
+        print(f"✅ [{target}] 위험도 래스터 저장 → {path} (최대 {np.nanmax(raster.probability):.2f})")
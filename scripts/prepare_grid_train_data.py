@@ -1,18 +1,20 @@
 # prepare_grid_train_data.py
-import pandas as pd
-from sklearn.preprocessing import LabelEncoder
+from dataset_store import dataset_path, load_dataset, save_dataset
+from grid import parse_grid_ids, region_grid
 
-# region에 따라 파일명 변경
+# region에 따라 데이터셋 이름 변경 (data/datasets/{이름}, 없으면 data/{이름}.csv에서 가져옴)
 REGION = "korea"  # "la" or "korea"
-GRID_CSV = f"data/train_fire_data_grid_{REGION}.csv" if REGION == "korea" else "data/train_fire_data_grid.csv"
-OUTPUT = f"data/grid_encoded_train_data_{REGION}.csv"
+GRID_NAME = f"train_fire_data_grid_{REGION}" if REGION == "korea" else "train_fire_data_grid"
+OUTPUT = f"grid_encoded_train_data_{REGION}"
+GRID = region_grid(REGION)
 
-df = pd.read_csv(GRID_CSV)
-le = LabelEncoder()
-df['grid_id_encoded'] = le.fit_transform(df['grid_id'])
+df = load_dataset(GRID_NAME)
+# 격자 셀 → 고정 코드 (전 지구 격자 번호, LabelEncoder와 달리 데이터에 어떤 셀이 있든 같은 값)
+#   → 인코딩된 데이터셋·모델을 다시 인코딩하지 않고 이어 붙이거나 처음 보는 셀도 예측 가능
+df['grid_id_encoded'] = GRID.cell_codes(*parse_grid_ids(df['grid_id']))
 
 conf_map = {"l": 0, "n": 1, "h": 2}
-df['confidence'] = df['confidence'].map(conf_map).fillna(1)
+df['confidence'] = df['confidence'].astype(object).map(conf_map).fillna(1)
 
 features = ['grid_id_encoded', 'temp', 'wspd', 'rhum', 'brightness', 'frp', 'confidence']
 X = df[features]
@@ -23,5 +25,5 @@ if "fire_occurred" in df.columns:
 else:
     train_df = X.copy()  # 테스트용 예측만
 
-train_df.to_csv(OUTPUT, index=False)
-print(f"✅ 격자 데이터 전처리 완료: {OUTPUT}")
+save_dataset(train_df, OUTPUT)
+print(f"✅ 격자 데이터 전처리 완료: {dataset_path(OUTPUT)}")
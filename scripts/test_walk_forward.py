@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from walk_forward import WalkForwardForest
+
+def _engine(**params):
+    rng = np.random.default_rng(0)
+    days = np.repeat(np.arange("2025-01-01", "2025-02-01", dtype="datetime64[D]"), 20)
+    X = pd.DataFrame(rng.normal(size=(len(days), 3)), columns=["a", "b", "c"])
+    y = np.tile([0, 1], len(days) // 2)
+    return WalkForwardForest(X, y, days, **params)
+
+def test_trees_stay_distinct_after_cap():
+    engine = _engine(n_estimators=10, trees_per_day=5, refit_every=365, max_trees=30, random_state=42)
+    for day in np.arange("2025-01-02", "2025-02-01", dtype="datetime64[D]"):
+        model = engine.model_for(str(day))
+        seeds = [tree.random_state for tree in model.estimators_]
+        assert len(seeds) <= 30
+        assert len(set(seeds)) == len(seeds)
+    assert engine.stats["refit"] > 1   # 상한에 닿아 다시 학습함
+
+def test_refit_every_day_matches_fresh_forest():
+    from sklearn.ensemble import RandomForestClassifier
+
+    engine = _engine(n_estimators=10, refit_every=1, random_state=42)
+    model = engine.model_for("2025-01-10")
+    mask = engine.dates <= np.datetime64("2025-01-09")
+    fresh = RandomForestClassifier(n_estimators=10, random_state=42).fit(engine.X[mask], engine.y[mask])
+    np.testing.assert_array_equal(model.predict_proba(engine.X), fresh.predict_proba(engine.X))
@@ -3,7 +3,10 @@ import json
 import shutil
 from tqdm import tqdm
 from datetime import datetime, timedelta
-from sklearn.ensemble import RandomForestClassifier
+
+from dataset_store import load_dataset
+from land_mask import load_land_mask, on_land
+from walk_forward import WalkForwardForest
 
 # ====== 날짜 리스트 (여기서 예측할 날짜들만 골라!)
 date_list = [
@@ -20,18 +23,20 @@ date_list = [
 DATE_FMT = "%Y-%m-%d"
 
 # ====== 데이터 로드 (파일명은 네 기존 프로젝트에 맞게 고쳐!)
-df_original = pd.read_csv("data/train_fire_data_grid.csv")
-df_encoded = pd.read_csv("data/grid_encoded_train_data.csv")
-
-# 날짜 정보 붙이기
-df_original["acq_date"] = pd.to_datetime(df_original["date"])
-df_encoded["acq_date"] = pd.to_datetime(df_original["date"])  # 인덱스 기준으로 붙임
+df_original = load_dataset("train_fire_data_grid", columns=["date", "grid_id"])
+df_encoded = load_dataset("grid_encoded_train_data_la")  # prepare_grid_train_data.py REGION="la" 출력
 
-conf_map = {"l": 0, "n": 1, "h": 2}
-df_encoded["confidence"] = df_encoded["confidence"].map(conf_map).fillna(1)
+# 날짜 정보 붙이기 (datetime64로 저장돼 있음)
+df_original["acq_date"] = df_original["date"]
+df_encoded["acq_date"] = df_original["date"]  # 인덱스 기준으로 붙임
+LAND = load_land_mask("la")  # 바다 셀은 예측하지 않음 (public/land.geojson 없으면 중단)
 
 features = ["grid_id_encoded", "temp", "wspd", "rhum", "brightness", "frp", "confidence"]
 
+REFIT_EVERY = 30  # 전체 재학습 주기 (일), 그 사이는 나무만 추가 (walk_forward.py), 1이면 날짜마다 새로 학습
+pool = df_encoded.dropna(subset=features)
+ENGINE = WalkForwardForest(pool[features], pool["fire_occurred"], pool["acq_date"], refit_every=REFIT_EVERY)
+
 for TARGET_DATE in date_list:
     print(f"\n🚀 [{TARGET_DATE}] 예측 시작!")
 
@@ -43,14 +48,17 @@ for TARGET_DATE in date_list:
     X_train = train_df[features].dropna()
     y_train = train_df.loc[X_train.index, "fire_occurred"]
     X_test = test_df[features].dropna()
+    X_test = X_test[on_land(LAND, df_original.loc[X_test.index, "grid_id"])]
 
     if X_test.empty:
         print(f"😅 {TARGET_DATE} 테스트 데이터 없음! (스킵)")
         continue
 
     # 학습 & 예측
-    model = RandomForestClassifier()
-    model.fit(X_train, y_train)
+    model = ENGINE.model_for(TARGET_DATE)
+    if model is None:
+        print(f"😅 {TARGET_DATE} 학습 데이터에 화재/비화재가 모두 있어야 함! (스킵)")
+        continue
     probas = model.predict_proba(X_test)[:, 1]
 
     # 결과 JSON 저장
@@ -70,3 +78,5 @@ for TARGET_DATE in date_list:
         json.dump(results, f, indent=2)
 
     print(f"✅ [{TARGET_DATE}] 예측 결과 저장 완료 → {save_path}")
+
+print(f"🌲 워크포워드 학습: {ENGINE.summary()}")
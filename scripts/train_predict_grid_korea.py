@@ -2,20 +2,36 @@ import pandas as pd
 import json
 from tqdm import tqdm
 from datetime import datetime, timedelta
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import roc_auc_score, classification_report
 
-REGION = "korea"
-ENCODED = f"data/grid_encoded_train_data_{REGION}.csv"
-RAW = f"data/train_fire_data_grid_{REGION}.csv"
+from dataset_store import load_dataset
+from land_mask import load_land_mask, on_land
+from predict_raster import RasterCells, predict_raster, raster_path
+from walk_forward import WalkForwardForest
 
-df_original = pd.read_csv(RAW)
-df_encoded = pd.read_csv(ENCODED)
-df_original["acq_date"] = pd.to_datetime(df_original["date"])
-df_encoded["acq_date"] = pd.to_datetime(df_original["date"])
+REGION = "korea"
+ENCODED = f"grid_encoded_train_data_{REGION}"
+RAW = f"train_fire_data_grid_{REGION}"
+
+# 날짜는 datetime64로 저장돼 있음 (다시 파싱하지 않음), 원본은 필요한 열만
+df_original = load_dataset(RAW, columns=["date", "grid_id"])
+df_encoded = load_dataset(ENCODED)
+df_original["acq_date"] = df_original["date"]
+df_encoded["acq_date"] = df_original["date"]
+LAND = load_land_mask(REGION)  # 바다 셀은 예측하지 않음 (public/land.geojson 없으면 중단)
+RASTER = False  # True면 날짜별 전체 격자 위험도 래스터도 저장 (predict_raster.py)
+CELLS = RasterCells(REGION, LAND) if RASTER else None
 
 features = ["grid_id_encoded", "temp", "wspd", "rhum", "brightness", "frp", "confidence"]
 
+# 워크포워드 학습: 날짜마다 숲을 새로 만들지 않고 하루씩 나무를 추가, REFIT_EVERY일마다 전체 재학습
+# (REFIT_EVERY = 1이면 예전처럼 날짜마다 새로 학습 → 예측 동일)
+REFIT_EVERY = 30
+if "fire_occurred" in df_encoded.columns:
+    pool = df_encoded.dropna(subset=features)
+    ENGINE = WalkForwardForest(pool[features], pool["fire_occurred"], pool["acq_date"],
+                               refit_every=REFIT_EVERY, random_state=42)
+
 # 날짜 자동 추출 및 필터링
 date_list = sorted(df_original["acq_date"].dt.strftime("%Y-%m-%d").unique())
 start_date = datetime(2024, 10, 1)
@@ -39,16 +55,24 @@ for TARGET_DATE in date_list:
     X_train = train_df[features].dropna()
     y_train = train_df.loc[X_train.index, "fire_occurred"] if "fire_occurred" in train_df.columns else None
     X_test = test_df[features].dropna()
+    X_test = X_test[on_land(LAND, df_original.loc[X_test.index, "grid_id"])]
     y_test = test_df.loc[X_test.index, "fire_occurred"] if "fire_occurred" in test_df.columns else None
 
     if X_test.empty or (y_train is not None and y_train.empty):
         print(f"😅 {TARGET_DATE} 학습 또는 테스트 데이터 없음! 스킵합니다.")
         continue
 
-    model = RandomForestClassifier(random_state=42)
     if y_train is not None:
-        model.fit(X_train, y_train)
+        model = ENGINE.model_for(TARGET_DATE)
+        if model is None:
+            print(f"😅 {TARGET_DATE} 학습 데이터에 화재/비화재가 모두 있어야 함! 스킵합니다.")
+            continue
         probas = model.predict_proba(X_test)[:, 1]
+        if RASTER:
+            # 관측 행만이 아니라 지역의 모든 (육지) 셀을 predict_proba 한 번으로
+            day_rows = test_df.assign(grid_id=df_original.loc[test_df.index, "grid_id"].values)
+            raster = predict_raster(model, CELLS, day_rows, X_train.median(), TARGET_DATE)
+            print(f"🗺️ [{TARGET_DATE}] 위험도 래스터 저장 → {raster.save(raster_path(REGION, TARGET_DATE))}")
 
         # 📌 특성 중요도 출력 (과적합 방지용 확인)
         feature_importances = model.feature_importances_
@@ -83,3 +107,6 @@ for TARGET_DATE in date_list:
         json.dump(results, f, indent=2)
 
     print(f"✅ [{TARGET_DATE}] 예측 결과 저장 완료 → {save_path}")
+
+if "fire_occurred" in df_encoded.columns:
+    print(f"🌲 워크포워드 학습: {ENGINE.summary()}")
@@ -0,0 +1,74 @@
+# walk_forward.py
+# 워크포워드 학습 엔진: 날짜마다 RandomForest를 새로 학습하지 않고 하루씩 키워 나감
+#   - 처음과 refit_every일마다: D-1까지 전체 데이터로 새 숲 (n_estimators개)
+#   - 그 사이 새 날짜 데이터가 들어오면: warm_start로 나무 trees_per_day개만 추가 (기존 나무는 그대로)
+#     새 나무는 D-1까지 데이터로 학습 → 최근 데이터가 반영되고, 나무가 max_trees를 넘게 되면 전체 재학습
+#     (estimators_를 잘라 쓰면 warm_start가 나무 위치로 시드를 정해서 이미 있는 나무와 같은 시드가 다시 나옴)
+#   - 새 데이터가 없으면 (관측 없는 날) 모델 재사용
+#   - refit_every=1이면 예전처럼 날짜마다 새로 학습 (random_state가 같으면 예측도 같음)
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+N_ESTIMATORS = 100    # 전체 재학습 시 나무 수 (RandomForestClassifier 기본값)
+TREES_PER_DAY = 10    # 새 데이터가 들어온 날 추가할 나무 수
+REFIT_EVERY = 30      # 전체 재학습 주기 (일)
+MAX_TREES = 300       # 숲 크기 상한 (넘게 되면 전체 재학습)
+
+class WalkForwardForest:
+    """날짜순 예측용 RandomForest (model_for(D) → D-1까지 데이터로 학습된 모델)
+
+    X, y, dates: 학습 후보 전체 (결측 행은 미리 제외), dates는 행별 관측일
+    """
+
+    def __init__(self, X, y, dates, n_estimators=N_ESTIMATORS, trees_per_day=TREES_PER_DAY,
+                 refit_every=REFIT_EVERY, max_trees=MAX_TREES, **forest_params):
+        self.X = X
+        self.y = np.asarray(y)
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.n_estimators = n_estimators
+        self.trees_per_day = trees_per_day
+        self.refit_every = refit_every
+        self.max_trees = max(max_trees, n_estimators)
+        self.forest_params = forest_params
+
+        self.model = None
+        self.last_refit = None     # 마지막 전체 재학습 기준 날짜
+        self.last_target = None
+        self.trained_until = None  # 모델에 들어간 가장 최근 관측일
+        self.stats = {"refit": 0, "grow": 0, "reuse": 0}
+
+    def model_for(self, target_date):
+        """target_date 예측용 모델 (D-1까지 데이터), 화재/비화재 한쪽만 있으면 None"""
+        target = np.datetime64(target_date, "D")
+        mask = self.dates <= target - np.timedelta64(1, "D")
+        if not mask.any():
+            return None
+        latest = self.dates[mask].max()
+        single_class = len(np.unique(self.y[mask])) < 2
+
+        refit_due = (self.model is None or self.last_target is None or target < self.last_target
+                     or (target - self.last_refit).astype(int) >= self.refit_every)
+        self.last_target = target
+
+        if not refit_due and latest == self.trained_until:
+            self.stats["reuse"] += 1
+            return self.model
+        if single_class:
+            return None if refit_due else self.model
+        if not refit_due and len(self.model.estimators_) + self.trees_per_day > self.max_trees:
+            refit_due = True   # 나무 상한 → 오래된 나무를 잘라내지 않고 새 숲
+
+        if refit_due:
+            self.model = RandomForestClassifier(n_estimators=self.n_estimators, **self.forest_params)
+            self.model.fit(self.X[mask], self.y[mask])
+            self.last_refit = target
+            self.stats["refit"] += 1
+        else:
+            self.model.set_params(warm_start=True, n_estimators=len(self.model.estimators_) + self.trees_per_day)
+            self.model.fit(self.X[mask], self.y[mask])
+            self.stats["grow"] += 1
+        self.trained_until = latest
+        return self.model
+
+    def summary(self):
+        return f"전체 학습 {self.stats['refit']}회, 나무 추가 {self.stats['grow']}회, 재사용 {self.stats['reuse']}회"